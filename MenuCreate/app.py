@@ -1,12 +1,14 @@
+import sys
+from pathlib import Path
+
 import streamlit as st
-import cv2
-import time
-import numpy as np
 import matplotlib.pyplot as plt
-import seaborn as sns
-from ultralytics import YOLO
 from roboflow import Roboflow
 
+# engine paketi bir üst dizinde
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from engine import HeatmapAccumulator, UploadStore, build_pipeline, get_model, load_zones, render_heatmap  # noqa: E402
+
 # Streamlit başlığı ve açıklaması
 st.title("Mekansal Birey Kalma Süresi Analizi")
 st.write("""
@@ -20,55 +22,34 @@ version = project.version(2)
 dataset = version.download("yolov8")
 
 # YOLOv8 Modelini Yükleme
-model = YOLO("../../yolov8n.pt")
+model = get_model("../../yolov8n.pt")
 
 # Video yükleme
 video_file = st.file_uploader("Bir video dosyası yükleyin", type=["mp4", "avi", "mov"])
+save_video = st.checkbox("İşaretli videoyu kaydet (kutular, kimlikler, kalma süreleri ve bölgeler)")
 
 if video_file:
+    # Yüklemeyi parça parça oturuma özel geçici dosyaya al (özet de bu sırada hesaplanır)
+    video = st.session_state.setdefault("uploads", UploadStore()).ingest(video_file)
     st.video(video_file)
 
-    cap = cv2.VideoCapture(video_file.name)
-
-    stay_times = {}
-    stay_durations = {}
-
     st.write("Video işleniyor, lütfen bekleyin...")
 
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        # YOLO ile nesne tespiti yap
-        results = model(frame)
+    zones = load_zones(Path(__file__).resolve().parent.parent / "zones.json")
+    preview = st.empty()  # tek yer tutucu; önizleme sınırlı hızda güncellenir
+    # İşaretli video arka planda, yarı çözünürlükte kodlanır; tespiti yavaşlatmaz
+    annotated = video.path.with_name(f"{video.digest}_annotated.mp4") if save_video else None
+    pipeline = build_pipeline(video.path, model, zones=zones, annotate=False, preview=preview.image, history=True,
+                              write_video=annotated, write_scale=0.5)
+    pipeline.run()
 
-        for result in results:
-            boxes = result.boxes
-            for box in boxes:
-                # Her tespit için bbox verilerini al
-                x1, y1, x2, y2 = box.xyxy[0].tolist()
-                id = box.id
-
-                # Bireyin ID'sini belirle
-                if id not in stay_times:
-                    stay_times[id] = time.time()  # İlk tespit zamanı
-
-                # Bu alanda kalma süresini hesapla
-                stay_duration = time.time() - stay_times[id]
-                stay_durations[id] = stay_duration  # Süreyi kaydet
-
-                # Görselleştirme
-                cv2.putText(frame, f"ID: {id}, Time: {stay_duration:.2f}s", (int(x1), int(y1)-10), 
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
-                cv2.rectangle(frame, (int(x1), int(y1)), (int(x2), int(y2)), (0, 255, 0), 2)
-
-        # Frame'i göster
-        st.image(frame, channels="BGR")
-    
-    cap.release()
+    stay_durations = pipeline.aggregator.stay_durations
+    st.sidebar.json(model.stats())  # yükleme, ısınma ve ilk kare süreleri
 
     st.write("Analiz Tamamlandı!")
+    if annotated is not None:
+        with open(annotated, "rb") as f:
+            st.download_button("İşaretli videoyu indir", f, file_name="output.mp4", mime="video/mp4")
 
     # Kalma sürelerinin sonuçlarını görselleştirme
     st.subheader("Kalma Süresi Analizi Sonuçları")
@@ -77,9 +58,10 @@ if video_file:
     for id, duration in stay_durations.items():
         st.write(f"Birey {id} toplamda {duration:.2f} saniye kaldı.")
 
-    # Toplam kalma süresini hesapla
-    total_duration = np.sum(list(stay_durations.values()))
-    st.write(f"Tüm bireylerin toplamda {total_duration:.2f} saniye kaldığı tespit edildi.")
+    # Toplam ve kantiller, toplayıcının akan istatistiklerinden (birey listesi üzerinden yeniden hesaplanmaz)
+    dwell = pipeline.aggregator.summary()["dwell"]["all"]
+    st.write(f"Tüm bireylerin toplamda {dwell['total']:.2f} saniye kaldığı tespit edildi.")
+    st.write(f"Kalma süresi medyanı {dwell['p50']:.2f} s, p90 {dwell['p90']:.2f} s, p99 {dwell['p99']:.2f} s.")
 
     # Görselleştirme: Kalma süresi dağılımı
     st.subheader("Kalma Süresi Dağılımı")
@@ -93,16 +75,16 @@ if video_file:
     # Bölgesel analiz ve ısı haritası
     st.subheader("Bölgesel Kalma Süresi Analizi")
 
-    zones = ["Zone 1", "Zone 2", "Zone 3", "Zone 4"]
-    zone_durations = [np.random.rand() * 100 for _ in zones]  # Örnek veri, kendi bölgesel analizinizi ekleyin
+    zone_durations = pipeline.aggregator.zone_durations
 
-    plt.bar(zones, zone_durations)
+    plt.figure()
+    plt.bar(list(zone_durations), list(zone_durations.values()))
     plt.xlabel('Bölgeler')
     plt.ylabel('Toplam Kalma Süresi (saniye)')
     plt.title('Bölgelerde Kalma Süresi Analizi')
     st.pyplot(plt)
 
-    # Isı haritası
-    data = np.array(zone_durations).reshape(1, -1)
-    sns.heatmap(data, annot=True, xticklabels=zones, yticklabels=['Kalma Süresi'])
-    st.pyplot(plt)
+    # Isı haritası: bireylerin ayak noktalarında biriken kişi-saniye, videonun ilk karesi üzerinde
+    heatmap = pipeline.find(HeatmapAccumulator)
+    if heatmap.grid is not None:
+        st.image(render_heatmap(heatmap.background, heatmap.grid), channels="BGR")
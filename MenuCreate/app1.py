@@ -1,11 +1,12 @@
+import sys
+from pathlib import Path
+
 import streamlit as st
-import cv2
-import time
-from ultralytics import YOLO
-import numpy as np
 import matplotlib.pyplot as plt
-from io import BytesIO
-from PIL import Image
+
+# engine paketi bir üst dizinde
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from engine import UploadStore, build_pipeline, get_model, load_zones  # noqa: E402
 
 # Streamlit app title
 st.title("Mekansal Birey Kalma Süresi Analizi")
@@ -15,72 +16,27 @@ st.sidebar.title("Video Yükleme")
 uploaded_video = st.sidebar.file_uploader("Lütfen analiz edilecek videoyu yükleyin", type=["mp4", "avi"])
 
 # YOLOv8 Modelini Yükleme
-model = YOLO("../../yolov8n.pt")
+model = get_model("../../yolov8n.pt")
 
-# Bölge tanımları (örneğin, 4 bölge: sol üst, sağ üst, sol alt, sağ alt)
-zones = {
-    "Zone 1": [(0, 0), (320, 240)],
-    "Zone 2": [(320, 0), (640, 240)],
-    "Zone 3": [(0, 240), (320, 480)],
-    "Zone 4": [(320, 240), (640, 480)],
-}
+# Bölge tanımları (normalize çokgenler; varsayılan dosyada 4 bölge: sol üst, sağ üst, sol alt, sağ alt)
+zones = load_zones(Path(__file__).resolve().parent.parent / "zones.json")
 
 if uploaded_video is not None:
     # Video dosyasını OpenCV ile okuma
-    video_bytes = uploaded_video.read()
-    video_path = '../../uploaded_video.mp4'
-    with open(video_path, 'wb') as video_file:
-        video_file.write(video_bytes)
-    
-    # OpenCV ile videoyu yükleyin
-    cap = cv2.VideoCapture(video_path)
-
-    # Kalma süresi takibi için dictionary'ler
-    stay_times = {}
-    stay_durations = {}
-    zone_durations = {zone: 0 for zone in zones}
+    # Yüklemeyi parça parça oturuma özel geçici dosyaya al (özet de bu sırada hesaplanır)
+    video = st.session_state.setdefault("uploads", UploadStore()).ingest(uploaded_video)
 
     # Video analizine başla
     st.subheader("Video Analizi")
     st.text("Video analiz ediliyor, lütfen bekleyin...")
-    
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
-        
-        # YOLO ile nesne tespiti yap
-        results = model(frame)
-        
-        for result in results:
-            boxes = result.boxes
-            for box in boxes:
-                x1, y1, x2, y2 = box.xyxy[0].tolist()
-                id = box.id
-
-                # Bireyin ID'sini belirle
-                if id not in stay_times:
-                    stay_times[id] = time.time()  # İlk tespit zamanı
-                
-                # Bu alanda kalma süresini hesapla
-                stay_duration = time.time() - stay_times[id]
-                stay_durations[id] = stay_duration  # Süreyi kaydet
-                
-                # Bireyin bulunduğu bölgeyi tespit et ve kalma süresini kaydet
-                for zone_name, ((zx1, zy1), (zx2, zy2)) in zones.items():
-                    if zx1 <= box.xyxy[0][0] <= zx2 and zy1 <= box.xyxy[0][1] <= zy2:
-                        zone_durations[zone_name] += stay_duration
-
-                # Görselleştirme
-                cv2.putText(frame, f"ID: {id}, Time: {stay_duration:.2f}s", (int(x1), int(y1)-10), 
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
-                cv2.rectangle(frame, (int(x1), int(y1)), (int(x2), int(y2)), (0, 255, 0), 2)
-
-        # Frame'i görüntüleme
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        st.image(frame_rgb, channels="RGB", use_column_width=True)
-    
-    cap.release()
+
+    preview = st.empty()  # tek yer tutucu; önizleme sınırlı hızda güncellenir
+    pipeline = build_pipeline(video.path, model, zones=zones, annotate=False, preview=preview.image, history=True)
+    pipeline.run()
+
+    stay_durations = pipeline.aggregator.stay_durations
+    st.sidebar.json(model.stats())  # yükleme, ısınma ve ilk kare süreleri
+    zone_durations = pipeline.aggregator.zone_durations
 
     # Kalma süreleri ve bölge analiz sonuçlarını göster
     st.subheader("Kalma Süresi Analizi")
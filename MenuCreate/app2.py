@@ -1,10 +1,15 @@
+import sys
+from pathlib import Path
+
 import streamlit as st
-import cv2
 import numpy as np
-import time
-from ultralytics import YOLO
 import matplotlib.pyplot as plt
-import seaborn as sns
+
+# engine paketi bir üst dizinde
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from engine import (ResultCache, UploadStore, cached_analysis, load_zones, read_events, registry,  # noqa: E402
+                    render_heatmap)
+from engine.events import KINDS  # noqa: E402
 
 st.set_page_config(page_title="Mekansal Birey Kalma Süresi Analizi", layout="wide")
 
@@ -20,46 +25,27 @@ video_file = st.sidebar.file_uploader("Video Yükleyin", type=["mp4"])
 model_option = st.sidebar.selectbox("Modeli Seçin", ["yolov8n", "yolov8s", "yolov8m"])
 
 st.sidebar.markdown("### Ekstra Ayarlar")
+dwell_threshold = st.sidebar.number_input("Uzun kalış eşiği (saniye)", min_value=1.0, value=60.0, step=5.0)
 
 # Load and process the video
 if video_file is not None:
+    # Yüklemeyi parça parça oturuma özel geçici dosyaya al (özet de bu sırada hesaplanır)
+    video = st.session_state.setdefault("uploads", UploadStore()).ingest(video_file)
     st.video(video_file)
-    cap = cv2.VideoCapture(video_file.name)
 
-    # Load YOLO model
-    model = YOLO(f"{model_option}.pt")
+    # Process the video and calculate stay durations; switching back to a model that was
+    # already run on this video loads the cached result instead of re-running YOLO
+    preview = st.empty()  # tek yer tutucu; önizleme sınırlı hızda güncellenir
+    zones = load_zones(Path(__file__).resolve().parent.parent / "zones.json")
+    analysis = cached_analysis(video.path, f"{model_option}.pt", ResultCache(), zones=zones, preview=preview.image,
+                               video_digest=video.digest, dwell_threshold=dwell_threshold, history=True)
     st.write(f"Yüklenen model: {model_option}")
 
-    # Process the video and calculate stay durations
-    stay_times = {}
-    stay_durations = {}
-
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        results = model(frame)
-
-        for result in results:
-            boxes = result.boxes
-            for box in boxes:
-                x1, y1, x2, y2 = box.xyxy[0].tolist()
-                id = box.id
-
-                if id not in stay_times:
-                    stay_times[id] = time.time()
-
-                stay_duration = time.time() - stay_times[id]
-                stay_durations[id] = stay_duration
-
-                cv2.putText(frame, f"ID: {id}, Time: {stay_duration:.2f}s", (int(x1), int(y1) - 10),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
-                cv2.rectangle(frame, (int(x1), int(y1)), (int(x2), int(y2)), (0, 255, 0), 2)
-
-        st.image(frame, channels="BGR")
-
-    cap.release()
+    stay_durations = analysis["summary"]["stay_durations"]
+    st.sidebar.write(f"Önbellek: {analysis['cached'] or 'yok'}")
+    st.sidebar.json(registry.stats())  # yükleme, ısınma ve ilk kare süreleri
+    if analysis["cached"] is None:
+        st.sidebar.json(analysis["pipeline"].source.stats())  # kuyruk doluluğu: darboğaz çözme mi, çıkarım mı?
 
 # Visualization section
 st.header("Kalma Süresi Analizi")
@@ -72,12 +58,18 @@ if stay_durations:
     plt.hist(durations, bins=5)
     st.pyplot(plt)
 
-    # Heatmap for zone-based analysis
+    # Heatmap of accumulated person-seconds, drawn over the first frame
     st.subheader("Bölgesel Kalma Süresi Analizi")
-    data = np.array(durations).reshape(1, -1)
-    sns.heatmap(data, annot=True, cmap="Blues", xticklabels=["Zone 1", "Zone 2", "Zone 3", "Zone 4"],
-                yticklabels=['Kalma Süresi'])
-    st.pyplot(plt)
+    if analysis["heatmap"] is not None:
+        st.image(render_heatmap(analysis["background"], analysis["heatmap"]), channels="BGR")
+
+    # Bölge başına giriş/çıkış/uzun kalış sayıları; kare başına veri yerine olay kaydından
+    if analysis["events"] is not None:
+        events, names = read_events(analysis["events"])
+        counts = np.zeros((len(names), len(KINDS)), np.int64)
+        np.add.at(counts, (events["zone"], events["kind"]), 1)
+        st.table({zone: dict(zip(["Giriş", "Çıkış", f"> {dwell_threshold:.0f} s kalış"], row.tolist()))
+                  for zone, row in zip(names, counts)})
 
 # Adding CSS styling
 st.markdown("""
@@ -1,9 +1,12 @@
+import sys
+from pathlib import Path
+
 import streamlit as st
-import cv2
-import time
-import numpy as np
 import matplotlib.pyplot as plt
-from ultralytics import YOLO
+
+# engine paketi bir üst dizinde
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from engine import UploadStore, build_pipeline, get_model  # noqa: E402
 
 # Streamlit Ayarları ve Sayfa Başlığı
 st.set_page_config(page_title="Mekansal Birey Kalma Süresi Analizi", layout="wide")
@@ -68,48 +71,22 @@ elif section == "Analiz":
     uploaded_video = st.file_uploader("Bir video yükleyin", type=["mp4", "avi"])
 
     if uploaded_video is not None:
-        video_bytes = uploaded_video.read()
-        st.video(video_bytes)  # Videoyu göster
+        # Yüklemeyi parça parça oturuma özel geçici dosyaya al (özet de bu sırada hesaplanır)
+        video = st.session_state.setdefault("uploads", UploadStore()).ingest(uploaded_video)
+        st.video(uploaded_video)  # Videoyu göster
 
         st.markdown("### Video İşleniyor...")
 
         # YOLO modelini yükle
-        model = YOLO("yolov8n.pt")
+        model = get_model("yolov8n.pt")
 
         # Video üzerinde nesne tespiti ve kalma süresi analizi
-        cap = cv2.VideoCapture(uploaded_video.name)
-
-        stay_times = {}
-        stay_durations = {}
-
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
-
-            # YOLO ile nesne tespiti
-            results = model(frame)
-
-            for result in results:
-                boxes = result.boxes
-                for box in boxes:
-                    x1, y1, x2, y2 = box.xyxy[0].tolist()
-                    id = box.id
-
-                    if id not in stay_times:
-                        stay_times[id] = time.time()
-
-                    stay_duration = time.time() - stay_times[id]
-                    stay_durations[id] = stay_duration
-
-                    # Görselleştirme
-                    cv2.putText(frame, f"ID: {id}, Time: {stay_duration:.2f}s", (int(x1), int(y1) - 10),
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
-                    cv2.rectangle(frame, (int(x1), int(y1)), (int(x2), int(y2)), (0, 255, 0), 2)
-
-            st.image(frame, channels="BGR")  # Kareyi Streamlit'te göster
+        preview = st.empty()  # tek yer tutucu; önizleme sınırlı hızda güncellenir
+        pipeline = build_pipeline(video.path, model, annotate=False, preview=preview.image, history=True)
+        pipeline.run()
 
-        cap.release()
+        stay_durations = pipeline.aggregator.stay_durations
+        st.sidebar.json(model.stats())  # yükleme, ısınma ve ilk kare süreleri
 
         # Kalma sürelerini göster
         st.markdown("### Bireylerin kalma süreleri:")
@@ -149,5 +126,4 @@ elif section == "Video Analizi":
     uploaded_video = st.file_uploader("Bir video yükleyin", type=["mp4", "avi"])
 
     if uploaded_video is not None:
-        video_bytes = uploaded_video.read()
-        st.video(video_bytes)
+        st.video(uploaded_video)
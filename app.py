@@ -1,9 +1,83 @@
-import streamlit as st
-import cv2
+import os
 import time
+from pathlib import Path
+
+import streamlit as st
 import numpy as np
 import matplotlib.pyplot as plt
-from ultralytics import YOLO
+
+from engine import (DetectionLog, OccupancyRollup, UploadStore, build_live_pipeline, get_model, job_queue, load_zones,
+                    read_events, registry, render_heatmap, serve_metrics)
+from engine.events import DWELL
+
+# Prometheus ölçümleri yerelde /metrics altında (süreç başına bir kez başlatılır)
+serve_metrics(int(os.environ.get("ENGINE_METRICS_PORT", 9108)))
+
+PRIORITIES = {"Düşük": -1, "Normal": 0, "Yüksek": 1}
+STEPS = {"1 sn": 1, "1 dk": 60, "5 dk": 300, "15 dk": 900, "1 sa": 3600}
+DWELL_ALERT_SECONDS = 60.0  # bir bölgede bundan uzun kalışlar olay kaydında ayrıca işaretlenir
+EVENT_LABELS = ("Giriş", "Çıkış", "Uzun kalış")
+STATUS_LABELS = {"queued": "sırada", "running": "işleniyor", "done": "tamamlandı", "failed": "başarısız",
+                 "cancelled": "iptal edildi"}
+
+
+def submit_analysis(name, video, priority):
+    """Yüklenen videoyu bölgeler ve modelle analiz kuyruğuna ekler; iş kimliğini döndürür."""
+    zones = load_zones(Path(__file__).resolve().parent / "zones.json")
+    return job_queue.submit(name, video.path, "../../yolov8n.pt", priority, zones=zones, video_digest=video.digest,
+                            dwell_threshold=DWELL_ALERT_SECONDS, history=True)  # sayfa bireyleri tek tek listeler
+
+
+def show_job(job):
+    """İşin ilerlemesini ya da (bittiyse) sonuçlarını gösterir.
+
+    İş sürüyorsa sayfa bir saniye sonra yeniden çalıştırılır; ilerleme böyle güncellenir.
+    """
+    st.write(f"İş {job.id} ({job.name}): {STATUS_LABELS[job.status]}")
+    if job.status in ("queued", "running"):
+        position = job_queue.position(job.id)
+        if position is not None:
+            text = f"Önünde {position} iş var"
+        else:
+            text = f"{job.frames}/{job.total_frames} kare, {job.fps:.1f} kare/s"
+            if job.eta is not None:
+                text += f", kalan ~{job.eta:.0f} s"
+        st.progress(job.progress, text=text)
+        if job.preview is not None:
+            st.image(job.preview)  # son önizleme karesi (saniyede en fazla birkaç kez yenilenir)
+        if st.button("İptal et", key=f"cancel-{job.id}"):
+            job_queue.cancel(job.id)
+        if job.metrics is not None:
+            st.sidebar.subheader("Hat Ölçümleri")
+            st.sidebar.json(job.metrics)  # aşama süreleri, gecikme ve sayaçlar
+        time.sleep(1)
+        st.rerun()
+    elif job.status == "failed":
+        st.error(job.error)
+    elif job.status == "done":
+        analysis = job_queue.result(job.id)
+        stay_durations = analysis["summary"]["stay_durations"]
+        # Sonuçlar ve Rapor bölümü için oturumda sakla
+        st.session_state["analysis"] = {
+            "zone_durations": analysis["summary"]["zone_durations"],
+            "heatmap": analysis["heatmap"],
+            "background": analysis["background"],
+            "log": analysis["log"],
+            "rollup": analysis.get("rollup"),
+            "events": analysis.get("events"),
+        }
+        st.sidebar.write(f"Önbellek: {analysis['cached'] or 'yok'}")
+        st.sidebar.json(registry.stats())  # yükleme, ısınma ve ilk kare süreleri
+
+        # Kalma sürelerini göster
+        dwell = analysis["summary"].get("dwell")  # önceki sürümlerin kayıtlarında yok
+        if dwell is not None:
+            all_stays = dwell["all"]
+            st.write(f"{all_stays['count']} birey; kalma süresi medyanı {all_stays['p50']:.2f} s, "
+                     f"p90 {all_stays['p90']:.2f} s, p99 {all_stays['p99']:.2f} s.")
+        st.write("Bireylerin kalma süreleri:")
+        for id, duration in stay_durations.items():
+            st.write(f"Birey {id} toplamda {duration:.2f} saniye kaldı.")
 
 # Sayfa başlığı ve açıklama
 st.title("Mekansal Birey Kalma Süresi Analizi")
@@ -27,7 +101,7 @@ Gerekenler:
 """)
 
 # Bölümler arasında gezinti
-section = st.sidebar.selectbox("Bölüm Seçin", ["Giriş", "Analiz", "Sonuçlar ve Rapor", "Video Analizi"])
+section = st.sidebar.selectbox("Bölüm Seçin", ["Giriş", "Analiz", "Sonuçlar ve Rapor", "Video Analizi", "Canlı Yayın"])
 
 # Giriş Bölümü
 if section == "Giriş":
@@ -46,58 +120,24 @@ elif section == "Analiz":
 
     # Video Yükleme ve İşleme
     uploaded_video = st.file_uploader("Bir video yükleyin", type=["mp4", "avi"])
+    priority = PRIORITIES[st.selectbox("Öncelik", list(PRIORITIES), index=1)]
 
     if uploaded_video is not None:
-        video_bytes = uploaded_video.read()
+        # Yüklemeyi parça parça oturuma özel geçici dosyaya al (özet de bu sırada hesaplanır)
+        video = st.session_state.setdefault("uploads", UploadStore()).ingest(uploaded_video)
 
         # OpenCV ile video işleme
-        st.video(video_bytes)  # Videoyu göster
-
-        # Analiz işlemlerini başlat
-        st.write("Video işleniyor...")
-
-        # YOLO modelini yükle
-        model = YOLO("../../yolov8n.pt")
-
-        # Video üzerinde nesne tespiti ve kalma süresi analizi
-        cap = cv2.VideoCapture(uploaded_video.name)
-
-        stay_times = {}
-        stay_durations = {}
-
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
-
-            # YOLO ile nesne tespiti
-            results = model(frame)
+        st.video(uploaded_video)  # Videoyu göster
 
-            for result in results:
-                boxes = result.boxes
-                for box in boxes:
-                    x1, y1, x2, y2 = box.xyxy[0].tolist()
-                    id = box.id
+        # Analiz arka planda, paylaşılan iş kuyruğunda çalışır; betiğin yeniden çalışması onu kesmez.
+        # Aynı video, model ve ayarlarla daha önce yapılmışsa sonuç önbellekten gelir
+        if st.button("Analizi başlat"):
+            st.query_params["job"] = submit_analysis(uploaded_video.name, video, priority)
 
-                    if id not in stay_times:
-                        stay_times[id] = time.time()
-
-                    stay_duration = time.time() - stay_times[id]
-                    stay_durations[id] = stay_duration
-
-                    # Görselleştirme
-                    cv2.putText(frame, f"ID: {id}, Time: {stay_duration:.2f}s", (int(x1), int(y1) - 10),
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
-                    cv2.rectangle(frame, (int(x1), int(y1)), (int(x2), int(y2)), (0, 255, 0), 2)
-
-            st.image(frame, channels="BGR")  # Kareyi Streamlit'te göster
-
-        cap.release()
-
-        # Kalma sürelerini göster
-        st.write("Bireylerin kalma süreleri:")
-        for id, duration in stay_durations.items():
-            st.write(f"Birey {id} toplamda {duration:.2f} saniye kaldı.")
+    # İş kimliği adres çubuğunda tutulur; sayfa yenilense de iş ve sonucu bulunur
+    job = job_queue.get(st.query_params.get("job", ""))
+    if job is not None:
+        show_job(job)
 
 # Sonuçlar ve Rapor Bölümü
 elif section == "Sonuçlar ve Rapor":
@@ -107,16 +147,79 @@ elif section == "Sonuçlar ve Rapor":
     Bu tür analizler, güvenlik ve yoğunluk yönetimi açısından önemlidir.
     """)
 
-    # Örnek grafik oluşturma
-    st.write("Bölgelerde Kalma Süresi Analizi")
-    zones = ["Zone 1", "Zone 2", "Zone 3", "Zone 4"]
-    durations = [30, 90, 0, 0]
-
-    plt.bar(zones, durations)
-    plt.xlabel('Bölgeler')
-    plt.ylabel('Toplam Kalma Süresi (saniye)')
-    plt.title('Bölgelerde Kalma Süresi Analizi')
-    st.pyplot(plt)
+    analysis = st.session_state.get("analysis")
+    if analysis is None:
+        st.info("Sonuçları görmek için önce Analiz bölümünde bir video işleyin.")
+    else:
+        st.write("Bölgelerde Kalma Süresi Analizi")
+        zone_durations = analysis["zone_durations"]
+
+        plt.bar(list(zone_durations), list(zone_durations.values()))
+        plt.xlabel('Bölgeler')
+        plt.ylabel('Toplam Kalma Süresi (saniye)')
+        plt.title('Bölgelerde Kalma Süresi Analizi')
+        st.pyplot(plt)
+
+        # Isı haritası: bireylerin ayak noktalarında biriken kişi-saniye
+        if analysis["heatmap"] is not None:
+            st.write("Kalma Süresi Isı Haritası")
+            st.image(render_heatmap(analysis["background"], analysis["heatmap"]), channels="BGR")
+
+        # Zaman kovaları: her aralık ve adım için diskteki özet dizilerden, video yeniden işlenmeden
+        rollup = OccupancyRollup.load(analysis["rollup"]) if analysis.get("rollup") is not None else None
+        if rollup is not None and rollup.duration():
+            st.write("Zaman Aralıklarına Göre Bölge Doluluğu")
+            step = STEPS[st.selectbox("Adım", list(STEPS), index=2)]
+            window = st.slider("Aralık (saniye)", 0, rollup.duration(), (0, rollup.duration()), key="rollup-window")
+            buckets = rollup.query(*window, step=step)
+
+            plt.figure()
+            for zone, occupancy in zip(rollup.names, buckets["occupancy"].T):
+                plt.step(buckets["time"], occupancy, where="post", label=zone)
+            plt.xlabel('Zaman (saniye)')
+            plt.ylabel('Ortalama Kişi Sayısı')
+            plt.legend()
+            st.pyplot(plt)
+
+            entries, exits = buckets["entries"].sum(axis=0), buckets["exits"].sum(axis=0)
+            dwell = buckets["dwell_seconds"].sum(axis=0)
+            st.table({zone: {"Giriş": int(entries[i]), "Çıkış": int(exits[i]),
+                             "En yüksek doluluk": int(buckets["peak"][:, i].max(initial=0)),
+                             "Ortalama kalma (saniye)": round(float(dwell[i] / exits[i]) if exits[i] else 0.0, 1)}
+                      for i, zone in enumerate(rollup.names)})
+
+        # Bölge olayları: yalnızca giriş/çıkış ve uzun kalış geçişleri, kare başına veri değil
+        if analysis.get("events") is not None:
+            events, names = read_events(analysis["events"])
+            alerts = events[events["kind"] == DWELL]
+            st.write(f"Bölge Olayları ({len(events)} olay, {len(alerts)} uzun kalış > {DWELL_ALERT_SECONDS:.0f} s)")
+            shown = alerts if st.checkbox("Yalnızca uzun kalışlar") else events
+            st.dataframe([{"Zaman (saniye)": round(float(event["timestamp"]), 1), "Birey": int(event["track"]),
+                           "Bölge": names[event["zone"]], "Olay": EVENT_LABELS[event["kind"]],
+                           "Süre (saniye)": round(float(event["duration"]), 1)} for event in shown[-500:]])
+
+        # Tespit kaydı: dosya bellek eşlemeli açılır, yalnızca seçilen aralık okunur
+        log = DetectionLog(analysis["log"]) if analysis.get("log") is not None else None
+        if log is not None and len(log):
+            st.write("Zamana Göre Kişi Sayısı")
+            end_time = max(log.duration(), 0.1)
+            start, end = st.slider("Zaman aralığı (saniye)", 0.0, end_time, (0.0, end_time))
+            rows = log.time_range(start, end + 1e-6)
+            timestamps, counts = np.unique(rows["timestamp"], return_counts=True)
+
+            plt.figure()
+            plt.plot(timestamps, counts)
+            plt.xlabel('Zaman (saniye)')
+            plt.ylabel('Kişi Sayısı')
+            st.pyplot(plt)
+
+            track_id = st.number_input("Birey numarası", min_value=1, step=1)
+            track = log.track(track_id, start, end + 1e-6)
+            if len(track["frame"]):
+                st.write(f"Birey {track_id} bu aralıkta {track['timestamp'][0]:.2f} - "
+                         f"{track['timestamp'][-1]:.2f} saniyeleri arasında {len(track['frame'])} karede görüldü.")
+            else:
+                st.write(f"Birey {track_id} bu aralıkta görülmedi.")
 
     st.write(""" Grafikteki dağılım incelendiğinde, yatay eksende (X ekseni) toplam kalma süresi (saniye cinsinden) yer almakta ve dikey eksende (Y ekseni) ise frekans (birey sayısı) gösterilmektedir. Görselde yalnızca bir adet sütun bulunmakta ve bu sütun, X ekseninde sıfır değerine karşılık gelmektedir.
 Bu durum, verilerdeki kalma süresinin neredeyse sıfır olduğunu, yani analiz edilen bireylerin tespit edilen alanda çok kısa bir süre kaldıklarını veya tespit edilemediklerini göstermektedir. Ayrıca, kalma süresinin dağılımında çeşitlilik olmadığını da gözlemleyebiliriz; tüm veriler aynı noktada toplanmış.
@@ -136,6 +239,60 @@ elif section == "Video Analizi":
     # Video yükleme ve işleme
     uploaded_video = st.file_uploader("Bir video yükleyin", type=["mp4", "avi"])
 
+    priority = PRIORITIES[st.selectbox("Öncelik", list(PRIORITIES), index=1)]
+
     if uploaded_video is not None:
-        video_bytes = uploaded_video.read()
-        st.video(video_bytes)
+        video = st.session_state.setdefault("uploads", UploadStore()).ingest(uploaded_video)
+        st.video(uploaded_video)
+        if st.button("Kuyruğa ekle"):
+            st.query_params["job"] = submit_analysis(uploaded_video.name, video, priority)
+
+    # Tüm kullanıcıların işleri: bekleyenler iptal edilebilir, bitenlerin sonucu açılabilir
+    st.subheader("İş Kuyruğu")
+    jobs = job_queue.list()
+    for listed in jobs:
+        name, progress, action = st.columns([3, 3, 1])
+        name.write(f"{listed.name} ({listed.id})")
+        progress.progress(listed.progress, text=STATUS_LABELS[listed.status])
+        if listed.status in ("queued", "running"):
+            if action.button("İptal", key=f"list-cancel-{listed.id}"):
+                job_queue.cancel(listed.id)
+        elif listed.status == "done" and action.button("Aç", key=f"open-{listed.id}"):
+            st.query_params["job"] = listed.id
+
+    job = job_queue.get(st.query_params.get("job", ""))
+    if job is not None:
+        show_job(job)
+    if any(listed.status in ("queued", "running") for listed in jobs):
+        time.sleep(1)
+        st.rerun()
+
+# Canlı Yayın Bölümü
+elif section == "Canlı Yayın":
+    st.header("Canlı Yayın")
+    st.write("""
+    Bu bölümde bir kamera akışı (RTSP/HTTP adresi ya da web kamerası numarası) canlı olarak analiz edilir. Analiz yayına yetişemezse aradaki kareler atlanır; bölgelerdeki anlık kişi sayısı ve kalma süreleri sürekli güncellenir.
+    """)
+
+    url = st.text_input("Yayın adresi", "0")
+    replay = st.checkbox("Test: yerel video dosyasını kendi hızında oynat")
+    duration = st.number_input("Süre (saniye)", min_value=10, value=60, step=10)
+
+    if st.button("Başlat"):
+        zones = load_zones(Path(__file__).resolve().parent / "zones.json")
+        preview = st.empty()  # tek yer tutucu; önizleme sınırlı hızda güncellenir
+        occupancy = st.empty()
+
+        def show_report(report):
+            # Bölgelerdeki anlık kişi sayısı ve şimdiye kadarki kişi-saniye
+            occupancy.table({zone: {"Şu an": report["occupancy"][zone],
+                                    "Toplam (kişi-saniye)": round(report["zone_durations"][zone], 1)}
+                             for zone in report["occupancy"]})
+
+        pipeline = build_live_pipeline(url, get_model("../../yolov8n.pt"), zones=zones, report=show_report,
+                                       replay=replay, preview=preview.image)
+        deadline = time.monotonic() + duration
+        for _ in pipeline:
+            if time.monotonic() >= deadline:
+                break
+        st.sidebar.json(pipeline.source.stats())  # yakalanan, analiz edilen ve düşen kareler
@@ -0,0 +1,146 @@
+"""Arayüzden bağımsız, yeniden kullanılabilir kalma süresi analiz motoru.
+
+Streamlit sayfaları ve komut satırı (``python -m engine``) aynı hattı kullanır.
+"""
+from .aggregate import DwellAggregator
+from .backends import available_backends, select_backend
+from .batch import analyze_batch, discover_videos, merge_reports
+from .cache import ResultCache, cached_analysis, file_digest
+from .chunked import analyze_chunked
+from .detector import Detector
+from .detlog import DetectionLog, DetectionLogWriter
+from .events import GRACE, EventLogWriter, ZoneEventEngine, read_events
+from .heatmap import HeatmapAccumulator, render_heatmap
+from .ingest import IngestedVideo, UploadStore
+from .jobs import Job, JobQueue, job_queue
+from .live import LiveReporter, LiveSource, ReplaySource, build_live_pipeline
+from .motion import MotionGate
+from .metrics import PipelineMetrics, render_prometheus, serve_metrics
+from .models import LoadedModel, ModelRegistry, get_model, registry
+from .pipeline import Detections, Frame, FrameResult, Pipeline
+from .rollup import OccupancyRollup
+from .sinks import Annotator, PreviewSink, VideoWriterSink
+from .sketch import DwellStats, QuantileSketch
+from .sources import PrefetchingVideoSource, VideoSource
+from .tiling import TiledDetector
+from .tracker import IouTracker, PassthroughTracker
+from .zones import DEFAULT_ZONES, ZoneMask, load_zones
+
+
+def build_pipeline(video_path, model, zones=None, annotate=None, classes=None,
+                   batch_size=1, max_latency=None, prefetch=8, motion_threshold=None, max_stale=25,
+                   heatmap_cell=16, preview=None, preview_fps=4.0, log_path=None, tile=None, tile_overlap=0.2,
+                   metrics=None, write_video=None, write_scale=1.0, write_every=1, rollup_path=None,
+                   events_path=None, dwell_threshold=None, history=False, grace=GRACE):
+    """Bir video ve yüklenmiş YOLO modeli (tercihen ``get_model`` ile) için standart analiz hattını kurar.
+
+    ``annotate`` her karenin üzerine tespitleri çizer; verilmezse yalnızca ``preview`` yokken
+    açıktır (önizleme yalnızca gönderdiği kareleri kendisi çizer).
+    ``prefetch`` > 0 ise kareler o derinlikte bir kuyrukla arka planda çözülür; 0 kapatır.
+    ``motion_threshold`` verilirse hareketsiz karelerde dedektör atlanır (bkz. ``MotionGate``).
+    ``heatmap_cell`` piksellik hücrelerle ısı haritası biriktirilir; ``None`` kapatır.
+    ``preview`` verilirse (JPEG baytlarını alan bir çağrılabilir) saniyede en fazla
+    ``preview_fps`` kare küçültülmüş önizleme olarak ona gönderilir.
+    ``log_path`` verilirse tüm tespitler oraya sütun bazlı kayıt olarak yazılır (bkz. ``DetectionLog``).
+    ``tile`` verilirse kare o boyutta örtüşen karolarla (yalnızca bölgelerle kesişenler) tespit
+    edilir (bkz. ``TiledDetector``).
+    ``metrics`` bir ``PipelineMetrics`` ise aşamalar zamanlayıcılarla sarılır.
+    ``write_video`` verilirse çizilmiş kareler (``write_scale`` oranında küçültülüp her
+    ``write_every`` karede bir) arka planda o dosyaya kodlanır (bkz. ``VideoWriterSink``).
+    ``rollup_path`` verilirse bölge doluluğu zaman kovalarında toplanıp oraya yazılır
+    (bkz. ``OccupancyRollup``).
+    ``events_path`` verilirse bölge giriş/çıkış olayları (``dwell_threshold`` saniyeyi aşan
+    kalışlar dahil) oraya akış halinde yazılır (bkz. ``ZoneEventEngine``).
+    ``history`` açıksa kimlik başına ham kalma süreleri de tutulur (bkz. ``DwellAggregator``).
+    ``grace`` saniye görülmeyen iz kapanır; kalma toplayıcısı, zaman kovaları ve olaylar bu tek
+    değeri kullanır.
+    """
+    sinks = []
+    if log_path is not None:
+        sinks.append(DetectionLogWriter(log_path, zone_names=list(zones or {})))
+    if rollup_path is not None:
+        sinks.append(OccupancyRollup(zones, rollup_path, grace=grace))
+    if events_path is not None:
+        sinks.append(ZoneEventEngine(zones, dwell_threshold, grace, log_path=events_path))
+    if heatmap_cell:
+        sinks.append(HeatmapAccumulator(heatmap_cell))
+    if write_video is not None:
+        sinks.append(VideoWriterSink(write_video, scale=write_scale, every=write_every, zones=zones))
+    if annotate or (annotate is None and preview is None):
+        sinks.append(Annotator())
+    if preview is not None:
+        sinks.append(PreviewSink(preview, max_fps=preview_fps))
+    source = PrefetchingVideoSource(video_path, prefetch) if prefetch else VideoSource(video_path)
+    if tile:
+        detector = TiledDetector(model, tile, tile_overlap, zones=zones, classes=classes,
+                                 batch_size=batch_size, max_latency=max_latency)
+    else:
+        detector = Detector(model, classes=classes, batch_size=batch_size, max_latency=max_latency)
+    return Pipeline(
+        source=source,
+        detector=detector,
+        tracker=IouTracker(),
+        aggregator=DwellAggregator(zones, grace, history=history),
+        sinks=sinks,
+        gate=MotionGate(motion_threshold, max_stale=max_stale) if motion_threshold is not None else None,
+        metrics=metrics,
+    )
+
+
+__all__ = [
+    "Annotator",
+    "DEFAULT_ZONES",
+    "DetectionLog",
+    "DetectionLogWriter",
+    "Detections",
+    "Detector",
+    "DwellAggregator",
+    "DwellStats",
+    "EventLogWriter",
+    "Frame",
+    "FrameResult",
+    "GRACE",
+    "HeatmapAccumulator",
+    "IngestedVideo",
+    "IouTracker",
+    "Job",
+    "JobQueue",
+    "LiveReporter",
+    "LiveSource",
+    "LoadedModel",
+    "ModelRegistry",
+    "MotionGate",
+    "OccupancyRollup",
+    "PassthroughTracker",
+    "Pipeline",
+    "PipelineMetrics",
+    "PrefetchingVideoSource",
+    "PreviewSink",
+    "QuantileSketch",
+    "ReplaySource",
+    "ResultCache",
+    "TiledDetector",
+    "UploadStore",
+    "VideoSource",
+    "VideoWriterSink",
+    "ZoneEventEngine",
+    "ZoneMask",
+    "analyze_batch",
+    "analyze_chunked",
+    "available_backends",
+    "build_live_pipeline",
+    "build_pipeline",
+    "cached_analysis",
+    "discover_videos",
+    "file_digest",
+    "get_model",
+    "job_queue",
+    "load_zones",
+    "merge_reports",
+    "read_events",
+    "registry",
+    "render_heatmap",
+    "render_prometheus",
+    "select_backend",
+    "serve_metrics",
+]
@@ -0,0 +1,110 @@
+"""Komut satırından arayüzsüz analiz: ``python -m engine havalimani.mp4``."""
+import argparse
+import json
+import time
+
+from . import PipelineMetrics, VideoWriterSink, ZoneEventEngine, build_pipeline, get_model, load_zones, serve_metrics
+from .backends import BACKENDS
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m engine", description="Mekansal birey kalma süresi analizi")
+    parser.add_argument("video", help="analiz edilecek video dosyası")
+    parser.add_argument("--model", default="yolov8n.pt", help="YOLO ağırlık dosyası")
+    parser.add_argument("--backend", choices=["auto", "auto-int8", *BACKENDS],
+                        help="çıkarım arka ucu (varsayılan: ENGINE_BACKEND ya da torch)")
+    parser.add_argument("--classes", type=int, nargs="*", help="yalnızca bu sınıf numaraları (ör. 0 = person)")
+    parser.add_argument("--batch-size", type=int, default=1, help="modele tek çağrıda verilecek kare sayısı")
+    parser.add_argument("--max-latency", type=float, help="yarım dolu grubun en fazla bekleme süresi (saniye)")
+    parser.add_argument("--prefetch", type=int, default=8, help="arka planda çözülen kare kuyruğu derinliği (0 = kapalı)")
+    parser.add_argument("--motion-threshold", type=float,
+                        help="karo başına ortalama gri fark eşiği; altındaki karelerde dedektör atlanır")
+    parser.add_argument("--max-stale", type=int, default=25, help="art arda en fazla kaç kare atlanabilir")
+    parser.add_argument("--tile", type=int, help="kareyi bu boyutta örtüşen karolarla tespit et (ör. 640)")
+    parser.add_argument("--tile-overlap", type=float, default=0.2, help="komşu karoların örtüşme oranı")
+    parser.add_argument("--zones", help="bölge çokgenlerini içeren JSON dosyası (ör. zones.json)")
+    parser.add_argument("--log", help="tespitleri bu dizine sütun bazlı kayıt olarak yaz")
+    parser.add_argument("--rollup", help="bölge doluluğu/giriş/çıkış zaman kovalarını bu .npz dosyasına yaz")
+    parser.add_argument("--events", help="bölge giriş/çıkış olaylarını bu dosyaya yaz (.jsonl ya da ikili)")
+    parser.add_argument("--dwell-threshold", type=float,
+                        help="bir bölgede bu kadar saniyeyi aşan kalışlar için dwell olayı üret (--events ile)")
+    parser.add_argument("--write-video", help="tespitleri çizilmiş videoyu bu dosyaya yaz (.mp4 ya da .avi)")
+    parser.add_argument("--write-scale", type=float, default=1.0, help="yazılan videonun ölçeği (ör. 0.5)")
+    parser.add_argument("--write-every", type=int, default=1, help="yalnızca her k. kareyi yaz")
+    parser.add_argument("--metrics-log", help="çalıştırma ölçümlerini bu dosyaya JSON satırı olarak ekle")
+    parser.add_argument("--metrics-port", type=int, help="Prometheus ölçümlerini bu portta /metrics altında yayınla")
+    parser.add_argument("--per-track", action="store_true",
+                        help="kimlik başına ham kalma sürelerini de tut ve yazdır (uzun kayıtlarda bellek büyür)")
+    parser.add_argument("--json", help="özet sonucu bu dosyaya JSON olarak yaz")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.metrics_port:
+        serve_metrics(args.metrics_port)
+    metrics = PipelineMetrics(args.video, log_path=args.metrics_log) if args.metrics_log or args.metrics_port else None
+    model = get_model(args.model, args.backend)
+    print(f"Model yüklendi ({model.backend}): {model.load_seconds:.2f} s, ısınma: {model.warmup_seconds:.2f} s")
+    pipeline = build_pipeline(args.video, model, zones=load_zones(args.zones) if args.zones else None,
+                              annotate=False, classes=args.classes,
+                              batch_size=args.batch_size, max_latency=args.max_latency,
+                              prefetch=args.prefetch, motion_threshold=args.motion_threshold,
+                              max_stale=args.max_stale, log_path=args.log, rollup_path=args.rollup,
+                              tile=args.tile, tile_overlap=args.tile_overlap, metrics=metrics,
+                              write_video=args.write_video, write_scale=args.write_scale,
+                              write_every=args.write_every, events_path=args.events,
+                              dwell_threshold=args.dwell_threshold, history=args.per_track)
+
+    start = time.perf_counter()
+    frames = 0
+    for _ in pipeline:
+        frames += 1
+    elapsed = time.perf_counter() - start
+    summary = pipeline.aggregator.summary()
+
+    for id, duration in summary["stay_durations"].items():  # yalnızca --per-track ile dolu
+        print(f"Birey {id} toplamda {duration:.2f} saniye kaldı.")
+    stays = summary["dwell"]["all"]
+    print(f"{stays['count']} birey; kalma süresi medyanı {stays['p50']:.2f} s, p90 {stays['p90']:.2f} s, "
+          f"p99 {stays['p99']:.2f} s")
+    for zone, duration in summary["zone_durations"].items():
+        print(f"{zone}: {duration:.2f} saniye")
+    if args.prefetch:
+        stats = pipeline.source.stats()
+        print(f"Kuyruk doluluğu ort. {stats['mean_occupancy']:.1f}/{stats['queue_depth']}, "
+              f"çözücü bekleme {stats['decoder_wait_seconds']:.1f} s, analiz bekleme "
+              f"{stats['consumer_wait_seconds']:.1f} s -> darboğaz: {stats['bound']}")
+    if pipeline.gate is not None:
+        stats = pipeline.gate.stats()
+        print(f"Hareket kapısı: {stats['skipped']}/{stats['frames']} karede dedektör atlandı "
+              f"(%{stats['skipped_percent']:.1f})")
+    tiles = getattr(pipeline.detector, "tiles_run", None)
+    if tiles is not None:
+        print(f"Karolu tespit: {tiles} karo, çağrı başına ort. {tiles / max(pipeline.detector.calls, 1):.1f}")
+    events = pipeline.find(ZoneEventEngine)
+    if events is not None:
+        stats = events.stats()
+        print(f"Bölge olayları: {stats['enter']} giriş, {stats['exit']} çıkış, {stats['dwell']} eşik aşımı "
+              f"-> {args.events}")
+    writer = pipeline.find(VideoWriterSink)
+    if writer is not None:
+        stats = writer.stats()
+        print(f"Video yazıcı: {stats['written']} kare yazıldı, {stats['dropped']} atlandı, "
+              f"{stats['write_fps']:.1f} kare/s ({stats['ms_per_frame']:.1f} ms/kare) -> {args.write_video}")
+    if metrics is not None:
+        for stage, timing in metrics.summary()["stages"].items():
+            print(f"  {stage:<22} {timing['ms_per_item']:8.2f} ms/kare")
+    print(f"İlk kare gecikmesi: {model.first_frame_seconds or 0:.3f} s")
+    print(f"{frames} kare {elapsed:.1f} saniyede işlendi ({frames / max(elapsed, 1e-9):.1f} kare/s)")
+
+    if args.json:
+        summary["frames"] = frames
+        summary["elapsed_seconds"] = elapsed
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
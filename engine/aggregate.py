@@ -0,0 +1,129 @@
+"""Kalma süresi ve bölge toplayıcı aşaması."""
+from collections import OrderedDict
+
+import numpy as np
+
+from .events import GRACE
+from .sketch import DwellStats
+from .zones import ZoneMask
+
+
+class DwellAggregator:
+    """Her kimliğin ilk görüldüğü andan itibaren kalma süresini ve bölge toplamlarını tutar.
+
+    Süreler duvar saatiyle değil karenin video zamanıyla (``Frame.timestamp``) ölçülür; hat
+    gerçek zamandan hızlı da çalışsa, kareler atlansa ya da video parçalara bölünse de
+    aynı sonuçlar çıkar.
+
+    Bölge maskesi ilk karede, videonun gerçek çözünürlüğünde bir kez oluşturulur. Her karede
+    bir bölgede görülen her birey o bölgeye iki kare arasındaki süre kadar katkı yapar;
+    ``zone_durations`` böylece bölgedeki toplam kişi-saniyeyi verir.
+
+    Bellek yalnızca etkin izlerle büyür: ``grace`` saniyedir (video zamanı) görülmeyen izler
+    kapatılır ve kalma süreleri (toplam ve bölge başına) ``DwellStats`` istatistiklerine
+    katlanır; sayı, toplam, en küçük/büyük ve p50/p90/p99 böylece günlerce sabit bellekle
+    tutulur. Ham süreler yalnızca açıkça istenirse (``history=True``) saklanır: her kimliğin son
+    süresi ``stay_durations``da kalır ve özete yazılır (birey listesi gösteren sonlu videolar
+    için). Varsayılan olarak özetin ``stay_durations``ı boştur ve bellek video uzunluğundan
+    bağımsızdır.
+    Kimliği olmayan (-1) kutular kalma istatistiklerine girmez.
+    """
+
+    def __init__(self, zones=None, grace=GRACE, history=False):
+        self.zones = zones or {}
+        self.grace = grace
+        self.history = history
+        self.zone_mask = None
+        self.previous_timestamp = None
+        self.stay_times = {}             # etkin kimlik -> ilk görülme
+        self.last_seen = OrderedDict()   # etkin kimlik -> son görülme (en eskisi başta)
+        self.track_zones = {}            # etkin kimlik -> bölge başına o bölgede geçen süre
+        self.stay_durations = {}
+        self.zone_seconds = np.zeros(len(self.zones), np.float64)
+        self.dwell = DwellStats()        # kapanan izlerin toplam kalma süreleri
+        self.zone_dwell = [DwellStats() for _ in self.zones]  # kapanan izlerin bölgede kalma süreleri
+        self.evicted = 0
+
+    @property
+    def zone_durations(self):
+        return dict(zip(self.zones, self.zone_seconds.tolist()))
+
+    def assign_zones(self, shape, xyxy):
+        if not self.zones:
+            return np.full(len(xyxy), -1, np.intp)
+        height, width = shape[:2]
+        if self.zone_mask is None or (self.zone_mask.width, self.zone_mask.height) != (width, height):
+            self.zone_mask = ZoneMask(self.zones, width, height)
+        return self.zone_mask.lookup(xyxy)
+
+    def __call__(self, results):
+        for result in results:
+            now = result.frame.timestamp
+            detections = result.detections
+            step = now - self.previous_timestamp if self.previous_timestamp is not None else 0.0
+
+            # Bireyin bulunduğu bölgeyi tespit et ve bu kare aralığını bölgeye ekle
+            zones = self.assign_zones(result.frame.shape, detections.xyxy)
+            result.zones = zones
+            inside = zones[zones >= 0]
+            self.zone_seconds += np.bincount(inside, minlength=len(self.zones)) * step
+
+            durations = np.zeros(len(detections), np.float64)
+            for i, (id, zone) in enumerate(zip(detections.ids.tolist(), zones.tolist())):
+                if id < 0:
+                    continue
+                if id not in self.stay_times:
+                    self.stay_times[id] = now  # İlk tespit zamanı
+                    self.track_zones[id] = np.zeros(len(self.zones), np.float64)
+                self.last_seen[id] = now
+                self.last_seen.move_to_end(id)
+                if zone >= 0:
+                    self.track_zones[id][zone] += step
+
+                # Bu alanda kalma süresini hesapla
+                stay_duration = now - self.stay_times[id]
+                self.stay_durations[id] = stay_duration
+                durations[i] = stay_duration
+            result.durations = durations
+            self.previous_timestamp = now
+            self.evict(now)
+            yield result
+
+    def evict(self, now):
+        """``grace`` saniyedir görülmeyen izleri kapatıp istatistiklere katlar (kapanan iz sayısı kadar iş)."""
+        if self.grace is None:
+            return
+        while self.last_seen:
+            id, last = next(iter(self.last_seen.items()))
+            if now - last <= self.grace:
+                break
+            self.close(id)
+
+    def close(self, id):
+        last = self.last_seen.pop(id)
+        self.dwell.add(last - self.stay_times.pop(id))
+        for stats, seconds in zip(self.zone_dwell, self.track_zones.pop(id).tolist()):
+            if seconds > 0:
+                stats.add(seconds)
+        if not self.history:
+            del self.stay_durations[id]
+        self.evicted += 1
+
+    def dwell_stats(self):
+        """``(genel, {bölge: istatistik})``; kapanan izlere ek olarak etkin izler de (o ana kadarki süreleriyle) dahil."""
+        overall = self.dwell.copy()
+        zones = [stats.copy() for stats in self.zone_dwell]
+        if self.last_seen:
+            overall.add([last - self.stay_times[id] for id, last in self.last_seen.items()])
+            seconds = np.stack([self.track_zones[id] for id in self.last_seen])
+            for stats, column in zip(zones, seconds.T):
+                stats.add(column[column > 0])
+        return overall, dict(zip(self.zones, zones))
+
+    def summary(self):
+        overall, zones = self.dwell_stats()
+        return {
+            "stay_durations": dict(self.stay_durations) if self.history else {},
+            "zone_durations": self.zone_durations,
+            "dwell": {"all": overall.to_dict(), "zones": {zone: stats.to_dict() for zone, stats in zones.items()}},
+        }
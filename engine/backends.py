@@ -0,0 +1,158 @@
+"""CPU için çıkarım arka uçları ve otomatik seçim.
+
+Aynı ``.pt`` ağırlıkları Ultralytics ``export`` ile ONNX Runtime ya da OpenVINO IR biçimine
+(isteğe bağlı INT8 nicemleme ile) çevrilir ve yine ``YOLO(yol)`` ile yüklenir; böylece
+dedektör ve çağrı yerleri arka uçtan habersizdir. Dışa aktarılan dosyalar ağırlıkların
+yanında tutulur ve ağırlıklardan yeniyse tekrar üretilmez.
+
+``select_backend`` kurulu arka uçları birkaç örnek görüntüde ölçer, çıktılarını PyTorch
+sonuçlarıyla karşılaştırır ve uyumlu olanlar arasından en hızlısını seçer. Örneklerde PyTorch
+hiç kutu bulmazsa uyum ölçülemez ve PyTorch kullanılır. INT8 yalnızca istenirse adaydır.
+Varsayılan arka uç ``torch``tur; ölçüm yalnızca ``auto`` açıkça istendiğinde yapılır.
+
+Ek arka uçlar isteğe bağlıdır: ``onnx`` + ``onnxruntime``, ``openvino`` ve INT8 için ``nncf``
+kurulu değilse ilgili arka uç listede yer almaz ve PyTorch kullanılır.
+"""
+import glob
+import importlib.util
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from .detector import to_detections
+from .tracker import iou_matrix
+
+# arka uç -> (gerekli modüller, export ayarları)
+BACKENDS = {
+    "torch": ((), None),
+    "onnx": (("onnx", "onnxruntime"), {"format": "onnx"}),
+    "openvino": (("openvino",), {"format": "openvino"}),
+    "openvino-int8": (("openvino", "nncf"), {"format": "openvino", "int8": True}),
+}
+
+# INT8 kalibrasyonu ve ölçüm için projedeki etiketli veri kümesi
+CALIBRATION_DATA = Path(__file__).resolve().parent.parent / "analiz.v2i.yolov8" / "data.yaml"
+
+_selected = {}  # (ağırlık dosyası, adaylar) -> seçilen arka uç (süreç boyunca)
+
+
+def available_backends():
+    """Gerekli paketleri kurulu olan arka uçlar (``torch`` her zaman ilk sıradadır)."""
+    return [name for name, (modules, _) in BACKENDS.items()
+            if all(importlib.util.find_spec(module) for module in modules)]
+
+
+def export_path(weights, backend):
+    """Ultralytics'in ``backend`` için üreteceği dosya/dizin yolu."""
+    weights = Path(weights)
+    if backend == "onnx":
+        return weights.with_suffix(".onnx")
+    if backend == "openvino":
+        return weights.with_name(f"{weights.stem}_openvino_model")
+    if backend == "openvino-int8":
+        return weights.with_name(f"{weights.stem}_int8_openvino_model")
+    return weights
+
+
+def export_weights(weights, backend, data=CALIBRATION_DATA, imgsz=640):
+    """Ağırlıkları ``backend`` biçimine çevirir (gerekirse) ve yüklenecek yolu döndürür."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Bilinmeyen arka uç: {backend}")
+    if backend == "torch":
+        return str(weights)
+    path = export_path(weights, backend)
+    source = Path(weights)
+    if path.exists() and (not source.exists() or path.stat().st_mtime >= source.stat().st_mtime):
+        return str(path)
+
+    from ultralytics import YOLO
+
+    options = dict(BACKENDS[backend][1])
+    if options.get("int8"):
+        options["data"] = str(data)
+    return str(YOLO(str(weights)).export(imgsz=imgsz, verbose=False, **options))
+
+
+def load_backend(weights, backend="torch"):
+    from ultralytics import YOLO
+
+    return YOLO(export_weights(weights, backend), task="detect")
+
+
+def sample_images(count=4, data=CALIBRATION_DATA):
+    """Ölçüm için veri kümesinin doğrulama görüntüleri; bulunamazsa boş kareler."""
+    paths = sorted(glob.glob(str(Path(data).parent / "valid" / "images" / "*")))[:count]
+    images = [image for image in (cv2.imread(path) for path in paths) if image is not None]
+    return images or [np.zeros((640, 640, 3), np.uint8)] * count
+
+
+def agreement(reference, candidate, images, iou_threshold=0.5):
+    """Referans kutularının aday modelce IoU >= ``iou_threshold`` ile bulunma oranı (0-1).
+
+    Hiçbir görüntüde kutu yoksa karşılaştırılacak bir şey yoktur: ``None``.
+    """
+    matched = total = 0
+    for image in images:
+        a = to_detections(reference(image, verbose=False)[0]).xyxy
+        b = to_detections(candidate(image, verbose=False)[0]).xyxy
+        total += max(len(a), len(b))
+        if len(a) and len(b):
+            iou = iou_matrix(a, b)
+            rows, cols = linear_sum_assignment(-iou)
+            matched += int((iou[rows, cols] >= iou_threshold).sum())
+    return matched / total if total else None
+
+
+def benchmark_backends(weights, images=None, backends=None, repeats=3, loader=load_backend):
+    """Her arka uç için kare başına süre ve (``torch`` ölçüldüyse) PyTorch ile uyum oranı.
+
+    Modeller ``loader(ağırlık, arka uç)`` ile yüklenir (ör. ``ModelRegistry.get``).
+    """
+    images = images if images is not None else sample_images()
+    results = {}
+    reference = None
+    for backend in backends or available_backends():
+        try:
+            model = loader(weights, backend)
+            model(images[0], verbose=False)  # ısınma
+        except Exception as exc:  # dışa aktarma ya da yükleme bu makinede desteklenmiyor
+            results[backend] = {"error": str(exc)}
+            continue
+        start = time.perf_counter()
+        for _ in range(repeats):
+            for image in images:
+                model(image, verbose=False)
+        entry = {"seconds_per_frame": (time.perf_counter() - start) / (repeats * len(images))}
+        if backend == "torch":
+            reference = model
+        elif reference is not None:
+            entry["agreement"] = agreement(reference, model, images)
+        results[backend] = entry
+    return results
+
+
+def select_backend(weights, images=None, backends=None, min_agreement=0.9, int8=False, loader=load_backend):
+    """En hızlı uyumlu arka ucu seçer; sonuç süreç boyunca ağırlık dosyası başına saklanır.
+
+    ``backends`` verilmezse kurulu arka uçlar (``int8`` değilse ``openvino-int8`` hariç) ölçülür.
+    PyTorch dışındaki bir aday ancak uyumu ölçülüp ``min_agreement``a ulaşırsa seçilebilir.
+    ``(arka uç, ölçümler)`` döndürür; daha önce seçilmişse ölçümler ``None``dır.
+    """
+    weights = str(weights)
+    backends = tuple(backends or (backend for backend in available_backends()
+                                  if int8 or backend != "openvino-int8"))
+    key = (weights, backends)
+    if key in _selected:
+        return _selected[key], None
+    if len(backends) == 1:  # ölçülecek bir alternatif yok
+        _selected[key] = backends[0]
+        return backends[0], None
+    results = benchmark_backends(weights, images, backends, loader=loader)
+    usable = {backend: entry["seconds_per_frame"] for backend, entry in results.items()
+              if "error" not in entry and (backend == "torch" or (entry.get("agreement") or 0.0) >= min_agreement)}
+    backend = min(usable, key=usable.get) if usable else "torch"
+    _selected[key] = backend
+    return backend, results
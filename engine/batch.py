@@ -0,0 +1,194 @@
+"""Birden çok videonun/kameranın süreç havuzunda paralel analizi.
+
+``python -m engine.batch kameralar/ --model yolov8n.pt --workers 4``
+
+Her çalışan süreç modeli başlangıçta bir kez yükler (``get_model``) ve ardından kendisine
+verilen videoları sırayla işler. Çalışan sayısı çekirdek sayısı ve boş bellekle sınırlanır;
+her çalışanın torch iş parçacığı sayısı da çekirdekler çalışanlar arasında paylaşılacak
+şekilde ayarlanır. Kamera özetleri tek bir saha raporunda birleştirilir.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from .backends import BACKENDS
+from .models import get_model, resolve_backend
+from .sketch import DwellStats
+from .zones import load_zones
+
+VIDEO_SUFFIXES = {".mp4", ".avi", ".mov", ".mkv"}
+
+_worker = {}  # çalışan sürece özel durum: model ve hat ayarları
+
+
+def discover_videos(target):
+    """Dizin ya da manifest -> ``[(kamera adı, video yolu), ...]``.
+
+    Manifest ``{"cameras": [{"name": ..., "video": ...}]}`` biçiminde bir JSON dosyasıdır;
+    göreli yollar manifestin bulunduğu dizine göre çözülür. Dizin verilirse içindeki video
+    dosyaları ada göre sıralanır ve kamera adı olarak dosya adı kullanılır.
+    """
+    target = Path(target)
+    if target.is_dir():
+        return [(path.stem, path) for path in sorted(target.iterdir()) if path.suffix.lower() in VIDEO_SUFFIXES]
+    with open(target, encoding="utf-8") as f:
+        manifest = json.load(f)
+    return [(camera["name"], target.parent / camera["video"]) for camera in manifest["cameras"]]
+
+
+def available_memory():
+    """Kullanılabilir bellek (bayt); bilinmiyorsa ``None``."""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def plan_workers(jobs, max_workers=None, worker_memory=1 << 30):
+    """İş, çekirdek ve bellek sınırlarının en küçüğü kadar çalışan (en az 1)."""
+    limits = [jobs, os.cpu_count() or 1]
+    if max_workers:
+        limits.append(max_workers)
+    memory = available_memory()
+    if memory is not None and worker_memory:
+        limits.append(memory // worker_memory)
+    return max(1, min(limits))
+
+
+def _init_worker(weights, backend, zones, torch_threads, pipeline_kwargs):
+    import torch
+
+    torch.set_num_threads(torch_threads)
+    _worker["model"] = get_model(weights, backend)
+    _worker["zones"] = zones
+    _worker["pipeline_kwargs"] = pipeline_kwargs
+
+
+def _analyze(camera, video_path):
+    from . import build_pipeline
+
+    start = time.perf_counter()
+    pipeline = build_pipeline(video_path, _worker["model"], zones=_worker["zones"], annotate=False,
+                              **_worker["pipeline_kwargs"])
+    frames = sum(1 for _ in pipeline)
+    summary = pipeline.aggregator.summary()
+    summary["frames"] = frames
+    summary["elapsed_seconds"] = time.perf_counter() - start
+    summary["pid"] = os.getpid()
+    return camera, summary
+
+
+def merge_reports(cameras):
+    """Kamera özetlerini (``{kamera: özet}``) saha raporunda birleştirir.
+
+    Takip kimlikleri kameraya özeldir; aynı kişinin kameralar arasında eşlenmesi yapılmaz, bu
+    yüzden saha toplamları "kamera başına görülen birey" üzerinden hesaplanır. Kalma süresi
+    istatistikleri (kantil sketch'leri dahil) kayıpsız birleştirilir.
+    """
+    zone_durations = {}
+    dwell = DwellStats()
+    zone_dwell = {}
+    for summary in cameras.values():
+        for zone, duration in summary["zone_durations"].items():
+            zone_durations[zone] = zone_durations.get(zone, 0.0) + duration
+        dwell.merge(DwellStats.from_dict(summary["dwell"]["all"]))
+        for zone, stats in summary["dwell"]["zones"].items():
+            zone_dwell.setdefault(zone, DwellStats()).merge(DwellStats.from_dict(stats))
+    return {
+        "cameras": cameras,
+        "site": {
+            "cameras": len(cameras),
+            "people": dwell.count,
+            "total_stay_seconds": dwell.total,
+            "mean_stay_seconds": dwell.summary()["mean"],
+            "longest_stay_seconds": dwell.summary()["max"],
+            "zone_durations": zone_durations,
+            "dwell": {"all": dwell.to_dict(), "zones": {zone: stats.to_dict() for zone, stats in zone_dwell.items()}},
+            "frames": sum(summary["frames"] for summary in cameras.values()),
+        },
+    }
+
+
+def analyze_batch(videos, weights, zones=None, max_workers=None, worker_memory=1 << 30, progress=None,
+                  backend=None, **pipeline_kwargs):
+    """``[(kamera, yol), ...]`` videolarını süreç havuzunda analiz edip saha raporunu döndürür.
+
+    ``pipeline_kwargs`` her videonun ``build_pipeline`` çağrısına aynen geçer. ``progress``
+    verilirse her video bittiğinde ``progress(kamera, özet)`` çağrılır. Arka uç (``auto`` ise
+    ölçümle) ana süreçte bir kez seçilir ve dışa aktarılır; çalışanlar yalnızca yükler.
+    """
+    backend = resolve_backend(weights, backend)
+    workers = plan_workers(len(videos), max_workers, worker_memory)
+    torch_threads = max(1, (os.cpu_count() or 1) // workers)
+    start = time.perf_counter()
+    cameras = {}
+    # "spawn": torch ve OpenCV iş parçacıkları olan bir süreçten fork güvenli değil
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"), initializer=_init_worker,
+                             initargs=(str(weights), backend, zones, torch_threads, pipeline_kwargs)) as pool:
+        futures = [pool.submit(_analyze, camera, str(path)) for camera, path in videos]
+        for future in as_completed(futures):
+            camera, summary = future.result()
+            cameras[camera] = summary
+            if progress is not None:
+                progress(camera, summary)
+    report = merge_reports({camera: cameras[camera] for camera, _ in videos})
+    report["site"]["workers"] = workers
+    report["site"]["backend"] = backend
+    report["site"]["elapsed_seconds"] = time.perf_counter() - start
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m engine.batch", description="Çok kameralı toplu analiz")
+    parser.add_argument("target", help="video dizini ya da kamera manifesti (JSON)")
+    parser.add_argument("--model", default="yolov8n.pt", help="YOLO ağırlık dosyası")
+    parser.add_argument("--backend", choices=["auto", "auto-int8", *BACKENDS],
+                        help="çıkarım arka ucu (varsayılan: ENGINE_BACKEND ya da torch)")
+    parser.add_argument("--workers", type=int, help="en fazla çalışan süreç sayısı (varsayılan: çekirdek sayısı)")
+    parser.add_argument("--worker-memory", type=float, default=1.0, help="çalışan başına ayrılan bellek (GiB)")
+    parser.add_argument("--zones", help="bölge çokgenlerini içeren JSON dosyası (ör. zones.json)")
+    parser.add_argument("--classes", type=int, nargs="*", help="yalnızca bu sınıf numaraları (ör. 0 = person)")
+    parser.add_argument("--motion-threshold", type=float,
+                        help="karo başına ortalama gri fark eşiği; altındaki karelerde dedektör atlanır")
+    parser.add_argument("--json", help="saha raporunu bu dosyaya JSON olarak yaz")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    videos = discover_videos(args.target)
+    if not videos:
+        raise SystemExit(f"Video bulunamadı: {args.target}")
+
+    def progress(camera, summary):
+        print(f"{camera}: {summary['dwell']['all']['count']} birey, {summary['frames']} kare, "
+              f"{summary['elapsed_seconds']:.1f} s (süreç {summary['pid']})")
+
+    report = analyze_batch(videos, args.model, zones=load_zones(args.zones) if args.zones else None,
+                           max_workers=args.workers, worker_memory=int(args.worker_memory * (1 << 30)),
+                           progress=progress, backend=args.backend, classes=args.classes,
+                           motion_threshold=args.motion_threshold)
+    site = report["site"]
+    print(f"{site['cameras']} kamera, {site['workers']} çalışan: {site['frames']} kare "
+          f"{site['elapsed_seconds']:.1f} saniyede ({site['frames'] / max(site['elapsed_seconds'], 1e-9):.1f} kare/s)")
+    dwell = site["dwell"]["all"]
+    print(f"Toplam {site['people']} birey, ortalama kalma {site['mean_stay_seconds']:.2f} s "
+          f"(p50/p90/p99 {dwell['p50']:.1f}/{dwell['p90']:.1f}/{dwell['p99']:.1f} s)")
+    for zone, duration in site["zone_durations"].items():
+        print(f"{zone}: {duration:.2f} saniye")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""Depodaki video ve veri kümesiyle uçtan uca hız ölçümü.
+
+``python -m engine.bench --model yolov8n.pt --model yolov8s.pt --json sonuc.json``
+``python -m engine.bench --model yolov8n.pt --baseline sonuc.json``
+
+Her model için iki senaryo çalıştırılır:
+
+* ``video``: ``havalimani.mp4`` tam hattan (çözme, dedektör, takip, bölge toplama, çizim)
+  geçirilir; aşama başına verim, kare gecikmesi yüzdelikleri ve toplam süre ölçülür.
+  Aşamaların ayrı ölçülebilmesi için ön okuma kapalıdır (çözme ana iş parçacığında).
+* ``dataset``: ``analiz.v2i.yolov8`` görüntüleri tek tek modele verilir; görüntü başına
+  gecikme ve etiketlere göre IoU >= 0.5'te kesinlik/duyarlılık ölçülür.
+
+Her model ayrı bir süreçte ölçülür; böylece en yüksek bellek (peak RSS) modeller arasında
+karışmaz. Her şey yerelde ve CPU üzerinde çalışır, ağ gerekmez (ağırlıklar diskte olmalı).
+``--baseline`` ile önceki bir JSON çıktısıyla karşılaştırılır; ``--tolerance``dan fazla
+gerileme varsa çıkış kodu 1 olur.
+"""
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import cv2
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from .backends import BACKENDS, CALIBRATION_DATA
+from .detector import to_detections
+from .metrics import PipelineMetrics
+from .models import get_model
+from .tracker import iou_matrix
+from .zones import load_zones
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_VIDEO = ROOT / "havalimani.mp4"
+DEFAULT_DATASET = CALIBRATION_DATA.parent
+DEFAULT_ZONES = ROOT / "zones.json"
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # Linux'ta KiB
+
+
+def bench_video(model, video, frames=None, batch_size=1, zones=None, tile=None):
+    from . import build_pipeline
+
+    pipeline = build_pipeline(video, model, zones=zones, annotate=True, batch_size=batch_size, prefetch=0, tile=tile)
+    pipeline.source.end = frames
+    pipeline.metrics = PipelineMetrics()
+    for _ in pipeline:
+        pass
+    return pipeline.metrics.summary()
+
+
+def read_labels(path, width, height):
+    """YOLO etiket dosyası (sınıf cx cy w h, normalize) -> (N, 4) piksel xyxy."""
+    try:
+        rows = np.loadtxt(path, ndmin=2)
+    except (OSError, ValueError):
+        return np.zeros((0, 4), np.float32)
+    if rows.size == 0:
+        return np.zeros((0, 4), np.float32)
+    cx, cy, w, h = rows[:, 1] * width, rows[:, 2] * height, rows[:, 3] * width, rows[:, 4] * height
+    return np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1).astype(np.float32)
+
+
+def bench_dataset(model, dataset, classes=(0,), iou_threshold=0.5):
+    paths = sorted(glob.glob(str(Path(dataset) / "*" / "images" / "*")))
+    latencies = []
+    true_positives = predicted = labelled = 0
+    for path in paths:
+        image = cv2.imread(path)
+        if image is None:
+            continue
+        start = time.perf_counter()
+        detections = to_detections(model(image, classes=list(classes), verbose=False)[0])
+        latencies.append(time.perf_counter() - start)
+
+        label_path = Path(path).parent.parent / "labels" / (Path(path).stem + ".txt")
+        labels = read_labels(label_path, image.shape[1], image.shape[0])
+        predicted += len(detections)
+        labelled += len(labels)
+        if len(detections) and len(labels):
+            iou = iou_matrix(labels, detections.xyxy)
+            rows, cols = linear_sum_assignment(-iou)
+            true_positives += int((iou[rows, cols] >= iou_threshold).sum())
+    latencies = np.asarray(latencies) * 1000
+    return {
+        "images": len(latencies),
+        "images_per_second": len(latencies) / (latencies.sum() / 1000) if len(latencies) else 0.0,
+        "latency_ms": {name: float(np.percentile(latencies, q)) if len(latencies) else 0.0
+                       for name, q in (("p50", 50), ("p95", 95), ("p99", 99), ("max", 100))},
+        "precision": true_positives / predicted if predicted else 0.0,
+        "recall": true_positives / labelled if labelled else 0.0,
+    }
+
+
+def run_scenario(weights, backend, video, dataset, frames, batch_size, zones, tile):
+    """Bir modelin tüm ölçümleri; ayrı bir süreçte çağrılmak üzere."""
+    start = time.perf_counter()
+    model = get_model(weights, backend)
+    result = {"weights": str(weights), "backend": model.backend,
+              "load_seconds": model.load_seconds, "warmup_seconds": model.warmup_seconds}
+    if video:
+        result["video"] = bench_video(model, video, frames, batch_size, zones, tile)
+    if dataset:
+        result["dataset"] = bench_dataset(model, dataset)
+    result["wall_seconds"] = time.perf_counter() - start
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def host_info():
+    import torch
+    import ultralytics
+
+    return {
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+        "torch": torch.__version__,
+        "ultralytics": ultralytics.__version__,
+        "opencv": cv2.__version__,
+    }
+
+
+# (yol, daha büyük mü daha iyi) -> karşılaştırılan ölçümler
+COMPARED = {
+    ("video", "fps"): True,
+    ("video", "latency_ms", "p95"): False,
+    ("dataset", "images_per_second"): True,
+    ("dataset", "recall"): True,
+    ("peak_rss_mb",): False,
+}
+
+
+def _lookup(result, path):
+    for key in path:
+        if not isinstance(result, dict) or key not in result:
+            return None
+        result = result[key]
+    return result
+
+
+def compare(current, baseline, tolerance=0.1):
+    """İki çıktıyı senaryo senaryo karşılaştırır -> ``[(senaryo, ölçüm, önceki, şimdiki, değişim, gerileme mi)]``."""
+    rows = []
+    for name, result in current["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            continue
+        for path, higher_is_better in COMPARED.items():
+            before, after = _lookup(previous, path), _lookup(result, path)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            regressed = change < -tolerance if higher_is_better else change > tolerance
+            rows.append((name, ".".join(path), before, after, change, regressed))
+    return rows
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m engine.bench", description="Uçtan uca hız ölçümü")
+    parser.add_argument("--model", action="append", help="ölçülecek ağırlık dosyası (birden çok verilebilir)")
+    parser.add_argument("--backend", choices=["auto", "auto-int8", *BACKENDS], default="torch", help="çıkarım arka ucu")
+    parser.add_argument("--video", default=str(DEFAULT_VIDEO), help="video senaryosu için dosya ('' = atla)")
+    parser.add_argument("--dataset", default=str(DEFAULT_DATASET), help="veri kümesi dizini ('' = atla)")
+    parser.add_argument("--frames", type=int, help="videodan en fazla bu kadar kare")
+    parser.add_argument("--batch-size", type=int, default=1, help="modele tek çağrıda verilecek kare sayısı")
+    parser.add_argument("--tile", type=int, help="karolu tespit boyutu")
+    parser.add_argument("--zones", default=str(DEFAULT_ZONES), help="bölge dosyası ('' = bölgesiz)")
+    parser.add_argument("--json", help="sonuçları bu dosyaya JSON olarak yaz")
+    parser.add_argument("--baseline", help="karşılaştırılacak önceki JSON çıktısı")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="izin verilen göreli gerileme (0.1 = %%10)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    zones = load_zones(args.zones) if args.zones else None
+    report = {"host": host_info(), "settings": {"backend": args.backend, "frames": args.frames,
+                                                 "batch_size": args.batch_size, "tile": args.tile},
+              "scenarios": {}}
+    for weights in args.model or ["yolov8n.pt"]:
+        # her model temiz bir süreçte: peak RSS ve model önbelleği birbirine karışmaz
+        with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            result = pool.submit(run_scenario, weights, args.backend, args.video, args.dataset, args.frames,
+                                 args.batch_size, zones, args.tile).result()
+        name = Path(weights).stem
+        report["scenarios"][name] = result
+
+        print(f"{name} ({result['backend']}): yükleme {result['load_seconds']:.2f} s, "
+              f"peak RSS {result['peak_rss_mb']:.0f} MB, toplam {result['wall_seconds']:.1f} s")
+        if "video" in result:
+            video = result["video"]
+            latency = video["latency_ms"]
+            print(f"  video: {video['frames']} kare, {video['fps']:.1f} kare/s, gecikme p50/p95/p99 "
+                  f"{latency['p50']:.1f}/{latency['p95']:.1f}/{latency['p99']:.1f} ms")
+            for stage, timing in video["stages"].items():
+                print(f"    {stage:<22} {timing['ms_per_item']:8.2f} ms/kare  ({timing['seconds']:.2f} s)")
+        if "dataset" in result:
+            dataset = result["dataset"]
+            print(f"  veri kümesi: {dataset['images']} görüntü, {dataset['images_per_second']:.1f} görüntü/s, "
+                  f"kesinlik {dataset['precision']:.2f}, duyarlılık {dataset['recall']:.2f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare(report, baseline, args.tolerance)
+        for name, metric, before, after, change, regressed in rows:
+            print(f"{'GERİLEME' if regressed else 'tamam':<9} {name} {metric}: {before:.2f} -> {after:.2f} "
+                  f"({change:+.1%})")
+        if any(row[-1] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,356 @@
+"""İçerik adresli, diskte kalıcı analiz sonucu önbelleği.
+
+Anahtarlar videonun içerik özetinden (SHA-256), model ağırlıklarından ve ilgili aşamanın
+parametrelerinden türetilir; dosya adı ya da yüklenme zamanı anahtara girmez. Üç katman
+ayrı ayrı saklanır:
+
+* ``detections``: kare başına kutular ve güven değerleri (video + model + dedektör ayarları)
+* ``tracks``: her kutunun takip kimliği (tespit anahtarı + takipçi ayarları)
+
+  Bu iki katman akış sırasında sütun dosyalarına (``<anahtar>.cols``, bkz. ``ColumnWriter``)
+  eklenerek yazılır ve bellek eşlemeli okunur; kayıt uzunluğu belleği büyütmez.
+* ``summary``: kalma/bölge özeti ve ısı haritası (takip anahtarı + bölgeler + ısı haritası),
+  yanında da kare/iz/bölge bazında sorgulanabilen tespit kaydı (``<anahtar>.detlog``),
+  bölge zaman kovaları (``<anahtar>.rollup.npz``) ve bölge giriş/çıkış olayları (``<anahtar>.events``)
+
+Yalnızca bölgeler değiştiyse kayıtlı tespit ve izler yeniden oynatılır; video hiç çözülmez
+ve model hiç yüklenmez.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from .aggregate import DwellAggregator
+from .detlog import DetectionLogWriter
+from .events import GRACE, ZoneEventEngine
+from .heatmap import HeatmapAccumulator
+from .models import get_model, requested_backend
+from .pipeline import Detections, Frame, FrameResult, Pipeline
+from .rollup import OccupancyRollup
+from .tracker import IouTracker
+
+SUMMARY_VERSION = 4  # özetin biçimi değişince (ör. zaman kovaları, ortak ``grace``) eski özetler kullanılmaz
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """Dosyanın SHA-256 özetini parça parça okuyarak hesaplar."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def make_key(*parts):
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class ResultCache:
+    """Anahtar -> ``.npz`` dosyası; toplam boyut ``max_bytes``ı aşınca en eski kullanılan silinir."""
+
+    def __init__(self, root=None, max_bytes=2 * 1024 ** 3):
+        self.root = Path(root or os.environ.get("ENGINE_CACHE_DIR", ".analysis_cache"))
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return self.root / f"{key}.npz"
+
+    def log_path(self, key):
+        """Bu anahtara ait tespit kaydının (``DetectionLog``) dizini."""
+        return self.root / f"{key}.detlog"
+
+    def columns_path(self, key):
+        """Bu anahtarın akış halinde yazılan sütun dizini (``ColumnWriter``)."""
+        return self.root / f"{key}.cols"
+
+    def columns(self, key):
+        """Anahtara sütun sütun, geçici bir ``.partial`` dizininden yerine taşınarak yazan ``ColumnWriter``."""
+        return ColumnWriter(self.columns_path(key))
+
+    def rollup_path(self, key):
+        """Bu anahtara ait zaman kovalarının (``OccupancyRollup``) dosyası."""
+        return self.root / f"{key}.rollup.npz"
+
+    def events_path(self, key):
+        """Bu anahtara ait bölge olay kaydının (``ZoneEventEngine``) dosyası."""
+        return self.root / f"{key}.events"
+
+    def load(self, key):
+        """Anahtarın dizileri (``.npz`` ya da bellek eşlemeli sütun dizini); yoksa ``None``."""
+        path = self._path(key)
+        try:
+            with np.load(path) as data:
+                arrays = {name: data[name] for name in data.files}
+        except FileNotFoundError:
+            path = self.columns_path(key)
+            if not (path / "meta.json").exists():
+                self.misses += 1
+                return None
+            arrays = read_columns(path)
+        os.utime(path)  # LRU için son kullanım zamanı
+        self.hits += 1
+        return arrays
+
+    def store(self, key, **arrays):
+        path = self._path(key)
+        fd, partial = tempfile.mkstemp(prefix=f"{key}.", suffix=".partial", dir=self.root)  # yazana özel ad
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(partial, path)
+        self.evict()
+
+    def evict(self):
+        paths = [*self.root.glob("*.npz"), *self.root.glob("*.cols"), *self.root.glob("*.detlog"),
+                 *self.root.glob("*.events")]
+        entries = [(entry.stat().st_mtime, entry) for entry in paths]
+        entries.sort(key=lambda item: item[0])
+        sizes = [_size(entry) for _, entry in entries]
+        total = sum(sizes)
+        for (_, entry), size in zip(entries, sizes):
+            if total <= self.max_bytes:
+                break
+            if entry.is_dir():
+                shutil.rmtree(entry, ignore_errors=True)
+            else:
+                entry.unlink()
+            total -= size
+
+
+def _size(path):
+    if path.is_dir():
+        return sum(child.stat().st_size for child in path.iterdir())
+    return path.stat().st_size
+
+
+class ColumnWriter:
+    """Dizileri geçici bir dizindeki ``<sütun>.bin`` dosyalarının sonuna ekler; ``close()`` ile yerine taşır.
+
+    Düzen ``DetectionLog`` ile aynıdır: sabit genişlikli ham sütunlar ve tiplerini, satır
+    şekillerini ve satır sayılarını tutan ``meta.json``. Eklenen diziler doğrudan dosya
+    tamponuna yazılır; bellek kullanımı kayıt uzunluğundan bağımsızdır. ``close(complete=False)``
+    yarım dizini siler.
+
+    Geçici dizin her yazana özeldir (``<yol>.<rastgele>.partial``, aynı üst dizinde) ve tek bir
+    ``rename`` ile yayınlanır; aynı anahtarı eşzamanlı yazan iki iş birbirinin verisini silmez.
+    Hedef dizin o sırada zaten varsa (önce biten iş yayınladı) önbellek isabeti sayılır ve bu
+    yazanın kopyası atılır.
+    """
+
+    def __init__(self, path, buffer_size=1 << 20):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.partial = Path(tempfile.mkdtemp(prefix=f"{self.path.name}.", suffix=".partial", dir=self.path.parent))
+        self.buffer_size = buffer_size
+        self.files = {}
+        self.meta = {}  # sütun -> [tip, satır şekli, satır sayısı]
+
+    def append(self, name, values, dtype=None):
+        values = np.asarray(values, dtype)
+        if name not in self.files:
+            self.files[name] = open(self.partial / f"{name}.bin", "wb", buffering=self.buffer_size)
+            self.meta[name] = [values.dtype.str, list(values.shape[1:]), 0]
+        self.files[name].write(np.ascontiguousarray(values, self.meta[name][0]).tobytes())
+        self.meta[name][2] += len(values)
+
+    def close(self, complete=True):
+        for f in self.files.values():
+            f.close()
+        self.files = {}
+        if not complete:
+            shutil.rmtree(self.partial, ignore_errors=True)
+            return
+        with open(self.partial / "meta.json", "w", encoding="utf-8") as f:
+            json.dump({"columns": self.meta}, f)
+        try:
+            os.rename(self.partial, self.path)  # dolu bir hedef dizinin üzerine yazmaz
+        except OSError:
+            shutil.rmtree(self.partial, ignore_errors=True)
+            if not (self.path / "meta.json").exists():
+                raise
+
+
+def read_columns(path):
+    """``ColumnWriter`` dizinini açar: sütun adı -> bellek eşlemeli dizi."""
+    path = Path(path)
+    with open(path / "meta.json", encoding="utf-8") as f:
+        meta = json.load(f)["columns"]
+    columns = {}
+    for name, (dtype, shape, rows) in meta.items():
+        if rows == 0:
+            columns[name] = np.empty((0, *shape), dtype)
+        else:
+            columns[name] = np.memmap(path / f"{name}.bin", dtype=dtype, mode="r", shape=(rows, *shape))
+    return columns
+
+
+class CacheRecorder:
+    """Akan tespit ve kimlikleri önbelleğe sütun sütun yazar; akış sonuna kadar tamamlanırsa kaydı yerine koyar.
+
+    Tespitler ``detection_key`` altına, kimlikler ``track_key`` altına ayrı yazılır; anahtarı
+    ``None`` olan katman yazılmaz. Hiçbir şey bellekte biriktirilmez (bkz. ``ColumnWriter``).
+    """
+
+    def __init__(self, cache, detection_key=None, track_key=None):
+        self.cache = cache
+        self.detection_key = detection_key
+        self.track_key = track_key
+
+    def __call__(self, results):
+        detections = self.cache.columns(self.detection_key) if self.detection_key is not None else None
+        tracks = self.cache.columns(self.track_key) if self.track_key is not None else None
+        writers = [writer for writer in (detections, tracks) if writer is not None]
+        frames = 0
+        complete = False
+        try:
+            for result in results:
+                if detections is not None:
+                    if frames == 0:
+                        detections.append("shape", result.frame.shape, np.int64)
+                        if result.frame.image is not None:
+                            detections.append("background", encode_image(result.frame.image))
+                    detections.append("index", [result.frame.index], np.int64)
+                    detections.append("timestamp", [result.frame.timestamp], np.float64)
+                    detections.append("counts", [len(result.detections)], np.int64)
+                    detections.append("xyxy", result.detections.xyxy.reshape(-1, 4), np.float32)
+                    detections.append("confidence", result.detections.confidence, np.float32)
+                if tracks is not None:
+                    tracks.append("ids", result.detections.ids, np.int64)
+                frames += 1
+                yield result
+            complete = frames > 0
+        finally:
+            for writer in writers:
+                writer.close(complete)
+            if complete:
+                self.cache.evict()
+
+
+def replay(record, ids=None):
+    """Önbellekteki tespitleri görüntüsüz ``FrameResult`` akışı olarak yeniden üretir."""
+    offsets = np.concatenate([[0], np.cumsum(record["counts"])])
+    shape = tuple(record["shape"].tolist())
+    for i, (index, timestamp) in enumerate(zip(record["index"].tolist(), record["timestamp"].tolist())):
+        start, end = offsets[i], offsets[i + 1]
+        frame_ids = ids[start:end].copy() if ids is not None else np.full(end - start, -1, np.int64)
+        detections = Detections(record["xyxy"][start:end], record["confidence"][start:end], frame_ids)
+        yield FrameResult(Frame(index, None, timestamp, shape), detections)
+
+
+def encode_image(image):
+    return cv2.imencode(".jpg", image)[1].reshape(-1)
+
+
+def decode_image(data):
+    return cv2.imdecode(data, cv2.IMREAD_COLOR)
+
+
+def cached_analysis(video_path, weights, cache, zones=None, classes=None, motion_threshold=None,
+                    max_stale=25, heatmap_cell=16, preview=None, video_digest=None, backend=None,
+                    tile=None, tile_overlap=0.2, metrics=None, dwell_threshold=None, history=False, grace=GRACE,
+                    **pipeline_kwargs):
+    """Önbellekten yararlanarak analizi çalıştırır; yalnızca parametresi değişen aşamalar yeniden hesaplanır.
+
+    ``{"summary", "heatmap", "background", "cached", "pipeline"}`` döndürür; ``cached`` hangi
+    katmanın önbellekten geldiğini (``"summary"``, ``"tracks"``, ``"detections"`` ya da ``None``),
+    ``pipeline`` çalıştırılan hattı (özet önbellekten geldiyse ``None``), ``log`` tespitlerin
+    yazıldığı ``DetectionLog`` dizinini, ``rollup`` bölge zaman kovalarının (``OccupancyRollup``)
+    dosyasını, ``events`` bölge giriş/çıkış olay kaydını (``dwell_threshold`` saniyeyi aşan kalışlar
+    dahil, bkz. ``read_events``) verir. ``metrics`` (``PipelineMetrics``) verilirse çalıştırılan hat (önbellekten
+    yeniden oynatma dahil) ölçülür. ``history`` açıksa özet kimlik başına ham kalma sürelerini de
+    içerir (birey listesi gösteren sayfalar için). ``grace`` tüm aşamaların ortak iz kapanma süresidir
+    (bkz. ``build_pipeline``).
+    """
+    from . import build_pipeline
+
+    video_digest = video_digest or file_digest(video_path)
+    weights_digest = file_digest(weights) if os.path.isfile(weights) else str(weights)
+    # Anahtara istenen arka uç girer (``auto`` ölçümü yalnızca dedektör gerçekten çalışacaksa yapılır);
+    # ``auto``nun seçebileceği arka uçların tespitleri PyTorch ile uyumlu olmak zorundadır
+    backend = requested_backend(backend)
+    tracker = IouTracker()
+    detection_key = make_key("detections", video_digest, weights_digest, backend, classes,
+                             motion_threshold, max_stale if motion_threshold is not None else None,
+                             tile, tile_overlap if tile else None, zones if tile else None)
+    track_key = make_key("tracks", detection_key, tracker.iou_threshold, tracker.max_distance, tracker.max_misses)
+    aggregator = DwellAggregator(zones, grace, history=history)
+    summary_key = make_key("summary", track_key, zones, heatmap_cell, aggregator.grace, dwell_threshold, history,
+                           SUMMARY_VERSION)
+
+    log_path = cache.log_path(summary_key)
+    rollup_path = cache.rollup_path(summary_key)
+    events_path = cache.events_path(summary_key)
+    stored = cache.load(summary_key)
+    if stored is not None:
+        for path in (log_path, rollup_path, events_path):
+            if path.exists():
+                os.utime(path)
+        return {
+            "summary": decode_summary(str(stored["summary"])),
+            "heatmap": stored["heatmap"] if "heatmap" in stored else None,
+            "background": decode_image(stored["background"]) if "background" in stored else None,
+            "cached": "summary",
+            "pipeline": None,
+            "log": log_path if log_path.exists() else None,
+            "rollup": rollup_path if rollup_path.exists() else None,
+            "events": events_path if events_path.exists() else None,
+        }
+
+    detections = cache.load(detection_key)
+    tracks = cache.load(track_key) if detections is not None else None
+    heatmap = HeatmapAccumulator(heatmap_cell) if heatmap_cell else None
+    log = DetectionLogWriter(log_path, zone_names=list(zones or {}))
+    rollup = OccupancyRollup(zones, rollup_path, grace=grace)
+    events = ZoneEventEngine(zones, dwell_threshold, grace, log_path=events_path)
+    sinks = [log, rollup, events, heatmap] if heatmap else [log, rollup, events]
+    if tracks is not None:
+        cached = "tracks"
+        pipeline = Pipeline(replay(detections, tracks["ids"]), None, None, aggregator, sinks)
+    elif detections is not None:
+        cached = "detections"
+        pipeline = Pipeline(replay(detections), None, tracker, aggregator,
+                            [CacheRecorder(cache, track_key=track_key), *sinks])
+    else:
+        cached = None
+        pipeline = build_pipeline(video_path, get_model(weights, backend), zones=zones, annotate=False, classes=classes,
+                                  motion_threshold=motion_threshold, max_stale=max_stale,
+                                  heatmap_cell=heatmap_cell, preview=preview, tile=tile, tile_overlap=tile_overlap,
+                                  history=history, grace=grace, **pipeline_kwargs)
+        pipeline.tracker = tracker
+        pipeline.sinks[:0] = [CacheRecorder(cache, detection_key, track_key), log, rollup, events]
+        heatmap = pipeline.find(HeatmapAccumulator)
+    pipeline.metrics = metrics
+    summary = pipeline.run()
+
+    arrays = {"summary": np.asarray(json.dumps(summary, ensure_ascii=False))}
+    if heatmap is not None and heatmap.grid is not None:
+        arrays["heatmap"] = heatmap.grid
+    if heatmap is not None and heatmap.background is not None:
+        arrays["background"] = encode_image(heatmap.background)
+    elif detections is not None and "background" in detections:
+        arrays["background"] = detections["background"]
+    cache.store(summary_key, **arrays)
+    return {
+        "summary": summary,
+        "heatmap": arrays.get("heatmap"),
+        "background": decode_image(arrays["background"]) if "background" in arrays else None,
+        "cached": cached,
+        "pipeline": pipeline,
+        "log": log_path,
+        "rollup": rollup_path,
+        "events": events_path,
+    }
+
+
+def decode_summary(text):
+    summary = json.loads(text)
+    summary["stay_durations"] = {int(id): duration for id, duration in summary["stay_durations"].items()}
+    return summary
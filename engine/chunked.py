@@ -0,0 +1,226 @@
+"""Tek bir videonun kare aralıklarına bölünüp paralel analizi.
+
+``python -m engine.chunked kayit.mp4 --model yolov8n.pt --workers 8``
+
+Video ``[start, end)`` kare aralıklarına bölünür ve her parça ayrı bir süreçte (arama ile
+``start``tan başlayarak) tespit edilip takip edilir. Her parça ``overlap`` kare önceden
+başlar; bu ısınma karelerinde önceki parçanın izleriyle kutu eşleştirmesi yapılarak
+(``stitch``) yerel iz kimlikleri genel kimliklere çevrilir. Ardından tüm parçalar sırayla
+tek bir ``DwellAggregator``dan geçirilir; sınırı geçen bireylerin kalma süreleri kesintisiz
+devam eder ve bölge toplamları sıralı çalıştırmayla aynı tespitlerden hesaplanır.
+"""
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from . import batch
+from .aggregate import DwellAggregator
+from .backends import BACKENDS
+from .cache import replay
+from .models import resolve_backend
+from .pipeline import Pipeline
+from .sources import open_capture
+from .tracker import iou_matrix
+from .zones import load_zones
+
+
+def frame_count(video_path):
+    cap = open_capture(str(video_path))
+    try:
+        return int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    finally:
+        cap.release()
+
+
+def plan_chunks(frames, chunks, overlap=25):
+    """``[(ısınma başı, start, end), ...]``; her parça en az ``2 * overlap`` kare uzunluğundadır.
+
+    ``frames`` (``CAP_PROP_FRAME_COUNT``) değişken kare hızlı ya da dizini bozuk dosyalarda
+    yalnızca bir tahmindir; bu yüzden son parçanın sonu ``None``dır ve dosya sonuna kadar okunur.
+    """
+    chunks = max(1, min(chunks, frames // max(2 * overlap, 1)))
+    bounds = np.linspace(0, frames, chunks + 1).round().astype(int).tolist()
+    bounds[-1] = None
+    return [(max(0, start - overlap), start, end) for start, end in zip(bounds[:-1], bounds[1:])]
+
+
+def record_chunk(results):
+    """``FrameResult`` akışını önbellek kaydı biçiminde dizilere toplar (bkz. ``cache.replay``)."""
+    index, timestamp, counts, xyxy, confidence, ids = [], [], [], [], [], []
+    shape = None
+    for result in results:
+        shape = shape or result.frame.shape
+        index.append(result.frame.index)
+        timestamp.append(result.frame.timestamp)
+        counts.append(len(result.detections))
+        xyxy.append(result.detections.xyxy)
+        confidence.append(result.detections.confidence)
+        ids.append(result.detections.ids)
+    return {
+        "index": np.asarray(index, np.int64),
+        "timestamp": np.asarray(timestamp, np.float64),
+        "counts": np.asarray(counts, np.int64),
+        "xyxy": np.concatenate(xyxy).reshape(-1, 4) if xyxy else np.zeros((0, 4), np.float32),
+        "confidence": np.concatenate(confidence) if confidence else np.zeros(0, np.float32),
+        "ids": np.concatenate(ids).astype(np.int64) if ids else np.zeros(0, np.int64),
+        "shape": np.asarray(shape or (0, 0, 3), np.int64),
+    }
+
+
+def _analyze_chunk(video_path, warmup_start, end):
+    from . import build_pipeline
+
+    pipeline = build_pipeline(video_path, batch._worker["model"], annotate=False, heatmap_cell=None,
+                              **batch._worker["pipeline_kwargs"])
+    pipeline.source.start, pipeline.source.end = warmup_start, end
+    pipeline.aggregator = None  # süreler parçalar birleştirildikten sonra hesaplanır
+    return record_chunk(pipeline)
+
+
+def _offsets(record):
+    return np.concatenate([[0], np.cumsum(record["counts"])])
+
+
+def stitch(previous, current, next_id, iou_threshold=0.5):
+    """``current`` parçasının yerel kimliklerini ``previous``un (genel) kimliklerine eşler.
+
+    İki parçanın ortak karelerinde kutular IoU ile eşleştirilir ve her (yerel, genel) çifti
+    için oy sayılır; en çok oyu alan eşleştirme Macar algoritmasıyla seçilir. Eşleşmeyen
+    yerel kimlikler ``next_id``den başlayarak yeni genel kimlik alır (ilk parçada ``previous``
+    ``None``dır). ``(yeni kimlikler, sonraki boş kimlik)`` döndürür.
+    """
+    votes = {}
+    previous_frames = {} if previous is None else {index: i for i, index in enumerate(previous["index"].tolist())}
+    previous_offsets, current_offsets = (None if previous is None else _offsets(previous)), _offsets(current)
+    for i, index in enumerate(current["index"].tolist()):
+        j = previous_frames.get(index)
+        if j is None:
+            continue
+        a = slice(previous_offsets[j], previous_offsets[j + 1])
+        b = slice(current_offsets[i], current_offsets[i + 1])
+        if a.start == a.stop or b.start == b.stop:
+            continue
+        iou = iou_matrix(previous["xyxy"][a], current["xyxy"][b])
+        rows, cols = linear_sum_assignment(-iou)
+        for global_id, local_id, overlap in zip(previous["ids"][a][rows].tolist(), current["ids"][b][cols].tolist(),
+                                                iou[rows, cols].tolist()):
+            if overlap >= iou_threshold and global_id >= 0 and local_id >= 0:
+                votes[local_id, global_id] = votes.get((local_id, global_id), 0) + 1
+
+    mapping = {}
+    if votes:
+        local_ids = sorted({local_id for local_id, _ in votes})
+        global_ids = sorted({global_id for _, global_id in votes})
+        matrix = np.zeros((len(local_ids), len(global_ids)))
+        for (local_id, global_id), count in votes.items():
+            matrix[local_ids.index(local_id), global_ids.index(global_id)] = count
+        rows, cols = linear_sum_assignment(-matrix)
+        for row, col in zip(rows, cols):
+            if matrix[row, col] > 0:
+                mapping[local_ids[row]] = global_ids[col]
+    for local_id in np.unique(current["ids"][current["ids"] >= 0]).tolist():
+        if local_id not in mapping:
+            mapping[local_id] = next_id
+            next_id += 1
+    ids = np.fromiter((mapping.get(id, -1) for id in current["ids"].tolist()), np.int64, len(current["ids"]))
+    return ids, next_id
+
+
+def trim(record, start):
+    """Kaydın ``start`` karesinden önceki (ısınma) kısmını atar."""
+    first = int(np.searchsorted(record["index"], start))
+    row = int(_offsets(record)[first])
+    trimmed = {name: record[name][first:] for name in ("index", "timestamp", "counts")}
+    trimmed.update({name: record[name][row:] for name in ("xyxy", "confidence", "ids")})
+    trimmed["shape"] = record["shape"]
+    return trimmed
+
+
+def merge_chunks(records, starts, zones=None, sinks=(), history=False):
+    """Parça kayıtlarını kimlikleri dikerek birleştirir ve tek toplayıcıdan geçirir -> ``Pipeline``.
+
+    ``history`` toplayıcıya geçer (bkz. ``DwellAggregator``).
+    """
+    merged = []
+    previous = None
+    next_id = 1
+    for record, start in zip(records, starts):
+        record = dict(record)
+        record["ids"], next_id = stitch(previous, record, next_id)
+        previous = record
+        merged.append(trim(record, start))
+    combined = {name: np.concatenate([record[name] for record in merged])
+                for name in ("index", "timestamp", "counts", "xyxy", "confidence", "ids")}
+    combined["shape"] = merged[0]["shape"]
+    return Pipeline(replay(combined, combined["ids"]), None, None, DwellAggregator(zones, history=history), sinks)
+
+
+def analyze_chunked(video_path, weights, zones=None, chunks=None, overlap=25, max_workers=None,
+                    worker_memory=1 << 30, sinks=(), backend=None, history=False, **pipeline_kwargs):
+    """Bir videoyu parçalara bölüp süreç havuzunda analiz eder.
+
+    ``chunks`` verilmezse çalışan sayısı kadar parça kullanılır. ``sinks`` birleştirilmiş
+    akışa (görüntüsüz kareler) eklenir, ör. ``HeatmapAccumulator`` ya da ``DetectionLogWriter``.
+    Özet sonucu, parça sınırları ve süreyle birlikte döndürür.
+    """
+    backend = resolve_backend(weights, backend)
+    frames = frame_count(video_path)
+    workers = batch.plan_workers(chunks or frames, max_workers, worker_memory)
+    plan = plan_chunks(frames, chunks or workers, overlap)
+    torch_threads = max(1, (os.cpu_count() or 1) // workers)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=batch._init_worker,
+                             initargs=(str(weights), backend, None, torch_threads, pipeline_kwargs)) as pool:
+        futures = [pool.submit(_analyze_chunk, str(video_path), warmup_start, end) for warmup_start, _, end in plan]
+        records = [future.result() for future in futures]
+    pipeline = merge_chunks(records, [chunk_start for _, chunk_start, _ in plan], zones, sinks, history)
+    frames = sum(1 for _ in pipeline)
+    summary = pipeline.aggregator.summary()
+    summary["frames"] = frames
+    summary["chunks"] = [[chunk_start, frames if end is None else end] for _, chunk_start, end in plan]
+    summary["workers"] = workers
+    summary["elapsed_seconds"] = time.perf_counter() - start
+    return summary
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m engine.chunked", description="Tek videonun parçalı paralel analizi")
+    parser.add_argument("video", help="analiz edilecek video dosyası")
+    parser.add_argument("--model", default="yolov8n.pt", help="YOLO ağırlık dosyası")
+    parser.add_argument("--backend", choices=["auto", "auto-int8", *BACKENDS],
+                        help="çıkarım arka ucu (varsayılan: ENGINE_BACKEND ya da torch)")
+    parser.add_argument("--workers", type=int, help="en fazla çalışan süreç sayısı (varsayılan: çekirdek sayısı)")
+    parser.add_argument("--chunks", type=int, help="parça sayısı (varsayılan: çalışan sayısı)")
+    parser.add_argument("--overlap", type=int, default=25, help="parça sınırında iz dikmek için ortak kare sayısı")
+    parser.add_argument("--zones", help="bölge çokgenlerini içeren JSON dosyası (ör. zones.json)")
+    parser.add_argument("--classes", type=int, nargs="*", help="yalnızca bu sınıf numaraları (ör. 0 = person)")
+    parser.add_argument("--per-track", action="store_true",
+                        help="kimlik başına ham kalma sürelerini de tut ve yazdır (uzun kayıtlarda bellek büyür)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    summary = analyze_chunked(args.video, args.model, zones=load_zones(args.zones) if args.zones else None,
+                              chunks=args.chunks, overlap=args.overlap, max_workers=args.workers,
+                              backend=args.backend, classes=args.classes, history=args.per_track)
+    for id, duration in summary["stay_durations"].items():  # yalnızca --per-track ile dolu
+        print(f"Birey {id} toplamda {duration:.2f} saniye kaldı.")
+    stays = summary["dwell"]["all"]
+    print(f"{stays['count']} birey; kalma süresi medyanı {stays['p50']:.2f} s, p90 {stays['p90']:.2f} s, "
+          f"p99 {stays['p99']:.2f} s")
+    for zone, duration in summary["zone_durations"].items():
+        print(f"{zone}: {duration:.2f} saniye")
+    print(f"{len(summary['chunks'])} parça, {summary['workers']} çalışan: {summary['frames']} kare "
+          f"{summary['elapsed_seconds']:.1f} saniyede")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""YOLO dedektör aşaması."""
+import time
+
+import numpy as np
+
+from .pipeline import Detections
+
+
+def to_detections(result):
+    """Ultralytics ``Results`` nesnesini NumPy tabanlı ``Detections``a çevirir."""
+    boxes = result.boxes
+    if boxes is None or len(boxes) == 0:
+        return Detections.empty()
+    xyxy = boxes.xyxy.cpu().numpy().astype(np.float32)
+    confidence = boxes.conf.cpu().numpy().astype(np.float32)
+    if boxes.id is None:
+        ids = np.full(len(xyxy), -1, np.int64)
+    else:
+        ids = boxes.id.cpu().numpy().astype(np.int64)
+    return Detections(xyxy, confidence, ids)
+
+
+class Detector:
+    """Kareleri YOLO modelinden geçirip tespitleri sonuca ekler.
+
+    ``batch_size`` > 1 olduğunda kareler biriktirilir ve modele tek çağrıda liste olarak
+    verilir; ön işleme, tensör hazırlığı ve NMS maliyeti kareler arasında paylaşılır.
+    Sonuçlar geliş sırasıyla tek tek geri verilir, sonraki aşamalar değişmez.
+    İlk karenin bekleme süresi ``max_latency`` saniyeyi aşarsa yarım dolu grup da işlenir
+    (kontrol her yeni kare geldiğinde yapılır). Hareket kapısının atladığı kareler de gruba
+    sayılır; durağan sahnede bile en fazla ``batch_size`` kare bellekte bekler.
+    """
+
+    def __init__(self, model, classes=None, batch_size=1, max_latency=None):
+        if batch_size < 1:
+            raise ValueError("batch_size en az 1 olmalı")
+        self.model = model
+        self.classes = classes
+        self.batch_size = batch_size
+        self.max_latency = max_latency
+        self.last = Detections.empty()
+        self.calls = 0
+
+    def stats(self):
+        return {"calls": self.calls}
+
+    def predict(self, images):
+        self.calls += 1
+        predictions = self.model(images, classes=self.classes, verbose=False)
+        return [to_detections(prediction) for prediction in predictions]
+
+    def __call__(self, results):
+        # Hareket kapısının ``reused`` işaretlediği kareler modele gitmez; sıralarını koruyarak
+        # kendilerinden önceki en son tespitleri alırlar.
+        batch = []
+        started = None
+        for result in results:
+            if result.reused and not batch:
+                result.detections = self.last.copy()
+                yield result
+                continue
+            if not batch:
+                started = time.monotonic()
+            batch.append(result)
+            expired = self.max_latency is not None and time.monotonic() - started >= self.max_latency
+            if len(batch) >= self.batch_size or expired:
+                yield from self._flush(batch)
+                batch = []
+        if batch:
+            yield from self._flush(batch)
+
+    def _flush(self, batch):
+        images = [result.frame.image for result in batch if not result.reused]
+        predictions = iter(self.predict(images) if images else [])
+        for result in batch:
+            if result.reused:
+                result.detections = self.last.copy()
+            else:
+                result.detections = self.last = next(predictions)
+            yield result
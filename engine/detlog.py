@@ -0,0 +1,164 @@
+"""Sütun bazlı, yalnızca sona eklenen ve bellek eşlemeli (memmap) tespit kaydı.
+
+Bir kayıt bir dizindir: her sütun sabit genişlikli ham bir ``<sütun>.bin`` dosyası, ``meta.json``
+ise sütun tiplerini, satır sayısını ve bölge adlarını tutar. Satırlar zaman sırasıyla yazıldığı
+için zaman aralığı sorguları ``searchsorted`` ile, iz sorguları yalnızca ``track`` sütunu
+taranarak yapılır; dosyanın tamamı belleğe okunmaz.
+"""
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+COLUMNS = {
+    "frame": (np.int64, ()),
+    "timestamp": (np.float64, ()),
+    "track": (np.int64, ()),
+    "box": (np.float32, (4,)),
+    "confidence": (np.float32, ()),
+    "zone": (np.int16, ()),
+}
+
+
+class DetectionLogWriter:
+    """Her tespiti bir satır olarak kayda ekleyen hat aşaması.
+
+    Satırlar ``chunk_rows`` büyüklüğünde önceden ayrılmış tamponlarda toplanır ve tampon dolunca
+    sütun dosyalarının sonuna eklenir; bellek kullanımı video uzunluğundan bağımsızdır. Kayıt
+    önce yazana özel geçici bir dizine (``<yol>.<rastgele>.partial``) yazılır ve akış tamamlanınca
+    asıl adına taşınır; aynı yola yazan iki çalıştırma birbirinin verisini silmez ve yayınlanan
+    kayıt her zaman tek bir çalıştırmanın tam kaydıdır.
+    """
+
+    def __init__(self, path, zone_names=(), chunk_rows=65536):
+        self.path = Path(path)
+        self.zone_names = list(zone_names)
+        self.chunk_rows = chunk_rows
+        self.buffers = {name: np.empty((chunk_rows, *shape), dtype) for name, (dtype, shape) in COLUMNS.items()}
+        self.filled = 0
+        self.rows = 0
+        self.partial = None
+        self.files = {}
+
+    def open(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.partial = Path(tempfile.mkdtemp(prefix=f"{self.path.name}.", suffix=".partial", dir=self.path.parent))
+        self.files = {name: open(self.partial / f"{name}.bin", "wb") for name in COLUMNS}
+        self.filled = 0
+        self.rows = 0
+
+    def append(self, result):
+        detections = result.detections
+        count = len(detections)
+        zones = result.zones if result.zones is not None else np.full(count, -1)
+        start = 0
+        while start < count:
+            take = min(count - start, self.chunk_rows - self.filled)
+            rows = slice(self.filled, self.filled + take)
+            self.buffers["frame"][rows] = result.frame.index
+            self.buffers["timestamp"][rows] = result.frame.timestamp
+            self.buffers["track"][rows] = detections.ids[start:start + take]
+            self.buffers["box"][rows] = detections.xyxy[start:start + take]
+            self.buffers["confidence"][rows] = detections.confidence[start:start + take]
+            self.buffers["zone"][rows] = zones[start:start + take]
+            self.filled += take
+            start += take
+            if self.filled == self.chunk_rows:
+                self.flush()
+
+    def flush(self):
+        for name, f in self.files.items():
+            f.write(self.buffers[name][:self.filled].tobytes())
+            f.flush()
+        self.rows += self.filled
+        self.filled = 0
+        meta = {
+            "rows": self.rows,
+            "columns": {name: [np.dtype(dtype).str, list(shape)] for name, (dtype, shape) in COLUMNS.items()},
+            "zones": self.zone_names,
+        }
+        with open(self.partial / "meta.json", "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+    def close(self, complete=True):
+        if complete:
+            self.flush()
+        for f in self.files.values():
+            f.close()
+        self.files = {}
+        if not complete:
+            shutil.rmtree(self.partial, ignore_errors=True)
+            return
+        # Dolu bir dizinin üzerine rename yapılamaz: eski kayıt önce kenara alınır, yenisi tek
+        # adımda yerine konur; yarım bir kayıt hiçbir zaman asıl adda görünmez.
+        stale = Path(tempfile.mkdtemp(prefix=f"{self.path.name}.", suffix=".stale", dir=self.path.parent))
+        try:
+            os.replace(self.path, stale / "log")
+        except FileNotFoundError:
+            pass
+        try:
+            os.rename(self.partial, self.path)
+        except OSError:  # bu arada başka bir yazan yayınladı; onun tam kaydı kalır
+            shutil.rmtree(self.partial, ignore_errors=True)
+            if not self.path.exists():
+                raise
+        finally:
+            shutil.rmtree(stale, ignore_errors=True)
+
+    def __call__(self, results):
+        self.open()
+        complete = False
+        try:
+            for result in results:
+                self.append(result)
+                yield result
+            complete = True
+        finally:
+            self.close(complete)
+
+
+class DetectionLog:
+    """Bir tespit kaydını bellek eşlemeli sütunlar olarak açar."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path / "meta.json", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.rows = meta["rows"]
+        self.zone_names = meta["zones"]
+        self.columns = {}
+        for name, (dtype, shape) in meta["columns"].items():
+            shape = (self.rows, *shape)
+            if self.rows == 0:
+                self.columns[name] = np.empty(shape, dtype)
+            else:
+                self.columns[name] = np.memmap(self.path / f"{name}.bin", dtype=dtype, mode="r", shape=shape)
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def rows_between(self, start, end):
+        """``start <= timestamp < end`` olan satırların dilimi (kopyasız)."""
+        timestamps = self.columns["timestamp"]
+        return slice(int(np.searchsorted(timestamps, start, "left")), int(np.searchsorted(timestamps, end, "left")))
+
+    def time_range(self, start, end):
+        """Zaman aralığındaki satırlar: sütun adı -> memmap görünümü."""
+        rows = self.rows_between(start, end)
+        return {name: column[rows] for name, column in self.columns.items()}
+
+    def track(self, track_id, start=None, end=None):
+        """Bir izin (isteğe bağlı zaman aralığındaki) satırları: sütun adı -> dizi."""
+        rows = self.rows_between(-np.inf if start is None else start, np.inf if end is None else end)
+        indices = rows.start + np.flatnonzero(self.columns["track"][rows] == track_id)
+        return {name: np.asarray(column[indices]) for name, column in self.columns.items()}
+
+    def duration(self):
+        timestamps = self.columns["timestamp"]
+        return float(timestamps[-1]) if self.rows else 0.0
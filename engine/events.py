@@ -0,0 +1,232 @@
+"""Bölge giriş/çıkış olay motoru ve sıkıştırılmış olay kaydı.
+
+``ZoneEventEngine`` her izin şu an hangi bölgede olduğunu tutar ve yalnızca durum
+değişikliklerini olay olarak üretir: ``enter`` (bölgeye girdi), ``exit`` (bölgeden çıktı ya da
+``grace`` saniye görülmedi) ve ``dwell`` (bölgede ``dwell_threshold`` saniyeyi aştı; ziyaret
+başına bir kez). Zamanlar video zamanıdır.
+
+Her karede görünen iz başına tek bir sözlük okuması yapılır; olay, kayıt ve bellek işi yalnızca
+bölgesi değişen izler kadardır. Eşik kontrolü bir son tarih yığınıyla (yalnızca eşiği dolan
+ziyaretler), zaman aşımı da ``DwellAggregator``daki gibi en eski görülme sırasıyla (yalnızca
+kapanan izler) yapılır; bölgeler ya da etkin izler üzerinde kare başına döngü yoktur.
+
+Olaylar ``EventLogWriter`` ile akış halinde yazılır ve alarm/raporlama gibi alt sistemler
+kare başına tespitler yerine bunları okur:
+
+* ``.jsonl``: satır başına bir olay (bölge ve olay adlarıyla)
+* diğer uzantılar: olay başına 31 baytlık ikili kayıtlar (``EVENT_DTYPE``); ``read_events``
+  ile bellek eşlemeli okunur
+
+İki biçimde de ilk satır bölge adlarını içeren JSON başlıktır.
+"""
+import heapq
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+ENTER, EXIT, DWELL = 0, 1, 2
+KINDS = ("enter", "exit", "dwell")
+
+# Bu kadar saniye (video zamanı) görülmeyen iz kapanır. Kalma toplayıcısı, zaman kovaları ve
+# olaylar aynı değeri kullanır; böylece aynı çıkışı üçü de aynı anda görür.
+GRACE = 30.0
+
+EVENT_DTYPE = np.dtype([
+    ("timestamp", "<f8"),
+    ("frame", "<i8"),
+    ("track", "<i8"),
+    ("zone", "<i2"),
+    ("kind", "u1"),
+    ("duration", "<f4"),  # exit/dwell: bölgede geçen süre, enter: 0
+])
+
+
+def make_events(rows):
+    """``(timestamp, frame, track, zone, kind, duration)`` demetleri -> ``EVENT_DTYPE`` dizisi."""
+    return np.array(rows, EVENT_DTYPE) if rows else np.zeros(0, EVENT_DTYPE)
+
+
+class ZoneEventEngine:
+    """Bölge geçişlerini olaya çeviren hat aşaması (toplayıcıdan sonra, ``result.zones`` gerekir).
+
+    ``dwell_threshold`` tek bir süre ya da ``{bölge: süre}`` olabilir; ``None`` ise ``dwell``
+    olayı üretilmez. Olaylar ``result.events``e eklenir, ``log_path`` verilirse kayda yazılır,
+    ``on_event`` verilirse olay dizisiyle çağrılır. Kayıt varsayılan olarak yalnızca akış
+    tamamlanırsa yerine konur (bkz. ``EventLogWriter``; canlı yayınlar için ``atomic=False``).
+    Zaman aşımıyla kapanan izlerin ``exit`` olayı, izin son görüldüğü ana tarihlenir; akış
+    bittiğinde (ya da kesildiğinde) açık ziyaretler de kapatılır.
+    """
+
+    def __init__(self, zones=None, dwell_threshold=None, grace=GRACE, log_path=None, on_event=None, atomic=True):
+        self.names = list(zones or {})
+        if isinstance(dwell_threshold, dict):
+            self.thresholds = [dwell_threshold.get(name) for name in self.names]
+        else:
+            self.thresholds = [dwell_threshold] * len(self.names)
+        self.grace = grace
+        self.log_path = log_path
+        self.atomic = atomic
+        self.on_event = on_event
+        self.reset()
+
+    def reset(self):
+        self.tracks = OrderedDict()  # kimlik -> [bölge, giriş, son görülme, son kare, ziyaret no]; en eskisi başta
+        self.deadlines = []          # (eşik anı, ziyaret no, kimlik) yığını
+        self.visits = 0
+        self.counts = [0] * len(KINDS)
+
+    def stats(self):
+        return {**dict(zip(KINDS, self.counts)), "active": len(self.tracks)}
+
+    def update(self, frame, timestamp, ids, zones):
+        """Bir karenin kimlik ve bölgelerini işler -> o karede oluşan olaylar (``EVENT_DTYPE``)."""
+        tracks = self.tracks
+        events = []
+        for id, zone in zip(ids.tolist(), zones.tolist()):
+            if id < 0:
+                continue
+            track = tracks.get(id)
+            if track is None:
+                track = tracks[id] = [-1, timestamp, timestamp, frame, 0]
+            else:
+                tracks.move_to_end(id)
+                track[2], track[3] = timestamp, frame
+            if track[0] == zone:
+                continue
+            if track[0] >= 0:
+                events.append((timestamp, frame, id, track[0], EXIT, timestamp - track[1]))
+            track[0], track[1], track[4] = zone, timestamp, 0
+            if zone >= 0:
+                events.append((timestamp, frame, id, zone, ENTER, 0.0))
+                if self.thresholds[zone] is not None:
+                    self.visits += 1
+                    track[4] = self.visits
+                    heapq.heappush(self.deadlines, (timestamp + self.thresholds[zone], self.visits, id))
+
+        # Kalma eşiği dolan ziyaretler (bu arada bölgeden çıkmış ya da kapanmışsa ziyaret no tutmaz)
+        while self.deadlines and self.deadlines[0][0] <= timestamp:
+            _, visit, id = heapq.heappop(self.deadlines)
+            track = tracks.get(id)
+            if track is not None and track[4] == visit:
+                events.append((timestamp, frame, id, track[0], DWELL, timestamp - track[1]))
+
+        # ``grace`` saniyedir görülmeyenler son görüldükleri anda çıkar (kapanan iz sayısı kadar iş)
+        while tracks:
+            id, track = next(iter(tracks.items()))
+            if timestamp - track[2] <= self.grace:
+                break
+            del tracks[id]
+            if track[0] >= 0:
+                events.append((track[2], track[3], id, track[0], EXIT, track[2] - track[1]))
+        return self._collect(events)
+
+    def close(self):
+        """Açık tüm ziyaretleri son görülme anlarında kapatır -> çıkış olayları."""
+        events = [(track[2], track[3], id, track[0], EXIT, track[2] - track[1])
+                  for id, track in self.tracks.items() if track[0] >= 0]
+        self.tracks.clear()
+        self.deadlines = []
+        return self._collect(events)
+
+    def _collect(self, events):
+        if len(events) > 1:
+            events.sort(key=lambda event: event[0])  # zaman aşımı çıkışları kare zamanından önce olabilir
+        for event in events:
+            self.counts[event[4]] += 1
+        return make_events(events)
+
+    def __call__(self, results):
+        self.reset()
+        writer = EventLogWriter(self.log_path, self.names, self.atomic) if self.log_path is not None else None
+        complete = False
+        try:
+            for result in results:
+                zones = result.zones if result.zones is not None else np.full(len(result.detections), -1)
+                events = self.update(result.frame.index, result.frame.timestamp, result.detections.ids, zones)
+                result.events = events
+                self._emit(writer, events)
+                yield result
+            complete = True
+        finally:
+            try:
+                self._emit(writer, self.close())  # yayın yarıda kesilse de açık ziyaretler kapanır
+            finally:
+                if writer is not None:
+                    writer.close(complete)
+
+    def _emit(self, writer, events):
+        if not len(events):
+            return
+        if writer is not None:
+            writer.write(events)
+        if self.on_event is not None:
+            self.on_event(events)
+
+
+class EventLogWriter:
+    """Olayları dosyaya akış halinde ekler; biçim uzantıdan seçilir (``.jsonl`` ya da ikili).
+
+    ``atomic`` ise kayıt önce ``<yol>.partial`` dosyasına yazılır ve ``close()`` ile asıl adına
+    taşınır; ``close(complete=False)`` yarım kaydı siler. Böylece iptal edilen ya da hata veren
+    bir çalıştırma geçerli görünen kesik bir kayıt bırakmaz. ``atomic=False`` doğrudan asıl
+    dosyaya yazar (kesilerek biten canlı yayınlarda kayıt o ana kadarki olaylarla kalır).
+    """
+
+    def __init__(self, path, zone_names=(), atomic=True):
+        self.path = Path(path)
+        self.zone_names = list(zone_names)
+        self.json = self.path.suffix.lower() == ".jsonl"
+        self.partial = self.path.with_name(self.path.name + ".partial") if atomic else self.path
+        self.file = open(self.partial, "w" if self.json else "wb", **({"encoding": "utf-8"} if self.json else {}))
+        header = {"format": "engine-events", "version": 1, "zones": self.zone_names}
+        if self.json:
+            self.file.write(json.dumps(header, ensure_ascii=False) + "\n")
+        else:
+            header["dtype"] = EVENT_DTYPE.descr
+            self.file.write(json.dumps(header, ensure_ascii=False).encode() + b"\n")
+        self.written = 0
+
+    def write(self, events):
+        if self.json:
+            for event in events.tolist():
+                timestamp, frame, track, zone, kind, duration = event
+                self.file.write(json.dumps({"timestamp": timestamp, "frame": frame, "track": track,
+                                            "zone": self.zone_names[zone], "event": KINDS[kind],
+                                            "duration": round(duration, 3)}, ensure_ascii=False) + "\n")
+        else:
+            self.file.write(events.tobytes())
+        self.file.flush()  # kaydı izleyen (tail) alt sistemler olayı hemen görsün
+        self.written += len(events)
+
+    def close(self, complete=True):
+        self.file.close()
+        if self.partial == self.path:
+            return
+        if complete:
+            os.replace(self.partial, self.path)
+        else:
+            self.partial.unlink(missing_ok=True)
+
+
+def read_events(path):
+    """Olay kaydını okur -> ``(EVENT_DTYPE dizisi, bölge adları)``; ikili kayıt bellek eşlemeli açılır."""
+    path = Path(path)
+    if path.suffix.lower() == ".jsonl":
+        with open(path, encoding="utf-8") as f:
+            names = json.loads(f.readline())["zones"]
+            rows = [json.loads(line) for line in f if line.strip()]
+        events = np.zeros(len(rows), EVENT_DTYPE)
+        for i, row in enumerate(rows):
+            events[i] = (row["timestamp"], row["frame"], row["track"], names.index(row["zone"]),
+                         KINDS.index(row["event"]), row["duration"])
+        return events, names
+    with open(path, "rb") as f:
+        header = json.loads(f.readline())
+        offset = f.tell()
+    count = (path.stat().st_size - offset) // EVENT_DTYPE.itemsize
+    if count == 0:
+        return np.zeros(0, EVENT_DTYPE), header["zones"]
+    return np.memmap(path, EVENT_DTYPE, "r", offset, (count,)), header["zones"]
@@ -0,0 +1,55 @@
+"""Kalma/yoğunluk ısı haritası."""
+import cv2
+import numpy as np
+
+
+class HeatmapAccumulator:
+    """Takip edilen bireylerin ayak noktalarını küçültülmüş bir float32 ızgarada biriktirir.
+
+    Her karede, takip kimliği olan her birey bulunduğu hücreye kareler arası süre kadar
+    (saniye) ekler; ızgara böylece hücre başına toplam kişi-saniyeyi tutar. Güncelleme tek bir
+    ``np.add.at`` çağrısıdır ve bellek video uzunluğundan bağımsız olarak sabittir.
+    """
+
+    def __init__(self, cell=16):
+        self.cell = cell
+        self.grid = None
+        self.background = None  # üzerine ısı haritası çizilecek ilk kare
+        self.previous_timestamp = None
+
+    def _prepare(self, frame):
+        height, width = frame.shape[:2]
+        self.grid = np.zeros((-(-height // self.cell), -(-width // self.cell)), np.float32)
+        if frame.image is not None:
+            self.background = frame.image.copy()
+
+    def update(self, frame, detections):
+        if self.grid is None:
+            self._prepare(frame)
+        timestamp = frame.timestamp
+        if self.previous_timestamp is not None:
+            tracked = detections.ids >= 0
+            xyxy = detections.xyxy[tracked]
+            rows, cols = self.grid.shape
+            gx = np.clip(((xyxy[:, 0] + xyxy[:, 2]) / 2 / self.cell).astype(np.intp), 0, cols - 1)
+            gy = np.clip((xyxy[:, 3] / self.cell).astype(np.intp), 0, rows - 1)
+            np.add.at(self.grid, (gy, gx), np.float32(timestamp - self.previous_timestamp))
+        self.previous_timestamp = timestamp
+
+    def __call__(self, results):
+        for result in results:
+            self.update(result.frame, result.detections)
+            yield result
+
+    def snapshot(self):
+        """Çalışma sürerken o ana kadarki ızgaranın bir kopyası."""
+        return None if self.grid is None else self.grid.copy()
+
+
+def render_heatmap(image, grid, alpha=0.5):
+    """Izgarayı kare boyutuna büyütüp renk haritasıyla görüntünün üzerine bindirir (BGR)."""
+    peak = float(grid.max()) if grid.size else 0.0
+    scaled = np.zeros(grid.shape, np.uint8) if peak <= 0 else (grid / peak * 255).astype(np.uint8)
+    scaled = cv2.resize(scaled, (image.shape[1], image.shape[0]), interpolation=cv2.INTER_LINEAR)
+    colored = cv2.applyColorMap(scaled, cv2.COLORMAP_JET)
+    return cv2.addWeighted(image, 1 - alpha, colored, alpha, 0)
@@ -0,0 +1,74 @@
+"""Yüklenen videoları parça parça oturuma özel geçici dosyalara alma.
+
+Yükleme hiçbir zaman tek bir ``bytes`` nesnesi olarak okunmaz: ``chunk_size`` baytlık
+parçalar hem diske yazılır hem de SHA-256 özetine eklenir. Böylece dosya çözücüye bir yol
+olarak verilir ve önbellek anahtarı için dosya ikinci kez okunmaz.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+import weakref
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass
+class IngestedVideo:
+    path: Path
+    digest: str
+    size: int
+
+
+def copy_stream(stream, path, chunk_size=1 << 20):
+    """Dosya benzeri ``stream``i ``path``e parça parça kopyalar; ``(sha256, boyut)`` döndürür."""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "wb") as f:
+        for chunk in iter(lambda: stream.read(chunk_size), b""):
+            digest.update(chunk)
+            f.write(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+class UploadStore:
+    """Bir oturumun yüklemelerini tutan geçici dizin.
+
+    Her oturum kendi dizinini alır (kullanıcılar birbirinin dosyasının üzerine yazmaz).
+    Dosyalar içerik özetiyle adlandırılır; aynı yükleme (Streamlit her etkileşimde betiği
+    yeniden çalıştırır) ikinci kez kopyalanmaz. Dizin ``cleanup()`` ile ya da nesne çöpe
+    gittiğinde (ör. oturum kapanınca) silinir.
+    """
+
+    def __init__(self, root=None, chunk_size=1 << 20):
+        root = Path(root or os.environ.get("ENGINE_UPLOAD_DIR", Path(tempfile.gettempdir()) / "engine_uploads"))
+        root.mkdir(parents=True, exist_ok=True)
+        self.directory = Path(tempfile.mkdtemp(prefix="session_", dir=root))
+        self.chunk_size = chunk_size
+        self.videos = {}
+        self._finalizer = weakref.finalize(self, shutil.rmtree, self.directory, True)
+
+    def ingest(self, upload):
+        """Streamlit ``UploadedFile`` (ya da ``name`` özniteliği olan herhangi bir akış) -> ``IngestedVideo``."""
+        key = getattr(upload, "file_id", None) or (upload.name, getattr(upload, "size", None))
+        video = self.videos.get(key)
+        if video is not None and video.path.exists():
+            return video
+
+        suffix = Path(upload.name).suffix.lower()  # çözücü kapsayıcıyı uzantıdan da tanır
+        partial = self.directory / f"upload{suffix}.partial"
+        if hasattr(upload, "seek"):
+            upload.seek(0)
+        digest, size = copy_stream(upload, partial, self.chunk_size)
+        path = self.directory / f"{digest}{suffix}"
+        os.replace(partial, path)
+        if hasattr(upload, "seek"):
+            upload.seek(0)  # st.video gibi sonraki okuyucular için
+
+        video = self.videos[key] = IngestedVideo(path, digest, size)
+        return video
+
+    def cleanup(self):
+        self.videos.clear()
+        self._finalizer()
@@ -0,0 +1,293 @@
+"""Analizleri Streamlit betiğinden bağımsız çalıştıran arka plan iş kuyruğu.
+
+Sayfa analizi kendisi çalıştırmaz: ``job_queue.submit(...)`` ile kuyruğa bir iş ekler ve iş
+kimliğini alır, sonra her yeniden çalışmada ``job_queue.get(kimlik)`` ile ilerlemeyi (işlenen kare,
+kare/s, kalan süre) okur. Kuyruk süreç geneline tektir (``registry`` gibi); sınırlı sayıda
+çalışan iş parçacığı işleri öncelik sırasıyla alır ve modelleri ``get_model`` üzerinden
+paylaşır, yani aynı anda bağlanan kullanıcılar ayrı ayrı model yüklemez. Betiğin yeniden
+çalışması ya da sayfanın kapanması çalışan işi etkilemez.
+
+Her işin durumu ``root`` dizininde ``<kimlik>.json`` olarak, sonuç dizileri (ısı haritası,
+arka plan) ``<kimlik>.npz`` olarak saklanır; biten işlerin sonuçları sayfa yenilense ya da
+süreç yeniden başlasa da okunabilir. Yarıda kalan işler yeniden başlatmada başarısız sayılır.
+"""
+import heapq
+import itertools
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from .cache import ResultCache, cached_analysis, decode_image, encode_image
+from .chunked import frame_count
+from .metrics import PipelineMetrics
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    """İptal istenen çalışan işi hattın içinden durdurmak için fırlatılır."""
+
+
+@dataclass
+class Job:
+    id: str
+    name: str
+    video_path: str
+    weights: str
+    priority: int = 0
+    status: str = QUEUED
+    submitted: float = field(default_factory=time.time)
+    started: float | None = None
+    finished: float | None = None
+    total_frames: int = 0
+    frames: int = 0
+    fps: float = 0.0
+    cached: str | None = None  # sonucun hangi katmanı önbellekten geldi (bkz. ``cached_analysis``)
+    error: str | None = None
+    summary: dict | None = None
+    log: str | None = None
+    rollup: str | None = None
+    events: str | None = None
+    metrics: dict | None = None  # son ``PipelineMetrics`` anlık görüntüsü
+    # yalnızca bellekte tutulanlar
+    options: dict = field(default_factory=dict, repr=False)
+    preview: bytes | None = field(default=None, repr=False)
+    cancel_requested: bool = field(default=False, repr=False)
+
+    @property
+    def progress(self):
+        """0-1 arası ilerleme (toplam kare sayısı bilinmiyorsa 0)."""
+        if self.status == DONE:
+            return 1.0
+        return min(self.frames / self.total_frames, 1.0) if self.total_frames else 0.0
+
+    @property
+    def eta(self):
+        """Tahmini kalan süre (saniye); hız henüz bilinmiyorsa ``None``."""
+        if self.status != RUNNING or self.fps <= 0 or not self.total_frames:
+            return None
+        return max(self.total_frames - self.frames, 0) / self.fps
+
+    def record(self):
+        record = asdict(self)
+        for name in ("options", "preview", "cancel_requested"):
+            del record[name]
+        return record
+
+
+class JobQueue:
+    """Öncelikli, iptal edilebilir ve sonuçları diskte kalıcı analiz kuyruğu.
+
+    En fazla ``max_workers`` iş aynı anda çalışır; çalışan iş parçacıkları ilk ``submit``te
+    başlatılır. ``priority`` büyük olan iş önce alınır, eşitlerde gönderilme sırası korunur.
+    İşler ``cached_analysis`` ile çalışır; aynı video ve ayarlar önbellekteyse iş hemen biter.
+    """
+
+    def __init__(self, root=None, max_workers=2, cache=None, metrics_log=None, update_interval=0.5):
+        if max_workers < 1:
+            raise ValueError("max_workers en az 1 olmalı")
+        self.root = Path(root or os.environ.get("ENGINE_JOBS_DIR", ".analysis_jobs"))
+        self.max_workers = max_workers
+        self.cache = cache
+        self.metrics_log = metrics_log
+        self.update_interval = update_interval
+        self.jobs = {}
+        self._queue = []  # (-öncelik, sıra, kimlik) yığını
+        self._order = itertools.count()
+        self._condition = threading.Condition()
+        self._workers = []
+        self._loaded = False
+
+    def _path(self, job_id, suffix):
+        return self.root / f"{job_id}{suffix}"
+
+    def _save(self, job):
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self._path(job.id, ".json")
+        partial = path.with_suffix(".partial")
+        partial.write_text(json.dumps(job.record(), ensure_ascii=False, default=str), encoding="utf-8")
+        os.replace(partial, path)
+
+    def _load(self):
+        """Diskteki iş kayıtlarını (ilk erişimde bir kez) okur; kilit altında çağrılır."""
+        if self._loaded:
+            return
+        self._loaded = True
+        for path in self.root.glob("*.json"):
+            try:
+                job = Job(**json.loads(path.read_text(encoding="utf-8")))
+            except (OSError, ValueError, TypeError):
+                continue
+            if job.summary is not None:
+                job.summary["stay_durations"] = {int(id): duration
+                                                 for id, duration in job.summary["stay_durations"].items()}
+            if job.status not in FINISHED:  # önceki süreç iş bitmeden kapandı
+                job.status, job.error, job.finished = FAILED, "süreç iş bitmeden yeniden başladı", time.time()
+                self._save(job)
+            self.jobs[job.id] = job
+
+    def submit(self, name, video_path, weights, priority=0, **options):
+        """Analizi kuyruğa ekler ve iş kimliğini döndürür.
+
+        Video işin kendi dosyası olarak ``root``a bağlanır (aynı dosya sistemindeyse kopyalanmadan);
+        yüklemenin geçici dizini oturumla birlikte silinse de iş etkilenmez. ``options``
+        ``cached_analysis``e aynen geçer (``zones``, ``video_digest``, ``backend``...). Açılamayan
+        video için ``IOError`` fırlatılır; bu durumda ``root``a hiçbir şey yazılmaz.
+        """
+        source = Path(video_path)
+        total_frames = frame_count(source)  # açılamayan video hiçbir şey kopyalanmadan reddedilir
+        self.root.mkdir(parents=True, exist_ok=True)
+        job_id = uuid.uuid4().hex[:12]
+        path = self._path(job_id, source.suffix)
+        try:
+            os.link(source, path)
+        except OSError:
+            try:
+                shutil.copyfile(source, path)
+            except BaseException:
+                path.unlink(missing_ok=True)  # yarım kopya kalmasın
+                raise
+        job = Job(job_id, name, str(path), str(weights), priority, total_frames=total_frames, options=options)
+        with self._condition:
+            self._load()
+            self.jobs[job_id] = job
+            self._save(job)
+            heapq.heappush(self._queue, (-priority, next(self._order), job_id))
+            self._start_workers()
+            self._condition.notify()
+        return job_id
+
+    def get(self, job_id):
+        with self._condition:
+            self._load()
+            return self.jobs.get(job_id)
+
+    def list(self):
+        """Tüm işler, en yeni önce."""
+        with self._condition:
+            self._load()
+            return sorted(self.jobs.values(), key=lambda job: job.submitted, reverse=True)
+
+    def position(self, job_id):
+        """Bekleyen bir işin önünde kaç bekleyen iş olduğu; bekleyen değilse ``None``."""
+        with self._condition:
+            waiting = sorted(entry for entry in self._queue if self.jobs[entry[2]].status == QUEUED)
+            ids = [entry[2] for entry in waiting]
+            return ids.index(job_id) if job_id in ids else None
+
+    def cancel(self, job_id):
+        """Bekleyen işi kuyruktan çıkarır; çalışan işe en geç ``update_interval`` içinde durmasını söyler.
+
+        İş zaten bittiyse ``False`` döner.
+        """
+        with self._condition:
+            self._load()
+            job = self.jobs.get(job_id)
+            if job is None or job.status in FINISHED:
+                return False
+            if job.status == QUEUED:  # yığından, sırası geldiğinde atlanarak çıkar
+                job.status, job.finished = CANCELLED, time.time()
+                self._save(job)
+                self._discard(job)
+            else:
+                job.cancel_requested = True
+            return True
+
+    def result(self, job_id):
+        """Biten işin ``{"summary", "heatmap", "background", "log", "rollup", "events", "cached"}`` sonucu.
+
+        İş yoksa ya da bitmediyse ``None``.
+        """
+        job = self.get(job_id)
+        if job is None or job.status != DONE:
+            return None
+        try:
+            with np.load(self._path(job.id, ".npz")) as data:
+                arrays = {name: data[name] for name in data.files}
+        except FileNotFoundError:
+            arrays = {}
+        return {
+            "summary": job.summary,
+            "heatmap": arrays.get("heatmap"),
+            "background": decode_image(arrays["background"]) if "background" in arrays else None,
+            "log": Path(job.log) if job.log is not None and Path(job.log).exists() else None,
+            "rollup": Path(job.rollup) if job.rollup is not None and Path(job.rollup).exists() else None,
+            "events": Path(job.events) if job.events is not None and Path(job.events).exists() else None,
+            "cached": job.cached,
+        }
+
+    def _start_workers(self):
+        self._workers = [worker for worker in self._workers if worker.is_alive()]
+        while len(self._workers) < self.max_workers:
+            worker = threading.Thread(target=self._work, name=f"engine-job-{len(self._workers)}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def _next(self):
+        with self._condition:
+            while True:
+                while self._queue:
+                    job = self.jobs[heapq.heappop(self._queue)[2]]
+                    if job.status == QUEUED:
+                        job.status, job.started = RUNNING, time.time()
+                        self._save(job)
+                        return job
+                self._condition.wait()
+
+    def _work(self):
+        while True:
+            self._run(self._next())
+
+    def _discard(self, job):
+        Path(job.video_path).unlink(missing_ok=True)
+        job.preview = None
+
+    def _run(self, job):
+        def update(snapshot):
+            job.frames, job.fps, job.metrics = snapshot["frames"], snapshot["fps"], snapshot
+            if job.cancel_requested and not snapshot["finished"]:
+                raise JobCancelled(job.id)
+
+        def preview(jpeg):
+            job.preview = jpeg
+
+        if self.cache is None:
+            self.cache = ResultCache()
+        metrics = PipelineMetrics(f"{job.name} [{job.id}]", on_update=update, interval=self.update_interval,
+                                  log_path=self.metrics_log)
+        try:
+            analysis = cached_analysis(job.video_path, job.weights, self.cache, metrics=metrics, preview=preview,
+                                       **job.options)
+        except JobCancelled:
+            job.status = CANCELLED
+        except Exception as exc:
+            job.status, job.error = FAILED, f"{type(exc).__name__}: {exc}"
+        else:
+            arrays = {}
+            if analysis["heatmap"] is not None:
+                arrays["heatmap"] = analysis["heatmap"]
+            if analysis["background"] is not None:
+                arrays["background"] = encode_image(analysis["background"])
+            np.savez(self._path(job.id, ".npz"), **arrays)
+            job.summary, job.cached = analysis["summary"], analysis["cached"]
+            job.log = str(analysis["log"]) if analysis["log"] is not None else None
+            job.rollup = str(analysis["rollup"]) if analysis["rollup"] is not None else None
+            job.events = str(analysis["events"]) if analysis["events"] is not None else None
+            job.frames = max(job.frames, job.total_frames)
+            job.status = DONE
+        job.finished = time.time()
+        with self._condition:
+            self._save(job)
+        self._discard(job)
+
+
+job_queue = JobQueue(max_workers=int(os.environ.get("ENGINE_JOB_WORKERS", 2)),
+                     metrics_log=os.environ.get("ENGINE_METRICS_LOG", "metrics.jsonl"))
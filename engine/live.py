@@ -0,0 +1,295 @@
+"""Canlı yayın kaynakları ve sürekli doluluk raporu.
+
+``python -m engine.live rtsp://kamera/akış --model yolov8n.pt --zones zones.json``
+``python -m engine.live havalimani.mp4 --replay`` (dosyayı kendi FPS'inde canlı gibi oynatır)
+
+Canlı kaynakta kareler arka planda kesintisiz okunur ve tek kareklik bir tampona yazılır;
+analiz her seferinde en yeni kareyi alır (en yeni kazanır). Çıkarım yayına yetişemezse
+aradaki kareler kendiliğinden düşer; böylece gecikme "bir karenin işlenme süresi + bir kare
+aralığı" ile sınırlı kalır ve hiçbir kuyruk büyümez. Düşen kare oranı çıkarım hızına göre
+kendiliğinden ayarlanır.
+"""
+import argparse
+import json
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from .backends import BACKENDS
+from .events import DWELL, GRACE, ZoneEventEngine
+from .pipeline import Frame
+from .sources import open_capture, read_frames
+from .zones import load_zones
+
+
+class LatestFrameSource:
+    """Yakalama iş parçacığının doldurduğu tek kareklik "en yeni kazanır" tamponu olan kaynak.
+
+    Alt sınıflar ``_capture(publish, stop)`` içinde kareleri ``publish(image, timestamp)`` ile
+    yayınlar. Kare sıra numarası yakalanan kare sayısıdır; düşen kareler numaralardaki
+    boşluklardan da görülebilir.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._latest = None
+        self._sequence = 0
+        self._done = False
+        self._error = None
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.captured = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.age_total = 0.0  # karenin yakalanmasından analize verilmesine kadar geçen süre
+
+    def _publish(self, image, timestamp):
+        with self._condition:
+            self._sequence += 1
+            self.captured += 1
+            self._latest = (self._sequence, image, timestamp, time.monotonic())
+            self._condition.notify()
+
+    def _run(self, stop):
+        try:
+            self._capture(self._publish, stop)
+        except Exception as exc:
+            self._error = exc
+        finally:
+            with self._condition:
+                self._done = True
+                self._condition.notify()
+
+    def _capture(self, publish, stop):
+        raise NotImplementedError
+
+    def __iter__(self):
+        self._reset_stats()
+        self._latest, self._sequence, self._done, self._error = None, 0, False, None
+        stop = threading.Event()
+        thread = threading.Thread(target=self._run, args=(stop,), daemon=True)
+        thread.start()
+        last = 0
+        try:
+            while True:
+                with self._condition:
+                    self._condition.wait_for(lambda: self._sequence > last or self._done)
+                    if self._sequence == last:
+                        break
+                    sequence, image, timestamp, captured = self._latest
+                if self._error is not None:
+                    raise self._error
+                self.dropped += sequence - last - 1
+                self.delivered += 1
+                self.age_total += time.monotonic() - captured
+                last = sequence
+                yield Frame(sequence - 1, image, timestamp)
+            if self._error is not None:
+                raise self._error
+        finally:
+            stop.set()
+            thread.join()
+
+    def stats(self):
+        return {
+            "captured": self.captured,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "dropped_percent": 100.0 * self.dropped / max(self.captured, 1),
+            "mean_age_ms": 1000 * self.age_total / max(self.delivered, 1),
+        }
+
+
+class LiveSource(LatestFrameSource):
+    """RTSP/HTTP akışı ya da web kamerası (``"0"`` gibi bir sayı) için canlı kaynak.
+
+    Zaman damgası, kaynağın açıldığı andan itibaren duvar saatidir. Bağlantı koparsa
+    ``reconnect_delay`` saniye sonra yeniden bağlanılır (``reconnect=False`` ise akış biter).
+    """
+
+    def __init__(self, url, reconnect=True, reconnect_delay=2.0):
+        super().__init__()
+        self.url = int(url) if str(url).isdigit() else str(url)
+        self.reconnect = reconnect
+        self.reconnect_delay = reconnect_delay
+        self.reconnects = 0
+
+    def _capture(self, publish, stop):
+        start = time.monotonic()
+        while not stop.is_set():
+            cap = cv2.VideoCapture(self.url)
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # destekleyen arka uçlarda sürücü tamponunu küçült
+            try:
+                while not stop.is_set():
+                    ret, image = cap.read()
+                    if not ret:
+                        break
+                    publish(image, time.monotonic() - start)
+            finally:
+                cap.release()
+            if not self.reconnect:
+                return
+            self.reconnects += 1
+            stop.wait(self.reconnect_delay)
+
+    def stats(self):
+        return {**super().stats(), "reconnects": self.reconnects}
+
+
+class ReplaySource(LatestFrameSource):
+    """Bir video dosyasını kendi FPS'inde (``speed`` katı) canlı yayın gibi oynatan test kaynağı.
+
+    Kareler videodaki zamanlarına göre beklenerek yayınlanır; analiz yavaşsa aradakiler canlı
+    yayındaki gibi düşer. Zaman damgaları videonun kendi zamanıdır.
+    """
+
+    def __init__(self, path, speed=1.0, loop=False):
+        super().__init__()
+        self.path = str(path)
+        self.speed = speed
+        self.loop = loop
+
+    def _capture(self, publish, stop):
+        offset = 0.0
+        while not stop.is_set():
+            cap = open_capture(self.path)
+            start = time.monotonic()
+            last = 0.0
+            try:
+                for frame in read_frames(cap):
+                    delay = start + frame.timestamp / self.speed - time.monotonic()
+                    if delay > 0 and stop.wait(delay):
+                        return
+                    publish(frame.image, offset + frame.timestamp)
+                    last = frame.timestamp
+            finally:
+                cap.release()
+            if not self.loop:
+                return
+            offset += last
+
+
+class LiveReporter:
+    """Her ``interval`` saniyede bir anlık doluluk ve bölge kalma raporu gönderen aşama.
+
+    ``report(rapor)`` şu sözlükle çağrılır: ``timestamp`` (video/yayın zamanı), ``people``
+    (karedeki kişi sayısı), ``occupancy`` (bölge -> şu an içindeki kişi), ``zone_durations``
+    (bölge -> şimdiye kadarki kişi-saniye), ``dwell`` (şu an görünen kimlik -> kalma süresi),
+    ``dwell_stats`` (genel ve bölge başına kalma süresi sayı/ortalama/p50/p90/p99).
+    Toplayıcıdan sonra yer almalıdır.
+    """
+
+    def __init__(self, report, aggregator, interval=1.0):
+        self.report = report
+        self.aggregator = aggregator
+        self.interval = interval
+        self.reports = 0
+        self._next = None
+
+    def snapshot(self, result):
+        zones = result.zones if result.zones is not None else np.full(len(result.detections), -1)
+        names = list(self.aggregator.zones)
+        counts = np.bincount(zones[zones >= 0], minlength=len(names))
+        durations = result.durations if result.durations is not None else np.zeros(len(result.detections))
+        overall, zone_stats = self.aggregator.dwell_stats()
+        return {
+            "timestamp": result.frame.timestamp,
+            "people": len(result.detections),
+            "occupancy": dict(zip(names, counts.tolist())),
+            "zone_durations": self.aggregator.zone_durations,
+            "dwell": {id: duration for id, duration in zip(result.detections.ids.tolist(), durations.tolist())
+                      if id >= 0},
+            "dwell_stats": {"all": overall.summary(),
+                            "zones": {zone: stats.summary() for zone, stats in zone_stats.items()}},
+        }
+
+    def __call__(self, results):
+        for result in results:
+            now = time.monotonic()
+            if self._next is None or now >= self._next:
+                self._next = now + self.interval
+                self.report(self.snapshot(result))
+                self.reports += 1
+            yield result
+
+
+def build_live_pipeline(url, model, zones=None, report=None, report_interval=1.0, replay=False, preview=None,
+                        preview_fps=4.0, motion_threshold=None, max_stale=25, heatmap_cell=None, metrics=None,
+                        events_path=None, dwell_threshold=None, on_event=None, grace=GRACE):
+    """Canlı kaynak için hat: ``build_pipeline`` ile aynı aşamalar, gruplama olmadan.
+
+    ``replay`` ise ``url`` bir dosya yoludur ve kendi FPS'inde oynatılır. ``report`` verilirse
+    ``LiveReporter`` eklenir. ``events_path`` ya da ``on_event`` verilirse bölge olayları
+    (``dwell_threshold`` aşımları dahil) kayda yazılır / ``on_event``e gönderilir
+    (bkz. ``ZoneEventEngine``). ``grace`` toplayıcı ve olayların ortak iz kapanma süresidir.
+    """
+    from . import build_pipeline
+
+    pipeline = build_pipeline(url, model, zones=zones, annotate=False, batch_size=1, prefetch=0,
+                              motion_threshold=motion_threshold, max_stale=max_stale, heatmap_cell=heatmap_cell,
+                              preview=preview, preview_fps=preview_fps, metrics=metrics, grace=grace)
+    if events_path is not None or on_event is not None:
+        # Yayın kesilerek biter; kayıt o ana kadarki olaylarla kalmalı (``.partial`` değil, doğrudan yazılır)
+        pipeline.sinks.insert(0, ZoneEventEngine(zones, dwell_threshold, grace, log_path=events_path,
+                                                 on_event=on_event, atomic=False))
+    pipeline.source = ReplaySource(url) if replay else LiveSource(url)
+    if report is not None:
+        pipeline.sinks.insert(0, LiveReporter(report, pipeline.aggregator, report_interval))
+    return pipeline
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m engine.live", description="Canlı yayın analizi")
+    parser.add_argument("url", help="RTSP/HTTP adresi, web kamerası numarası ya da (--replay ile) video dosyası")
+    parser.add_argument("--replay", action="store_true", help="dosyayı kendi FPS'inde canlı yayın gibi oynat")
+    parser.add_argument("--model", default="yolov8n.pt", help="YOLO ağırlık dosyası")
+    parser.add_argument("--backend", choices=["auto", "auto-int8", *BACKENDS],
+                        help="çıkarım arka ucu (varsayılan: ENGINE_BACKEND ya da torch)")
+    parser.add_argument("--zones", help="bölge çokgenlerini içeren JSON dosyası (ör. zones.json)")
+    parser.add_argument("--interval", type=float, default=1.0, help="rapor aralığı (saniye)")
+    parser.add_argument("--events", help="bölge giriş/çıkış olaylarını bu dosyaya yaz (.jsonl ya da ikili)")
+    parser.add_argument("--dwell-threshold", type=float,
+                        help="bir bölgede bu kadar saniyeyi aşan kalışlar için dwell olayı üret ve yazdır")
+    parser.add_argument("--duration", type=float, help="bu kadar saniye sonra dur")
+    parser.add_argument("--motion-threshold", type=float,
+                        help="karo başına ortalama gri fark eşiği; altındaki karelerde dedektör atlanır")
+    return parser.parse_args(argv)
+
+
+def print_alerts(events, names):
+    """Eşik aşımı (``dwell``) olaylarını rapor satırlarıyla aynı biçimde, JSON olarak yazdırır."""
+    for timestamp, _, track, zone, kind, duration in events.tolist():
+        if kind == DWELL:
+            print(json.dumps({"alert": "dwell", "timestamp": timestamp, "track": track, "zone": names[zone],
+                              "duration": round(duration, 1)}, ensure_ascii=False), flush=True)
+
+
+def main(argv=None):
+    from .models import get_model
+
+    args = parse_args(argv)
+    zones = load_zones(args.zones) if args.zones else None
+    pipeline = build_live_pipeline(args.url, get_model(args.model, args.backend), zones=zones,
+                                   report=lambda report: print(json.dumps(report, ensure_ascii=False), flush=True),
+                                   report_interval=args.interval, replay=args.replay,
+                                   motion_threshold=args.motion_threshold, events_path=args.events,
+                                   dwell_threshold=args.dwell_threshold,
+                                   on_event=(lambda events: print_alerts(events, list(zones or {})))
+                                   if args.dwell_threshold is not None else None)
+    deadline = time.monotonic() + args.duration if args.duration else None
+    try:
+        for _ in pipeline:
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+    except KeyboardInterrupt:
+        pass
+    stats = pipeline.source.stats()
+    print(f"{stats['captured']} kare yakalandı, {stats['delivered']} analiz edildi, {stats['dropped']} düştü "
+          f"(%{stats['dropped_percent']:.1f}); kare yaşı ort. {stats['mean_age_ms']:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""Hat ölçümleri: aşama başına süre, kare gecikmesi ve aşama sayaçları.
+
+``Pipeline.metrics`` ``None`` iken hat hiç sarılmaz; ölçüm kapalıyken maliyet sıfırdır.
+Açıkken kare ve aşama başına birkaç ``perf_counter`` çağrısı yapılır.
+
+Ölçümler üç yerden okunabilir:
+
+* canlı: ``on_update`` her ``interval`` saniyede bir anlık görüntüyle (``snapshot()``)
+  çağrılır (ör. Streamlit kenar çubuğunda bir ``st.empty().json``)
+* çalıştırma sonunda: ``log_path`` verilirse özet bir satır JSON olarak dosyaya eklenir
+* Prometheus: ``serve_metrics()`` yerel bir HTTP uç noktasında ``/metrics`` yayınlar
+"""
+import json
+import threading
+import time
+import weakref
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+_live = weakref.WeakValueDictionary()  # çalıştırma adı -> PipelineMetrics (Prometheus için)
+_server = None
+
+
+class PipelineMetrics:
+    """Hattın her aşamasını saran monotonik zamanlayıcılar.
+
+    Aşamalar zincirlenmiş üreteçler olduğu için her aşamanın ``next()`` süresi yukarı akıştaki
+    tüm aşamaları da içerir; bir aşamanın kendi süresi, kendi toplamından bir önceki aşamanın
+    toplamı çıkarılarak bulunur. Kare gecikmesi, karenin kaynaktan çıktığı an ile hattın
+    sonundan çıktığı an arasındaki süredir (gruplama ve kuyruk beklemeleri dahil); yüzdelikler
+    son ``latency_window`` kare üzerinden hesaplanır.
+
+    Sayaçlar, ``stats()`` metodu olan aşamalardan (kaynak kuyruğu, hareket kapısı, dedektör,
+    önizleme) anlık görüntü alınırken okunur; sıcak yolda ek iş yapılmaz.
+
+    ``snapshot()`` başka iş parçacıklarından (Prometheus sunucusu, ``on_update``) çağrılabilir:
+    süre, sayı ve gecikme güncellemeleri ile anlık görüntünün kopyası aynı kilit altında yapılır,
+    böylece okunan değerler birbiriyle tutarlıdır ve gecikme kuyruğu okunurken değişmez.
+    """
+
+    def __init__(self, name="run", on_update=None, interval=1.0, log_path=None, latency_window=10000):
+        self._lock = threading.Lock()
+        self.name = name
+        self.on_update = on_update
+        self.interval = interval
+        self.log_path = log_path
+        self.latency_window = latency_window
+        self.names = []
+        self.inclusive = {}  # aşama -> yukarı akış dahil toplam süre (saniye)
+        self.items = {}      # aşama -> ürettiği sonuç sayısı
+        self.latencies = deque(maxlen=latency_window)
+        self.frames = 0
+        self.components = {}  # ad -> stats() metodu olan aşama
+        self._started = {}
+        self.wall_start = None
+        self.wall_end = None
+        self.finished = False
+        self._next_update = 0.0
+        _live[name] = self
+
+    def instrument(self, stream, stages, source=None):
+        """``stream`` (kaynak) ve ``[(ad, aşama), ...]`` için ölçülen üreteç zincirini kurar."""
+        with self._lock:
+            self.names = ["source", *(name for name, _ in stages)]
+            self.inclusive = dict.fromkeys(self.names, 0.0)
+            self.items = dict.fromkeys(self.names, 0)
+            self.latencies = deque(maxlen=self.latency_window)
+            self.frames = 0
+            self.components = {name: stage for name, stage in [("source", source), *stages]
+                               if hasattr(stage, "stats")}
+            self._started = {}
+            self.wall_start = time.perf_counter()
+            self.wall_end = None
+            self.finished = False
+        self._next_update = self.wall_start + self.interval
+        stream = self._timed("source", self._mark_start(stream))
+        for name, stage in stages:
+            stream = self._timed(name, stage(stream))
+        return self._mark_end(stream)
+
+    def _timed(self, name, stream):
+        iterator = iter(stream)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                with self._lock:
+                    self.inclusive[name] += time.perf_counter() - start
+                return
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.inclusive[name] += elapsed
+                self.items[name] += 1
+            yield item
+
+    def _mark_start(self, stream):
+        for result in stream:
+            self._started[id(result)] = time.perf_counter()
+            yield result
+
+    def _mark_end(self, stream):
+        complete = False
+        try:
+            for result in stream:
+                now = time.perf_counter()
+                latency = now - self._started.pop(id(result), now)
+                with self._lock:
+                    self.latencies.append(latency)
+                    self.frames += 1
+                    self.wall_end = now
+                if self.on_update is not None and now >= self._next_update:
+                    self._next_update = now + self.interval
+                    self.on_update(self.snapshot())
+                yield result
+            complete = True
+        finally:
+            with self._lock:
+                self.finished = True
+            if self.on_update is not None:
+                self.on_update(self.snapshot())
+            if self.log_path is not None:
+                self.write_log(complete)
+
+    def stage_seconds(self, inclusive=None):
+        """Aşama -> kendi süresi (yukarı akış hariç)."""
+        inclusive = self.inclusive if inclusive is None else inclusive
+        seconds = {}
+        previous = 0.0
+        for name in inclusive:
+            seconds[name] = max(inclusive[name] - previous, 0.0)
+            previous = inclusive[name]
+        return seconds
+
+    def counters(self):
+        """``stats()`` metodu olan aşamaların anlık sayaçları: aşama -> sözlük."""
+        return {name: component.stats() for name, component in self.components.items()}
+
+    def summary(self):
+        with self._lock:  # tutarlı kopya; hat iş parçacığı bu arada yalnızca kısa süre bekler
+            frames, finished, wall_start, wall_end = self.frames, self.finished, self.wall_start, self.wall_end
+            inclusive, counts = dict(self.inclusive), dict(self.items)  # aşama sırasıyla
+            latencies = np.array(self.latencies) * 1000
+        end = wall_end if finished and wall_end is not None else time.perf_counter()
+        wall = end - wall_start if wall_start is not None else 0.0
+        stages = {}
+        for name, seconds in self.stage_seconds(inclusive).items():
+            items = counts[name]
+            stages[name] = {
+                "seconds": seconds,
+                "items": items,
+                "ms_per_item": seconds / items * 1000 if items else 0.0,
+                "items_per_second": items / seconds if seconds > 0 else None,
+            }
+        return {
+            "frames": frames,
+            "wall_seconds": wall,
+            "fps": frames / wall if wall > 0 else 0.0,
+            "stages": stages,
+            "latency_ms": {
+                name: float(np.percentile(latencies, q)) if len(latencies) else 0.0
+                for name, q in (("p50", 50), ("p95", 95), ("p99", 99), ("max", 100))
+            },
+        }
+
+    def snapshot(self):
+        """Özet + aşama sayaçları (canlı panel, JSON kaydı ve Prometheus için)."""
+        snapshot = self.summary()
+        snapshot["name"] = self.name
+        snapshot["finished"] = self.finished
+        snapshot["counters"] = self.counters()
+        return snapshot
+
+    def write_log(self, complete=True):
+        record = {"time": time.time(), "complete": complete, **self.snapshot()}
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+def render_prometheus(snapshots):
+    """Anlık görüntüleri Prometheus metin biçimine çevirir (her metrik ailesi tek blok halinde)."""
+    families = {
+        "engine_frames_total": ("counter", []),
+        "engine_fps": ("gauge", []),
+        "engine_stage_seconds_total": ("counter", []),
+        "engine_stage_items_total": ("counter", []),
+        "engine_frame_latency_ms": ("gauge", []),
+        "engine_stage_counter": ("gauge", []),
+    }
+
+    def sample(family, labels, value):
+        families[family][1].append(f"{family}{{{labels}}} {value:.6g}")
+
+    for snapshot in snapshots:
+        run = f'run="{_label(snapshot["name"])}"'
+        sample("engine_frames_total", run, snapshot["frames"])
+        sample("engine_fps", run, snapshot["fps"])
+        for stage, timing in snapshot["stages"].items():
+            labels = f'{run},stage="{_label(stage)}"'
+            sample("engine_stage_seconds_total", labels, timing["seconds"])
+            sample("engine_stage_items_total", labels, timing["items"])
+        for name, value in snapshot["latency_ms"].items():
+            quantile = {"p50": "0.5", "p95": "0.95", "p99": "0.99", "max": "1"}[name]
+            sample("engine_frame_latency_ms", f'{run},quantile="{quantile}"', value)
+        # aşama sayaçları: kuyruk doluluğu, atlanan dedektör çağrıları, düşürülen önizleme kareleri...
+        for stage, stats in snapshot["counters"].items():
+            for key, value in stats.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    sample("engine_stage_counter", f'{run},stage="{_label(stage)}",name="{_label(key)}"', value)
+
+    lines = []
+    for family, (kind, samples) in families.items():
+        lines.append(f"# TYPE {family} {kind}")
+        lines.extend(samples)
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus([metrics.snapshot() for metrics in list(_live.values())]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_metrics(port=9108, host="127.0.0.1"):
+    """Süreçteki tüm ``PipelineMetrics`` nesnelerini ``http://host:port/metrics`` adresinde yayınlar.
+
+    Süreç başına bir kez başlatılır (tekrar çağrılar aynı sunucuyu döndürür); port
+    kullanılıyorsa ``None`` döner.
+    """
+    global _server
+    if _server is None:
+        try:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        except OSError:
+            return None
+        threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server
@@ -0,0 +1,136 @@
+"""Süreç genelinde paylaşılan YOLO model kaydı (önbellek + ısınma).
+
+Streamlit her etkileşimde betiği yeniden çalıştırır, fakat içe aktarılan modüller süreç
+boyunca bellekte kalır. Bu yüzden buradaki ``registry`` tüm oturumlar arasında ortaktır ve
+her ağırlık dosyası (ve arka uç) süreç başına bir kez diskten yüklenir.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from .backends import load_backend, select_backend
+
+
+def load_yolo(weights, backend="torch"):
+    return load_backend(weights, backend)
+
+
+class LoadedModel:
+    """Yüklenmiş bir model ve ölçümleri.
+
+    Model çağrılabilir olarak kullanılır; aynı model nesnesi birden fazla oturumdan aynı anda
+    çağrılmasın diye her çağrı modele ait kilit altında yapılır.
+    """
+
+    def __init__(self, weights, model, load_seconds, warmup_seconds, backend="torch"):
+        self.weights = weights
+        self.backend = backend
+        self.model = model
+        self.lock = threading.Lock()
+        self.load_seconds = load_seconds
+        self.warmup_seconds = warmup_seconds
+        self.first_frame_seconds = None  # ısınmadan sonraki ilk gerçek çağrı
+        self.calls = 0
+
+    def __call__(self, *args, **kwargs):
+        with self.lock:
+            start = time.perf_counter()
+            output = self.model(*args, **kwargs)
+            if self.first_frame_seconds is None:
+                self.first_frame_seconds = time.perf_counter() - start
+            self.calls += 1
+        return output
+
+    def stats(self):
+        return {
+            "weights": self.weights,
+            "backend": self.backend,
+            "load_seconds": self.load_seconds,
+            "warmup_seconds": self.warmup_seconds,
+            "first_frame_seconds": self.first_frame_seconds,
+            "calls": self.calls,
+        }
+
+
+class ModelRegistry:
+    """(Ağırlık dosyası, arka uç) -> ``LoadedModel`` LRU önbelleği.
+
+    En fazla ``max_models`` model bellekte tutulur; sınır aşılınca en uzun süredir
+    kullanılmayan model atılır. Yükleme sırasında boş bir kare ile ısınma çağrısı yapılır,
+    böylece tembel başlatma maliyetini ilk gerçek kare ödemez.
+    """
+
+    def __init__(self, max_models=2, loader=load_yolo, warmup_shape=(640, 640, 3)):
+        if max_models < 1:
+            raise ValueError("max_models en az 1 olmalı")
+        self.max_models = max_models
+        self.loader = loader
+        self.warmup_shape = warmup_shape
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, weights, backend="torch"):
+        weights = str(weights)
+        key = (weights, backend)
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                return self._models[key]
+
+            start = time.perf_counter()
+            model = self.loader(weights, backend)
+            load_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            if self.warmup_shape is not None:
+                model(np.zeros(self.warmup_shape, np.uint8), verbose=False)
+            warmup_seconds = time.perf_counter() - start
+
+            loaded = LoadedModel(weights, model, load_seconds, warmup_seconds, backend)
+            self._models[key] = loaded
+            while len(self._models) > self.max_models:
+                self._models.popitem(last=False)
+                self.evictions += 1
+            return loaded
+
+    def stats(self):
+        with self._lock:
+            return [loaded.stats() for loaded in self._models.values()]
+
+
+registry = ModelRegistry(max_models=int(os.environ.get("ENGINE_MAX_MODELS", 2)))
+
+
+DEFAULT_BACKEND = "torch"
+AUTO_BACKENDS = ("auto", "auto-int8")
+
+
+def requested_backend(backend=None):
+    """``None`` -> ``ENGINE_BACKEND`` (varsayılan ``torch``); ``auto`` çözülmeden döndürülür."""
+    return backend or os.environ.get("ENGINE_BACKEND", DEFAULT_BACKEND)
+
+
+def resolve_backend(weights, backend=None):
+    """İstenen arka ucu çözer; yalnızca açıkça ``auto`` istenirse arka uçlar ölçülür.
+
+    ``auto`` INT8'i denemez (nicemleme kalibrasyon ister ve tespitleri değiştirir); ``auto-int8``
+    onu da aday yapar. Ölçülen adaylar ``registry`` üzerinden yüklenir; seçilen yeniden
+    kullanılır, diğerleri LRU sınırıyla bırakılır.
+    """
+    backend = requested_backend(backend)
+    if backend in AUTO_BACKENDS:
+        backend, _ = select_backend(weights, int8=backend == "auto-int8", loader=registry.get)
+    return backend
+
+
+def get_model(weights, backend=None):
+    """Süreç genelindeki kayıttan modeli döndürür; gerekirse yükleyip ısıtır.
+
+    ``backend``: ``torch`` (varsayılan), ``onnx``, ``openvino``, ``openvino-int8``, ``auto`` ya da
+    ``auto-int8`` (bkz. ``engine.backends``).
+    """
+    return registry.get(weights, resolve_backend(weights, backend))
@@ -0,0 +1,62 @@
+"""Hareket kapısı: sahne değişmediyse dedektörü çağırmadan önceki tespitleri kullanır."""
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """Küçültülmüş gri kareyi son dedektör çağrısındaki kareyle karşılaştırır.
+
+    Kare ``grid`` (satır, sütun) karolara bölünür ve her karonun ortalama mutlak farkı NumPy ile
+    tek seferde hesaplanır. Hiçbir karo ``threshold`` gri seviyesini aşmıyorsa kare
+    ``reused`` olarak işaretlenir ve dedektör önceki tespitleri tekrar kullanır. Art arda
+    ``max_stale`` kare atlandıktan sonra dedektör yine de çağrılır.
+    """
+
+    def __init__(self, threshold=4.0, grid=(4, 4), width=160, max_stale=25):
+        self.threshold = threshold
+        self.grid = grid
+        self.width = width
+        self.max_stale = max_stale
+        self.reference = None
+        self.stale = 0
+        self.frames = 0
+        self.skipped = 0
+
+    def _small_gray(self, image):
+        rows, cols = self.grid
+        height = max(rows, round(image.shape[0] * self.width / image.shape[1]) // rows * rows)
+        width = max(cols, self.width // cols * cols)
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        return cv2.resize(gray, (width, height), interpolation=cv2.INTER_AREA).astype(np.int16)
+
+    def tile_motion(self, small):
+        """Her karonun referans kareye göre ortalama mutlak farkı -> (satır, sütun)."""
+        rows, cols = self.grid
+        diff = np.abs(small - self.reference)
+        height, width = diff.shape
+        return diff.reshape(rows, height // rows, cols, width // cols).mean(axis=(1, 3))
+
+    def __call__(self, results):
+        for result in results:
+            small = self._small_gray(result.frame.image)
+            self.frames += 1
+            static = (
+                self.reference is not None
+                and self.stale < self.max_stale
+                and self.tile_motion(small).max() <= self.threshold
+            )
+            if static:
+                result.reused = True
+                self.stale += 1
+                self.skipped += 1
+            else:
+                self.reference = small
+                self.stale = 0
+            yield result
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "skipped": self.skipped,
+            "skipped_percent": 100.0 * self.skipped / max(self.frames, 1),
+        }
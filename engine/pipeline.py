@@ -0,0 +1,100 @@
+"""Kare kaynağından sink'lere kadar üreteç (generator) zinciri olarak çalışan analiz hattı."""
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class Frame:
+    """Videodan okunan tek kare, sıra numarası ve video içindeki zamanı (saniye).
+
+    Önbellekten yeniden oynatılan karelerde ``image`` yoktur (``None``); kare boyutu yine de
+    ``shape`` ile bilinir.
+    """
+    index: int
+    image: np.ndarray
+    timestamp: float = 0.0
+    shape: tuple = None
+
+    def __post_init__(self):
+        if self.shape is None and self.image is not None:
+            self.shape = self.image.shape
+
+
+@dataclass
+class Detections:
+    """Bir karedeki tespitler; satır başına bir kutu."""
+    xyxy: np.ndarray        # (N, 4) float32, piksel koordinatları
+    confidence: np.ndarray  # (N,) float32
+    ids: np.ndarray         # (N,) int64, kimliği olmayan kutular için -1
+
+    @classmethod
+    def empty(cls):
+        return cls(np.zeros((0, 4), np.float32), np.zeros(0, np.float32), np.zeros(0, np.int64))
+
+    def __len__(self):
+        return len(self.xyxy)
+
+    def copy(self):
+        return Detections(self.xyxy.copy(), self.confidence.copy(), self.ids.copy())
+
+
+@dataclass
+class FrameResult:
+    """Hattın aşamaları arasında taşınan kare ve ona eklenen sonuçlar."""
+    frame: Frame
+    detections: Detections = None
+    durations: np.ndarray = None  # her kutu için kalma süresi (saniye)
+    zones: np.ndarray = None      # her kutunun bölge indeksi, bölge dışı -1
+    reused: bool = False          # dedektör çağrılmadı, önceki tespitler kullanıldı
+    events: np.ndarray = None     # bu karede oluşan bölge olayları (bkz. ``ZoneEventEngine``)
+    annotated: bool = False       # tespitler kare üzerine çizildi (bkz. ``Annotator``)
+
+
+class Pipeline:
+    """Kaynak -> (hareket kapısı) -> dedektör -> takipçi -> bölge toplayıcı -> sink'ler.
+
+    ``None`` verilen aşamalar atlanır (ör. önbellekten okunan tespitlerde dedektör).
+
+    Her aşama ``FrameResult`` üreteci alıp yine üreteç döndüren bir çağrılabilirdir;
+    kareler hat boyunca teker teker akar, hiçbir aşama tüm videoyu bellekte tutmaz.
+
+    ``metrics`` bir ``PipelineMetrics`` ise her aşama zamanlayıcılarla sarılır.
+    """
+
+    def __init__(self, source, detector, tracker, aggregator, sinks=(), gate=None, metrics=None):
+        self.source = source
+        self.gate = gate
+        self.detector = detector
+        self.tracker = tracker
+        self.aggregator = aggregator
+        self.sinks = list(sinks)
+        self.metrics = metrics
+
+    def named_stages(self):
+        """``[(ad, aşama), ...]``; sink'ler sınıf adlarıyla adlandırılır."""
+        stages = [("gate", self.gate), ("detector", self.detector), ("tracker", self.tracker),
+                  ("aggregator", self.aggregator), *((type(sink).__name__, sink) for sink in self.sinks)]
+        return [(name, stage) for name, stage in stages if stage is not None]
+
+    def stages(self):
+        return [stage for _, stage in self.named_stages()]
+
+    def find(self, kind):
+        """Verilen türdeki ilk aşamayı (yoksa ``None``) döndürür."""
+        return next((stage for stage in [self.source, *self.stages()] if isinstance(stage, kind)), None)
+
+    def __iter__(self):
+        # Kaynak ``Frame`` ya da (önbellekten okunanlar gibi) hazır ``FrameResult`` üretebilir
+        stream = (item if isinstance(item, FrameResult) else FrameResult(item) for item in self.source)
+        if self.metrics is not None:
+            return iter(self.metrics.instrument(stream, self.named_stages(), self.source))
+        for stage in self.stages():
+            stream = stage(stream)
+        return iter(stream)
+
+    def run(self):
+        """Hattı arayüz olmadan sonuna kadar çalıştırır ve özet sonucu döndürür."""
+        for _ in self:
+            pass
+        return self.aggregator.summary()
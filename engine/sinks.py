@@ -0,0 +1,209 @@
+"""Hattın sonundaki çıktı aşamaları."""
+import queue
+import threading
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from .pipeline import Detections
+from .zones import ZoneMask
+
+
+def draw_detections(image, detections, durations):
+    """Kutuları ve "ID / süre" etiketlerini kare üzerine çizer."""
+    for (x1, y1, x2, y2), id, duration in zip(detections.xyxy.tolist(), detections.ids.tolist(), durations):
+        cv2.putText(image, f"ID: {id}, Time: {duration:.2f}s", (int(x1), int(y1) - 10),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
+        cv2.rectangle(image, (int(x1), int(y1)), (int(x2), int(y2)), (0, 255, 0), 2)
+
+
+class Annotator:
+    """Tespitleri karenin kendisi üzerine çizer (görüntüleme için) ve kareyi ``annotated`` işaretler."""
+
+    def __call__(self, results):
+        for result in results:
+            if result.frame.image is not None and not result.annotated:
+                draw_detections(result.frame.image, result.detections, result.durations)
+                result.annotated = True
+            yield result
+
+
+class PreviewSink:
+    """Canlı önizlemeyi sınırlı hızda tek bir yere gönderir.
+
+    En fazla ``max_fps`` karede bir, kare üzerine tespitler çizilir (``Annotator`` zaten
+    çizdiyse yeniden çizilmez), ``max_width`` genişliğe küçültülür ve JPEG olarak kodlanıp
+    ``show(jpeg_bytes)`` ile gönderilir (ör. bir ``st.empty()`` yer tutucusunun ``image``
+    metodu). Aradaki kareler önizlemeye hiç girmez; analiz önizlemeyi beklemeden tam hızda
+    devam eder.
+    """
+
+    def __init__(self, show, max_fps=4.0, max_width=640, jpeg_quality=70):
+        self.show = show
+        self.interval = 1.0 / max_fps
+        self.max_width = max_width
+        self.jpeg_quality = jpeg_quality
+        self.last_shown = None
+        self.shown = 0
+        self.dropped = 0
+
+    def stats(self):
+        return {"shown": self.shown, "dropped": self.dropped}
+
+    def encode(self, result):
+        image = result.frame.image
+        if not result.annotated:
+            image = image.copy()
+            draw_detections(image, result.detections, result.durations)
+        height, width = image.shape[:2]
+        if width > self.max_width:
+            image = cv2.resize(image, (self.max_width, round(height * self.max_width / width)),
+                               interpolation=cv2.INTER_AREA)
+        ok, jpeg = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        return jpeg.tobytes()
+
+    def __call__(self, results):
+        for result in results:
+            now = time.monotonic()
+            due = self.last_shown is None or now - self.last_shown >= self.interval
+            if due and result.frame.image is not None:
+                self.last_shown = now
+                self.show(self.encode(result))
+                self.shown += 1
+            else:
+                self.dropped += 1
+            yield result
+
+
+_END = object()
+
+
+class VideoWriterSink:
+    """Çizilmiş kareleri ayrı bir yazıcı iş parçacığında video dosyasına kodlayan aşama.
+
+    Hat yalnızca kareyi (``scale`` < 1 ise küçülterek) kopyalar ve en fazla ``queue_size``
+    öğelik kuyruğa bırakır; kutular, kimlikler, kalma süreleri ve bölge sınırları yazıcı iş
+    parçacığında çizilip kodlanır. Kuyruk doluysa kare beklenmeden atlanır (``dropped``), yani
+    kodlama tespiti hiçbir zaman yavaşlatmaz. ``every`` > 1 ise yalnızca her ``every``. kare
+    yazılır ve çıktı FPS'i de o oranda düşürülür; video süresi gerçek süreyle aynı kalır.
+
+    ``fps`` verilmezse ilk iki karenin zaman farkından bulunur. Kodek uzantıdan seçilir
+    (``.mp4`` -> ``mp4v``, diğerleri ``MJPG``). ``Annotator``dan önce yer almalıdır.
+    """
+
+    def __init__(self, path, fps=None, scale=1.0, every=1, zones=None, queue_size=32, codec=None):
+        if every < 1:
+            raise ValueError("every en az 1 olmalı")
+        self.path = Path(path)
+        self.fps = fps
+        self.scale = scale
+        self.every = every
+        self.zones = zones
+        self.queue_size = queue_size
+        self.codec = codec or ("mp4v" if self.path.suffix.lower() == ".mp4" else "MJPG")
+        self._queue = None
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.frames = 0
+        self.written = 0
+        self.dropped = 0
+        self.write_seconds = 0.0  # yazıcı iş parçacığının çizme + kodlama süresi
+        self.error = None
+
+    def stats(self):
+        return {
+            "written": self.written,
+            "dropped": self.dropped,
+            "queue_size": self._queue.qsize() if self._queue is not None else 0,
+            "write_fps": self.written / self.write_seconds if self.write_seconds > 0 else 0.0,
+            "ms_per_frame": 1000 * self.write_seconds / self.written if self.written else 0.0,
+        }
+
+    def _snapshot(self, result):
+        """Yazıcıya verilecek bağımsız kopya: (küçültülmüş) kare, ölçeklenmiş kutular ve süreler."""
+        image = result.frame.image
+        detections = result.detections
+        if self.scale != 1.0:
+            height, width = image.shape[:2]
+            image = cv2.resize(image, (round(width * self.scale), round(height * self.scale)),
+                               interpolation=cv2.INTER_AREA)
+            detections = Detections(detections.xyxy * self.scale, detections.confidence, detections.ids)
+        else:
+            image = image.copy()  # sonraki aşamalar (ör. Annotator) kareyi yerinde değiştirebilir
+        durations = result.durations if result.durations is not None else np.zeros(len(detections))
+        return image, detections, durations
+
+    def _write(self, fps):
+        writer = None
+        outlines = None
+        try:
+            for image, detections, durations in iter(self._queue.get, _END):
+                start = time.perf_counter()
+                if writer is None:
+                    height, width = image.shape[:2]
+                    writer = cv2.VideoWriter(str(self.path), cv2.VideoWriter_fourcc(*self.codec), fps, (width, height))
+                    if not writer.isOpened():
+                        raise IOError(f"Video yazılamıyor: {self.path}")
+                    if self.zones:
+                        outlines = list(zip(self.zones, ZoneMask(self.zones, width, height).polygons))
+                for name, points in outlines or ():
+                    cv2.polylines(image, [points], True, (255, 128, 0), 2)
+                    cv2.putText(image, name, (int(points[0][0]) + 5, int(points[0][1]) + 20),
+                                cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 128, 0), 2)
+                draw_detections(image, detections, durations)
+                writer.write(image)
+                self.written += 1
+                self.write_seconds += time.perf_counter() - start
+        except Exception as exc:
+            self.error = exc
+            for _ in iter(self._queue.get, _END):  # hattın kalanı kuyrukta beklemesin
+                pass
+        finally:
+            if writer is not None:
+                writer.release()
+
+    def _start(self, fps):
+        thread = threading.Thread(target=self._write, args=(fps,), daemon=True)
+        thread.start()
+        return thread
+
+    def __call__(self, results):
+        self._reset_stats()
+        self._queue = queue.Queue(self.queue_size)
+        thread = None
+        pending = None  # FPS kare zamanlarından bulunacaksa ilk yazılacak kare ve zamanı
+        try:
+            for result in results:
+                if result.frame.image is not None and self.frames % self.every == 0:
+                    item = self._snapshot(result)
+                    if thread is None and self.fps is None and pending is None:
+                        pending = (item, result.frame.timestamp)
+                        item = None
+                    elif thread is None:
+                        if self.fps is not None:
+                            fps = self.fps / self.every
+                        else:  # ardışık iki yazılan kare arası ``every`` kare
+                            step = result.frame.timestamp - pending[1]
+                            fps = 1.0 / step if step > 0 else 25.0 / self.every
+                        thread = self._start(fps)
+                        if pending is not None:
+                            self._queue.put(pending[0])
+                    if item is not None:
+                        try:
+                            self._queue.put_nowait(item)
+                        except queue.Full:
+                            self.dropped += 1
+                self.frames += 1
+                yield result
+        finally:
+            if thread is None and pending is not None:  # yalnızca tek kare yazılacak
+                thread = self._start((self.fps or 25.0) / self.every)
+                self._queue.put(pending[0])
+            if thread is not None:
+                self._queue.put(_END)
+                thread.join()
+        if self.error is not None:
+            raise self.error
@@ -0,0 +1,146 @@
+"""Sabit bellekli, birleştirilebilir akan istatistikler (kalma süreleri için).
+
+``QuantileSketch`` logaritmik aralıklı kovalardan oluşan bir histogramdır (DDSketch yaklaşımı):
+``accuracy`` = 0.01 iken her kova komşusundan ~%2 geniştir ve kantiller en fazla %1 göreli
+hatayla bulunur. Kovalar ``min_value``..``max_value`` aralığında sabittir (varsayılanla ~900
+kova, ~7 KB); eklenen değer sayısından bağımsızdır. İki sketch kova sayıları toplanarak
+birleştirilir: sonuç, tüm değerleri tek bir sketch'e eklemekle birebir aynıdır ve sıraya
+bağlı değildir. Böylece farklı süreç, parça ya da kameraların istatistikleri kayıpsız
+birleşir.
+"""
+import math
+
+import numpy as np
+
+
+class QuantileSketch:
+    """Göreli hata garantili, birleştirilebilir kantil sketch'i.
+
+    ``min_value``dan küçük değerler (ör. tek karede görülüp kaybolan izlerin 0 süresi) sıfır
+    kovasına, ``max_value``dan büyükler son kovaya düşer.
+    """
+
+    def __init__(self, accuracy=0.01, min_value=0.01, max_value=7 * 24 * 3600.0):
+        self.accuracy = accuracy
+        self.min_value = min_value
+        self.max_value = max_value
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.offset = math.ceil(math.log(min_value) / self.log_gamma) - 1
+        size = math.ceil(math.log(max_value) / self.log_gamma) - self.offset
+        self.counts = np.zeros(size + 1, np.int64)  # 0: sıfır kovası
+
+    @property
+    def params(self):
+        return self.accuracy, self.min_value, self.max_value
+
+    @property
+    def count(self):
+        return int(self.counts.sum())
+
+    def bucket(self, values):
+        values = np.asarray(values, np.float64)
+        index = np.ceil(np.log(np.maximum(values, self.min_value)) / self.log_gamma).astype(np.int64) - self.offset
+        index[values < self.min_value] = 0
+        return np.clip(index, 0, len(self.counts) - 1)
+
+    def add(self, values):
+        values = np.atleast_1d(values)
+        if len(values):
+            self.counts += np.bincount(self.bucket(values), minlength=len(self.counts))
+
+    def merge(self, other):
+        if other.params != self.params:
+            raise ValueError("farklı ayarlı sketch'ler birleştirilemez")
+        self.counts += other.counts
+        return self
+
+    def quantile(self, q):
+        """``q`` (0-1) kantilinin yaklaşık değeri; sketch boşsa 0."""
+        total = self.counts.sum()
+        if total == 0:
+            return 0.0
+        index = int(np.searchsorted(np.cumsum(self.counts), q * (total - 1), side="right"))
+        if index == 0:
+            return 0.0
+        return 2 * self.gamma ** (index + self.offset) / (self.gamma + 1)  # kovanın orta değeri
+
+    def copy(self):
+        sketch = QuantileSketch(*self.params)
+        sketch.counts = self.counts.copy()
+        return sketch
+
+    def to_dict(self):
+        """JSON'a yazılabilir seyrek gösterim (yalnızca dolu kovalar)."""
+        buckets = np.flatnonzero(self.counts)
+        return {"accuracy": self.accuracy, "min_value": self.min_value, "max_value": self.max_value,
+                "buckets": buckets.tolist(), "counts": self.counts[buckets].tolist()}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["accuracy"], data["min_value"], data["max_value"])
+        sketch.counts[np.asarray(data["buckets"], np.int64)] = data["counts"]
+        return sketch
+
+
+class DwellStats:
+    """Kalma süreleri için sayı, toplam, en küçük/en büyük ve kantil sketch'i; hepsi birleştirilebilir."""
+
+    QUANTILES = {"p50": 0.5, "p90": 0.9, "p99": 0.99}
+
+    def __init__(self, sketch=None):
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sketch = sketch if sketch is not None else QuantileSketch()
+
+    def add(self, values):
+        values = np.atleast_1d(np.asarray(values, np.float64))
+        if not len(values):
+            return
+        self.count += len(values)
+        self.total += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.sketch.add(values)
+
+    def merge(self, other):
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.sketch.merge(other.sketch)
+        return self
+
+    def quantile(self, q):
+        if not self.count:
+            return 0.0
+        return min(max(self.sketch.quantile(q), self.min), self.max)  # kova ortası gerçek aralığa kırpılır
+
+    def copy(self):
+        stats = DwellStats(self.sketch.copy())
+        stats.count, stats.total, stats.min, stats.max = self.count, self.total, self.min, self.max
+        return stats
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "min": self.min if self.count else 0.0,
+            "max": self.max if self.count else 0.0,
+            **{name: self.quantile(q) for name, q in self.QUANTILES.items()},
+        }
+
+    def to_dict(self):
+        """Özet + sketch; ``from_dict`` ile geri okunup başka istatistiklerle birleştirilebilir."""
+        return {**self.summary(), "sketch": self.sketch.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls(QuantileSketch.from_dict(data["sketch"]))
+        stats.count, stats.total = data["count"], data["total"]
+        if stats.count:
+            stats.min, stats.max = data["min"], data["max"]
+        return stats
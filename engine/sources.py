@@ -0,0 +1,144 @@
+"""Kare kaynakları."""
+import queue
+import threading
+import time
+
+import cv2
+
+from .pipeline import Frame
+
+
+def read_frames(cap, start=0, end=None):
+    """Açık bir ``VideoCapture``dan sıra numarası ve video zamanı eklenmiş kareler üretir.
+
+    Zaman ``CAP_PROP_POS_MSEC``den alınır; kapsayıcı bunu ilerletmiyorsa (0 ya da geriye giden
+    değerler) önceki zamana bir kare aralığı (1 / FPS) eklenir, yani zaman hiç geri gitmez ve
+    kare aralıkları (kalma toplamları) hiç negatif olmaz. Böylece süreler işleme hızından
+    bağımsız ve her çalıştırmada aynıdır.
+    ``start``/``end`` verilirse yalnızca ``[start, end)`` aralığındaki kareler okunur (arama ile).
+    """
+    fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+    if start:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    index = start
+    previous = -1.0
+    while end is None or index < end:
+        ret, image = cap.read()
+        if not ret:
+            break
+        timestamp = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+        if previous < 0:
+            if timestamp == 0.0 and index > 0:  # aramadan sonra konum bildirilmiyor
+                timestamp = index / fps
+        elif timestamp <= previous:
+            timestamp = previous + 1.0 / fps
+        previous = timestamp
+        yield Frame(index, image, timestamp)
+        index += 1
+
+
+def open_capture(path):
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"Video açılamadı: {path}")
+    return cap
+
+
+class VideoSource:
+    """Bir video dosyasını (ya da ``[start, end)`` kare aralığını) ``cv2.VideoCapture`` ile kare kare okur."""
+
+    def __init__(self, path, start=0, end=None):
+        self.path = str(path)
+        self.start = start
+        self.end = end
+
+    def __iter__(self):
+        cap = open_capture(self.path)
+        try:
+            yield from read_frames(cap, self.start, self.end)
+        finally:
+            cap.release()
+
+
+_END = object()
+
+
+class PrefetchingVideoSource:
+    """Kod çözmeyi arka plandaki bir iş parçacığında yapan video kaynağı.
+
+    Çözücü iş parçacığı en fazla ``queue_depth`` karelik sınırlı bir kuyruğu doldurur; böylece
+    H.264 çözme ile model çıkarımı aynı anda ilerler. ``stats()`` kuyruk doluluğunu ve iki
+    tarafın bekleme sürelerini verir: analiz tarafı çok bekliyorsa hat çözmeye, çözücü
+    dolu kuyrukta çok bekliyorsa çıkarıma bağlıdır.
+    """
+
+    def __init__(self, path, queue_depth=8, start=0, end=None):
+        if queue_depth < 1:
+            raise ValueError("queue_depth en az 1 olmalı")
+        self.path = str(path)
+        self.queue_depth = queue_depth
+        self.start = start
+        self.end = end
+        self._queue = None
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.frames = 0
+        self.occupancy_total = 0
+        self.decoder_wait_seconds = 0.0   # çözücü, kuyruk dolu diye bekledi
+        self.consumer_wait_seconds = 0.0  # analiz, kare gelmedi diye bekledi
+
+    def __iter__(self):
+        self._reset_stats()
+        cap = open_capture(self.path)
+        frames = self._queue = queue.Queue(maxsize=self.queue_depth)
+        stop = threading.Event()
+        thread = threading.Thread(target=self._decode, args=(cap, frames, stop), daemon=True)
+        thread.start()
+        try:
+            while True:
+                self.occupancy_total += frames.qsize()
+                start = time.perf_counter()
+                item = frames.get()
+                self.consumer_wait_seconds += time.perf_counter() - start
+                if item is _END:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                self.frames += 1
+                yield item
+        finally:
+            stop.set()
+            thread.join()
+            cap.release()
+
+    def _decode(self, cap, frames, stop):
+        try:
+            for frame in read_frames(cap, self.start, self.end):
+                if not self._put(frames, frame, stop):
+                    return
+            self._put(frames, _END, stop)
+        except Exception as exc:
+            self._put(frames, exc, stop)
+
+    def _put(self, frames, item, stop):
+        start = time.perf_counter()
+        while not stop.is_set():
+            try:
+                frames.put(item, timeout=0.1)
+                self.decoder_wait_seconds += time.perf_counter() - start
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "queue_depth": self.queue_depth,
+            "queue_size": self._queue.qsize() if self._queue is not None else 0,
+            "mean_occupancy": self.occupancy_total / max(self.frames, 1),
+            "decoder_wait_seconds": self.decoder_wait_seconds,
+            "consumer_wait_seconds": self.consumer_wait_seconds,
+            "bound": "decode" if self.consumer_wait_seconds > self.decoder_wait_seconds else "inference",
+        }
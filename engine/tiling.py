@@ -0,0 +1,144 @@
+"""Yüksek çözünürlüklü karelerde karo (tile) bazlı tespit.
+
+Geniş açılı kameralarda uzaktaki bireyler birkaç düzine piksel boyundadır; kare modele
+640 piksele küçültülerek verildiğinde kaybolurlar. ``TiledDetector`` kareyi kendi
+çözünürlüğünde, birbiriyle örtüşen ``tile`` x ``tile`` karolara böler ve yalnızca tanımlı
+bölgelerle kesişen karoları modele verir. Bir grubun tüm karoları tek bir model çağrısında
+işlenir; isteğe bağlı tüm kare geçişi ayrı bir çağrıda, modelin kendi giriş boyutunda yapılır.
+Kutular kare koordinatlarına taşınır ve karolar arasındaki kopyalar ``merge_boxes`` ile elenir.
+"""
+import numpy as np
+
+from .detector import Detector, to_detections
+from .pipeline import Detections
+from .zones import ZoneMask
+
+
+def tile_positions(length, tile, overlap):
+    """Bir eksen boyunca karo başlangıçları; karolar ekseni tam kaplar ve en az ``overlap`` oranında örtüşür."""
+    if length <= tile:
+        return [0]
+    stride = tile * (1 - overlap)
+    count = int(np.ceil((length - tile) / stride)) + 1
+    return np.linspace(0, length - tile, count).round().astype(int).tolist()
+
+
+def plan_tiles(width, height, tile=640, overlap=0.2, zones=None):
+    """``(T, 4)`` xyxy karo dizisi; ``zones`` verilirse yalnızca bir bölgeyle kesişen karolar."""
+    tiles = np.array([(x, y, min(x + tile, width), min(y + tile, height))
+                      for y in tile_positions(height, tile, overlap)
+                      for x in tile_positions(width, tile, overlap)], np.intp)
+    if zones:
+        mask = ZoneMask(zones, width, height).mask
+        tiles = tiles[[mask[y0:y1, x0:x1].any() for x0, y0, x1, y1 in tiles.tolist()]]
+    return tiles
+
+
+def merge_boxes(xyxy, confidence, threshold=0.5, sources=None, iou_threshold=0.5):
+    """Karolar arası NMS: güvene göre sırayla, tutulan bir kutuyla fazla örtüşen kutular atılır
+    -> tutulan indeksler.
+
+    Farklı kaynaklardan (karo ya da tüm kare; ``sources`` kutu başına kaynak numarası) gelen
+    kutularda "küçüğe göre kesişim" ``threshold``u aşarsa kutu kopya sayılır: karo kenarında
+    kesilmiş yarım bir kutu, komşu karodaki tam kutuyla düşük IoU'ya rağmen neredeyse tamamen
+    örtüşür. Aynı kaynaktaki kutular için olağan IoU (``iou_threshold``) kullanılır; böylece
+    birinin arkasında kısmen görünen ikinci kişi elenmez. ``sources`` verilmezse tüm kutular aynı
+    kaynaktandır.
+    """
+    if len(xyxy) == 0:
+        return np.zeros(0, np.intp)
+    x1 = np.maximum(xyxy[:, None, 0], xyxy[None, :, 0])
+    y1 = np.maximum(xyxy[:, None, 1], xyxy[None, :, 1])
+    x2 = np.minimum(xyxy[:, None, 2], xyxy[None, :, 2])
+    y2 = np.minimum(xyxy[:, None, 3], xyxy[None, :, 3])
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area = (xyxy[:, 2] - xyxy[:, 0]) * (xyxy[:, 3] - xyxy[:, 1])
+    smaller = intersection / np.maximum(np.minimum(area[:, None], area[None, :]), 1e-9)
+    iou = intersection / np.maximum(area[:, None] + area[None, :] - intersection, 1e-9)
+    if sources is None:
+        duplicate = iou > iou_threshold
+    else:
+        sources = np.asarray(sources)
+        duplicate = np.where(sources[:, None] == sources[None, :], iou > iou_threshold, smaller > threshold)
+
+    order = np.argsort(-confidence, kind="stable")
+    suppressed = np.zeros(len(xyxy), bool)
+    keep = []
+    for i in order.tolist():
+        if suppressed[i]:
+            continue
+        keep.append(i)
+        suppressed |= duplicate[i]
+    return np.asarray(keep, np.intp)
+
+
+class TiledDetector(Detector):
+    """Kareleri örtüşen karolar halinde modele veren dedektör aşaması.
+
+    ``Detector``ın gruplama ve hareket kapısı davranışı aynen korunur; yalnızca her grubun
+    tahmini karolar üzerinden yapılır. ``full_frame`` açıkken kareler ayrıca modelin varsayılan
+    giriş boyutunda (``imgsz`` verilmeden) bir kez daha işlenir, böylece karolara sığmayan
+    yakın/büyük bireyler de bulunur; ``tile`` 640'tan büyük olsa da tüm kare büyütülmez.
+    """
+
+    def __init__(self, model, tile=640, overlap=0.2, zones=None, full_frame=True, nms_threshold=0.5,
+                 classes=None, batch_size=1, max_latency=None):
+        super().__init__(model, classes=classes, batch_size=batch_size, max_latency=max_latency)
+        self.tile = tile
+        self.overlap = overlap
+        self.zones = zones
+        self.full_frame = full_frame
+        self.nms_threshold = nms_threshold
+        self.tiles = {}  # (genişlik, yükseklik) -> karo dizisi
+        self.tiles_run = 0
+
+    def stats(self):
+        return {"calls": self.calls, "tiles": self.tiles_run}
+
+    def tiles_for(self, shape):
+        height, width = shape[:2]
+        if (width, height) not in self.tiles:
+            self.tiles[width, height] = plan_tiles(width, height, self.tile, self.overlap, self.zones)
+        return self.tiles[width, height]
+
+    def predict(self, images):
+        self.calls += 1
+        crops, owners, offsets = [], [], []
+        frames, frame_owners = [], []
+        for i, image in enumerate(images):
+            height, width = image.shape[:2]
+            tiles = self.tiles_for(image.shape)
+            for x0, y0, x1, y1 in tiles.tolist():
+                crops.append(image[y0:y1, x0:x1])
+                owners.append(i)
+                offsets.append((x0, y0))
+            whole = len(tiles) == 1 and tiles[0].tolist() == [0, 0, width, height]  # tek karo zaten karenin kendisi
+            if self.full_frame and not whole:
+                frames.append(image)
+                frame_owners.append(i)
+        self.tiles_run += len(crops) + len(frames)
+        predictions = self.model(crops, classes=self.classes, imgsz=self.tile, verbose=False) if crops else []
+        if frames:
+            predictions = [*predictions, *self.model(frames, classes=self.classes, verbose=False)]
+            owners += frame_owners
+            offsets += [(0, 0)] * len(frames)
+
+        boxes = [[] for _ in images]
+        scores = [[] for _ in images]
+        sources = [[] for _ in images]
+        for crop, (owner, (x0, y0), prediction) in enumerate(zip(owners, offsets, predictions)):
+            detections = to_detections(prediction)
+            boxes[owner].append(detections.xyxy + np.array([x0, y0, x0, y0], np.float32))
+            scores[owner].append(detections.confidence)
+            sources[owner].append(np.full(len(detections), crop))
+
+        results = []
+        for frame_boxes, frame_scores, frame_sources in zip(boxes, scores, sources):
+            if not frame_boxes:
+                results.append(Detections.empty())
+                continue
+            xyxy = np.concatenate(frame_boxes)
+            confidence = np.concatenate(frame_scores)
+            keep = merge_boxes(xyxy, confidence, self.nms_threshold, np.concatenate(frame_sources))
+            results.append(Detections(xyxy[keep], confidence[keep], np.full(len(keep), -1, np.int64)))
+        return results
@@ -0,0 +1,124 @@
+"""Takip aşaması."""
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+_INVALID = 1e6
+
+
+class PassthroughTracker:
+    """Dedektörün verdiği kimlikleri (``box.id``) olduğu gibi bırakır."""
+
+    def __call__(self, results):
+        yield from results
+
+
+def iou_matrix(a, b):
+    """(N, 4) ve (M, 4) xyxy kutular arasındaki IoU -> (N, M)."""
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - intersection
+    return intersection / np.maximum(union, 1e-9)
+
+
+def centroid_distance(a, b):
+    """Merkezler arası uzaklık, ``a`` kutularının köşegen uzunluğuna bölünmüş -> (N, M)."""
+    ca = (a[:, :2] + a[:, 2:]) / 2
+    cb = (b[:, :2] + b[:, 2:]) / 2
+    diagonal = np.hypot(a[:, 2] - a[:, 0], a[:, 3] - a[:, 1])
+    return np.linalg.norm(ca[:, None, :] - cb[None, :, :], axis=2) / np.maximum(diagonal, 1e-9)[:, None]
+
+
+class IouTracker:
+    """Ek bağımlılık gerektirmeyen, vektörel IoU/merkez eşleştirmeli çoklu nesne takipçisi.
+
+    Her karede etkin izler ile tespitler arasındaki IoU matrisi tek seferde hesaplanır ve
+    Macar algoritmasıyla (``linear_sum_assignment``) en iyi eşleştirme bulunur. IoU eşiği
+    tutmayan çiftler, merkezleri ``max_distance`` köşegen içindeyse daha yüksek maliyetle
+    eşleşebilir. İz durumu (kutu, ilk/son görülme, isabet, kaçırma) iz başına sözlükler
+    yerine önceden ayrılmış dizilerde tutulur; kapasite dolunca diziler iki katına çıkar.
+    ``max_misses`` kareden uzun süre görülmeyen izler kapanır ve yuvaları yeniden kullanılır.
+    """
+
+    def __init__(self, iou_threshold=0.3, max_distance=0.5, max_misses=30, capacity=256):
+        self.iou_threshold = iou_threshold
+        self.max_distance = max_distance
+        self.max_misses = max_misses
+        self.next_id = 1
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        self.boxes = np.zeros((capacity, 4), np.float32)
+        self.track_ids = np.full(capacity, -1, np.int64)
+        self.first_seen = np.zeros(capacity, np.float64)
+        self.last_seen = np.zeros(capacity, np.float64)
+        self.hits = np.zeros(capacity, np.int32)
+        self.misses = np.zeros(capacity, np.int32)
+        self.active = np.zeros(capacity, bool)
+
+    def _grow(self, needed):
+        capacity = len(self.active)
+        while capacity < needed:
+            capacity *= 2
+        old = (self.boxes, self.track_ids, self.first_seen, self.last_seen, self.hits, self.misses, self.active)
+        self._allocate(capacity)
+        for new, values in zip((self.boxes, self.track_ids, self.first_seen, self.last_seen,
+                                self.hits, self.misses, self.active), old):
+            new[:len(values)] = values
+
+    def _match(self, slots, xyxy):
+        if len(slots) == 0 or len(xyxy) == 0:
+            return np.zeros(0, np.intp), np.zeros(0, np.intp)
+        tracks = self.boxes[slots]
+        iou = iou_matrix(tracks, xyxy)
+        distance = centroid_distance(tracks, xyxy)
+        cost = np.where(iou >= self.iou_threshold, 1.0 - iou,
+                        np.where(distance <= self.max_distance, 1.0 + distance, _INVALID))
+        rows, cols = linear_sum_assignment(cost)
+        valid = cost[rows, cols] < _INVALID
+        return rows[valid], cols[valid]
+
+    def update(self, xyxy, timestamp):
+        """Bir karenin tespitlerini izlerle eşleştirir ve her tespitin iz kimliğini döndürür."""
+        ids = np.full(len(xyxy), -1, np.int64)
+        slots = np.flatnonzero(self.active)
+        rows, cols = self._match(slots, xyxy)
+
+        matched = slots[rows]
+        self.boxes[matched] = xyxy[cols]
+        self.last_seen[matched] = timestamp
+        self.hits[matched] += 1
+        self.misses[matched] = 0
+        ids[cols] = self.track_ids[matched]
+
+        missed = np.setdiff1d(slots, matched, assume_unique=True)
+        self.misses[missed] += 1
+        self.active[missed[self.misses[missed] > self.max_misses]] = False
+
+        new = np.setdiff1d(np.arange(len(xyxy)), cols, assume_unique=True)
+        if len(new):
+            free = np.flatnonzero(~self.active)
+            if len(free) < len(new):
+                self._grow(int(self.active.sum()) + len(new))
+                free = np.flatnonzero(~self.active)
+            free = free[:len(new)]
+            new_ids = np.arange(self.next_id, self.next_id + len(new), dtype=np.int64)
+            self.next_id += len(new)
+            self.boxes[free] = xyxy[new]
+            self.track_ids[free] = new_ids
+            self.first_seen[free] = timestamp
+            self.last_seen[free] = timestamp
+            self.hits[free] = 1
+            self.misses[free] = 0
+            self.active[free] = True
+            ids[new] = new_ids
+        return ids
+
+    def __call__(self, results):
+        for result in results:
+            result.detections.ids = self.update(result.detections.xyxy, result.frame.timestamp)
+            yield result
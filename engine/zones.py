@@ -0,0 +1,58 @@
+"""Bölge tanımları ve bölge maskesi."""
+import json
+
+import cv2
+import numpy as np
+
+# Normalize (0-1) koordinatlarla 4 bölge: sol üst, sağ üst, sol alt, sağ alt
+DEFAULT_ZONES = {
+    "Zone 1": [(0.0, 0.0), (0.5, 0.0), (0.5, 0.5), (0.0, 0.5)],
+    "Zone 2": [(0.5, 0.0), (1.0, 0.0), (1.0, 0.5), (0.5, 0.5)],
+    "Zone 3": [(0.0, 0.5), (0.5, 0.5), (0.5, 1.0), (0.0, 1.0)],
+    "Zone 4": [(0.5, 0.5), (1.0, 0.5), (1.0, 1.0), (0.5, 1.0)],
+}
+
+
+def load_zones(path):
+    """JSON bölge dosyasını okur: ``{"zones": [{"name": ..., "polygon": [[x, y], ...]}]}``.
+
+    Köşe koordinatları karenin genişlik/yüksekliğine göre 0-1 aralığında verilir.
+    """
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    zones = {}
+    for zone in config["zones"]:
+        polygon = [tuple(map(float, point)) for point in zone["polygon"]]
+        if len(polygon) < 3:
+            raise ValueError(f"{zone['name']}: çokgen en az 3 köşe içermeli")
+        zones[zone["name"]] = polygon
+    return zones
+
+
+class ZoneMask:
+    """Bölge çokgenlerinin kare çözünürlüğünde bir kez çizildiği uint8 etiket maskesi.
+
+    Piksel değeri 0 ise bölge yok, ``i + 1`` ise ``names[i]`` bölgesidir; çakışan bölgelerde
+    listede sonra gelen kazanır. Tespitlerin bölgesi, ayak noktalarının (kutu alt kenarının
+    ortası) maskeden tek bir dizi indekslemesiyle okunmasıyla bulunur; maliyet bölge
+    sayısından bağımsızdır.
+    """
+
+    def __init__(self, zones, width, height):
+        if len(zones) > 255:
+            raise ValueError("en fazla 255 bölge tanımlanabilir")
+        self.names = list(zones)
+        self.width = width
+        self.height = height
+        self.mask = np.zeros((height, width), np.uint8)
+        self.polygons = []
+        for label, polygon in enumerate(zones.values(), start=1):
+            points = np.round(np.asarray(polygon, np.float64) * (width, height)).astype(np.int32)
+            self.polygons.append(points)
+            cv2.fillPoly(self.mask, [points], label)
+
+    def lookup(self, xyxy):
+        """Her kutunun ayak noktasındaki bölge indeksi -> (N,) int, bölge dışı -1."""
+        x = np.clip(((xyxy[:, 0] + xyxy[:, 2]) / 2).astype(np.intp), 0, self.width - 1)
+        y = np.clip(xyxy[:, 3].astype(np.intp), 0, self.height - 1)
+        return self.mask[y, x].astype(np.intp) - 1
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# ``engine`` paketi depo kökünde; kurulum gerektirmeden içe aktarılabilsin
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from engine.aggregate import DwellAggregator
+from engine.pipeline import Detections, Frame, FrameResult
+
+
+def stream(frames, fps=10):
+    """``[kimlikler, ...]`` -> 10 FPS, bölgesiz ``FrameResult`` akışı."""
+    for index, ids in enumerate(frames):
+        ids = np.asarray(ids, np.int64)
+        detections = Detections(np.zeros((len(ids), 4), np.float32), np.ones(len(ids), np.float32), ids)
+        yield FrameResult(Frame(index, None, index / fps, (100, 100, 3)), detections)
+
+
+# 1 kimliği 2 s görünüp kaybolur, 2 kimliği sonra gelip kalır
+FRAMES = [[1]] * 21 + [[2]] * 40
+
+
+def run(aggregator):
+    for _ in aggregator(stream(FRAMES)):
+        pass
+    return aggregator.summary()
+
+
+def test_default_keeps_no_raw_durations():
+    aggregator = DwellAggregator(grace=1.0)
+    summary = run(aggregator)
+    assert summary["stay_durations"] == {}
+    assert list(aggregator.stay_durations) == [2]  # kapanan iz bellekten çıktı
+    assert summary["dwell"]["all"]["count"] == 2
+    assert summary["dwell"]["all"]["max"] == pytest.approx(3.9)
+
+
+def test_history_keeps_raw_durations():
+    summary = run(DwellAggregator(grace=1.0, history=True))
+    assert summary["stay_durations"] == pytest.approx({1: 2.0, 2: 3.9})
+    assert summary["dwell"]["all"]["count"] == 2
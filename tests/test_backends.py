@@ -0,0 +1,73 @@
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import torch
+
+from engine import backends
+from engine.backends import select_backend
+
+IMAGES = [np.zeros((64, 64, 3), np.uint8)] * 2
+
+
+class FakeModel:
+    """Sabit kutular döndüren, isteğe bağlı olarak yavaş sahte YOLO modeli."""
+
+    def __init__(self, xyxy, delay=0.0):
+        self.xyxy = torch.tensor(xyxy, dtype=torch.float32).reshape(-1, 4)
+        self.delay = delay
+
+    def __call__(self, image, verbose=False):
+        time.sleep(self.delay)
+        return [SimpleNamespace(boxes=_Boxes(self.xyxy))]
+
+
+class _Boxes:
+    def __init__(self, xyxy):
+        self.xyxy = xyxy
+        self.conf = torch.ones(len(xyxy))
+        self.id = None
+
+    def __len__(self):
+        return len(self.xyxy)
+
+
+def make_loader(models, loaded):
+    def loader(weights, backend):
+        loaded.append(backend)
+        return models[backend]
+    return loader
+
+
+def test_faster_agreeing_backend_is_selected():
+    box = [[10, 10, 30, 40]]
+    models = {"torch": FakeModel(box, 0.01), "onnx": FakeModel(box)}
+    backend, results = select_backend("agree.pt", IMAGES, ["torch", "onnx"], loader=make_loader(models, []))
+    assert backend == "onnx"
+    assert results["onnx"]["agreement"] == 1.0
+
+
+def test_unverifiable_agreement_keeps_torch():
+    # Örneklerde hiç kutu yoksa aday ne kadar hızlı olursa olsun uyumu doğrulanamaz
+    models = {"torch": FakeModel([], 0.01), "openvino": FakeModel([])}
+    backend, results = select_backend("empty.pt", IMAGES, ["torch", "openvino"], loader=make_loader(models, []))
+    assert backend == "torch"
+    assert results["openvino"]["agreement"] is None
+
+
+def test_disagreeing_backend_is_rejected():
+    models = {"torch": FakeModel([[10, 10, 30, 40]], 0.01), "onnx": FakeModel([[40, 40, 60, 60]])}
+    backend, _ = select_backend("disagree.pt", IMAGES, ["torch", "onnx"], loader=make_loader(models, []))
+    assert backend == "torch"
+
+
+def test_int8_is_only_a_candidate_when_requested(monkeypatch):
+    monkeypatch.setattr(backends, "available_backends", lambda: list(backends.BACKENDS))
+    box = [[10, 10, 30, 40]]
+    models = {name: FakeModel(box) for name in backends.BACKENDS}
+    loaded = []
+    select_backend("int8.pt", IMAGES, loader=make_loader(models, loaded))
+    assert "openvino-int8" not in loaded
+    loaded.clear()
+    select_backend("int8.pt", IMAGES, int8=True, loader=make_loader(models, loaded))
+    assert "openvino-int8" in loaded
@@ -0,0 +1,52 @@
+import numpy as np
+
+from engine.cache import CacheRecorder, ResultCache, replay
+from engine.pipeline import Detections, Frame, FrameResult
+
+
+def stream(count):
+    rng = np.random.default_rng(0)
+    for index in range(count):
+        boxes = index % 4  # boş kareler de kaydedilmeli
+        yield FrameResult(Frame(index, None, index / 25, (720, 1280, 3)),
+                          Detections(rng.random((boxes, 4)).astype(np.float32), rng.random(boxes).astype(np.float32),
+                                     np.arange(boxes, dtype=np.int64) + index))
+
+
+def test_recorded_columns_replay_identically(tmp_path):
+    cache = ResultCache(tmp_path)
+    for _ in CacheRecorder(cache, "detections", "tracks")(stream(50)):
+        pass
+    replayed = list(replay(cache.load("detections"), cache.load("tracks")["ids"]))
+    expected = list(stream(50))
+    assert len(replayed) == len(expected)
+    for a, b in zip(replayed, expected):
+        assert (a.frame.index, a.frame.timestamp, a.frame.shape) == (b.frame.index, b.frame.timestamp, b.frame.shape)
+        assert np.array_equal(a.detections.xyxy, b.detections.xyxy)
+        assert np.array_equal(a.detections.confidence, b.detections.confidence)
+        assert np.array_equal(a.detections.ids, b.detections.ids)
+
+
+def test_interrupted_recording_is_discarded(tmp_path):
+    cache = ResultCache(tmp_path)
+    stage = CacheRecorder(cache, "detections", "tracks")(stream(50))
+    next(stage)
+    stage.close()
+    assert cache.load("detections") is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_concurrent_recordings_of_same_key_do_not_clobber(tmp_path):
+    cache = ResultCache(tmp_path)
+    first = CacheRecorder(cache, "detections", "tracks")(stream(50))
+    second = CacheRecorder(cache, "detections", "tracks")(stream(30))  # ör. ikinci iş aynı videoyu işliyor
+    for _ in range(10):
+        next(first)
+        next(second)
+    for _ in first:
+        pass
+    for _ in second:  # hedef zaten yayınlandı: önbellek isabeti, bu kopya atılır
+        pass
+    assert len(cache.load("detections")["index"]) == 50
+    assert len(cache.load("tracks")["ids"]) == sum(index % 4 for index in range(50))
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["detections.cols", "tracks.cols"]
@@ -0,0 +1,96 @@
+import cv2
+import numpy as np
+import pytest
+
+from engine.chunked import merge_chunks, plan_chunks, stitch
+from engine.sources import read_frames
+
+FPS = 10
+
+
+def record(frames, boxes, ids):
+    """``boxes(kare)`` -> kutular, ``ids`` -> yerel kimlikler; ``record_chunk`` biçiminde kayıt."""
+    xyxy = [np.asarray(boxes(index), np.float32).reshape(-1, 4) for index in frames]
+    return {
+        "index": np.asarray(frames, np.int64),
+        "timestamp": np.asarray(frames, np.float64) / FPS,
+        "counts": np.asarray([len(box) for box in xyxy], np.int64),
+        "xyxy": np.concatenate(xyxy),
+        "confidence": np.ones(sum(map(len, xyxy)), np.float32),
+        "ids": np.tile(np.asarray(ids, np.int64), len(frames)),
+        "shape": np.asarray((100, 200, 3), np.int64),
+    }
+
+
+class SeekableCapture:
+    """``frames`` kareli sahte ``VideoCapture``; ``CAP_PROP_FRAME_COUNT`` gerçek sayıdan azdır."""
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.position = 0
+
+    def set(self, prop, value):
+        self.position = int(value)
+
+    def get(self, prop):
+        return FPS if prop == cv2.CAP_PROP_FPS else (self.position - 1) * 1000 / FPS
+
+    def read(self):
+        if self.position >= self.frames:
+            return False, None
+        self.position += 1
+        return True, np.zeros((4, 4, 3), np.uint8)
+
+
+def walker(index):
+    return [[2 * index, 10, 2 * index + 20, 60]]
+
+
+def crossing(index):
+    """Biri sağa, biri sola yürüyen iki kişi; 25. karede (parça sınırı) üst üste gelirler."""
+    return [[2 * index, 10, 2 * index + 20, 60], [100 - 2 * index, 10, 120 - 2 * index, 60]]
+
+
+def run(records, starts):
+    pipeline = merge_chunks(records, starts, history=True)
+    results = list(pipeline)
+    return results, pipeline.aggregator.summary()
+
+
+def test_track_crossing_chunk_boundary_keeps_one_id():
+    # İkinci parça 25. karede başlar, 20-24 ısınma kareleri; yerel kimlik farklı
+    records = [record(range(0, 25), walker, [1]), record(range(20, 50), walker, [7])]
+    results, summary = run(records, [0, 25])
+    assert [result.frame.index for result in results] == list(range(50))
+    assert {int(result.detections.ids[0]) for result in results} == {1}
+    assert summary["stay_durations"] == pytest.approx({1: 4.9})  # sınırda sıfırlanmadan kesintisiz
+    assert summary["dwell"]["all"]["count"] == 1
+
+
+def test_new_track_after_boundary_gets_new_id():
+    records = [record(range(0, 25), walker, [1]), record(range(20, 50), lambda index: walker(index + 40), [3])]
+    ids, next_id = stitch(records[0], records[1], 2)
+    assert set(ids.tolist()) == {2} and next_id == 3
+
+
+@pytest.mark.parametrize("local_ids", [[5, 6], [6, 5]])
+def test_two_ids_crossing_near_seam_are_not_swapped(local_ids):
+    records = [record(range(0, 25), crossing, [1, 2]), record(range(20, 50), crossing, local_ids)]
+    results, summary = run(records, [0, 25])
+    for result in results:
+        rightward, leftward = result.detections.ids.tolist()
+        assert (rightward, leftward) == (1, 2), result.frame.index
+    assert set(summary["stay_durations"]) == {1, 2}
+
+
+def test_last_chunk_reads_past_underreported_frame_count():
+    reported, actual = 40, 57
+    plan = plan_chunks(reported, 3, overlap=5)
+    assert plan[-1][2] is None
+    records = []
+    for warmup_start, _, end in plan:
+        frames = [frame.index for frame in read_frames(SeekableCapture(actual), warmup_start, end)]
+        records.append(record(frames, walker, [len(records) + 1]))
+    results, summary = run(records, [start for _, start, _ in plan])
+    assert [result.frame.index for result in results] == list(range(actual))  # sıralı çalıştırmayla aynı kareler
+    assert summary["stay_durations"] == pytest.approx({1: (actual - 1) / FPS})
@@ -0,0 +1,66 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from engine.detector import Detector
+from engine.motion import MotionGate
+from engine.pipeline import Frame, FrameResult
+
+
+class CountingModel:
+    """Her çağrıdaki görüntü sayısını kaydeden, kutu döndürmeyen sahte model."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, images, **kwargs):
+        self.calls.append(len(images))
+        return [SimpleNamespace(boxes=None) for _ in images]
+
+
+def frames(images):
+    for index, image in enumerate(images):
+        yield FrameResult(Frame(index, image, index / 25, image.shape))
+
+
+def run(images, batch_size, gate=None):
+    """Hattı çalıştırır; her sonuç çıktığında kaynaktan okunmuş ama henüz çıkmamış kare sayısını döndürür."""
+    pulled = []
+
+    def source():
+        for result in frames(images):
+            pulled.append(result.frame.index)
+            yield result
+
+    model = CountingModel()
+    stream = source() if gate is None else gate(source())
+    held, order = [], []
+    for result in Detector(model, batch_size=batch_size)(stream):
+        held.append(len(pulled) - len(order))
+        order.append(result.frame.index)
+    return model, held, order
+
+
+def test_static_scene_with_motion_gate_does_not_hold_every_frame():
+    static = [np.zeros((48, 64, 3), np.uint8)] * 100
+    model, held, order = run(static, batch_size=4, gate=MotionGate(threshold=4.0, max_stale=1000))
+    assert order == list(range(100))
+    assert max(held) <= 4
+    assert model.calls[0] == 1  # yalnızca ilk kare modele gider, gerisi önceki tespitleri kullanır
+
+
+def test_batches_fresh_frames_up_to_batch_size():
+    rng = np.random.default_rng(0)
+    moving = [rng.integers(0, 255, (48, 64, 3), np.uint8) for _ in range(10)]
+    model, held, order = run(moving, batch_size=4)
+    assert order == list(range(10))
+    assert model.calls == [4, 4, 2]
+    assert max(held) <= 4
+
+
+def test_reused_frames_get_latest_detections_in_order():
+    rng = np.random.default_rng(1)
+    images = [rng.integers(0, 255, (48, 64, 3), np.uint8)] * 3 + [rng.integers(0, 255, (48, 64, 3), np.uint8)]
+    model, _, order = run(images, batch_size=2, gate=MotionGate(threshold=4.0))
+    assert order == [0, 1, 2, 3]
+    assert sum(model.calls) == 2  # 0. ve 3. kare; 1 ve 2 hareketsiz
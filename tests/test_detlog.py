@@ -0,0 +1,68 @@
+import numpy as np
+
+from engine.detlog import DetectionLog, DetectionLogWriter
+from engine.pipeline import Detections, Frame, FrameResult
+
+
+def stream(count, boxes=2, fps=10):
+    for index in range(count):
+        detections = Detections(np.full((boxes, 4), index, np.float32), np.full(boxes, 0.5, np.float32),
+                                np.arange(boxes, dtype=np.int64))
+        result = FrameResult(Frame(index, None, index / fps, (100, 100, 3)), detections)
+        result.zones = np.arange(boxes) % 2
+        yield result
+
+
+def drain(stage):
+    for _ in stage:
+        pass
+
+
+def test_concurrent_writers_do_not_clobber(tmp_path):
+    path = tmp_path / "run.detlog"
+    first = DetectionLogWriter(path, ["A", "B"], chunk_rows=8)(stream(40))
+    second = DetectionLogWriter(path, ["A", "B"], chunk_rows=8)(stream(25))
+    for _ in range(10):
+        next(first)
+        next(second)
+    drain(first)
+    assert len(DetectionLog(path)) == 80
+    drain(second)
+    log = DetectionLog(path)
+    assert len(log) == 50  # tek bir çalıştırmanın tam kaydı, karışım değil
+    assert log["frame"].tolist() == np.repeat(np.arange(25), 2).tolist()
+    assert [child.name for child in tmp_path.iterdir()] == ["run.detlog"]
+
+
+def test_interrupted_writer_keeps_previous_log(tmp_path):
+    path = tmp_path / "run.detlog"
+    drain(DetectionLogWriter(path)(stream(5)))
+    stage = DetectionLogWriter(path)(stream(40))
+    next(stage)
+    stage.close()
+    assert len(DetectionLog(path)) == 10
+    assert [child.name for child in tmp_path.iterdir()] == ["run.detlog"]
+
+
+def test_round_trip_and_queries(tmp_path):
+    path = tmp_path / "run.detlog"
+    # 7 satırlık tampon: taşmalar karenin ortasına denk gelir
+    drain(DetectionLogWriter(path, ["A", "B"], chunk_rows=7)(stream(30, boxes=3)))
+    log = DetectionLog(path)
+    assert len(log) == 90 and log.zone_names == ["A", "B"]
+    assert log["frame"].tolist() == np.repeat(np.arange(30), 3).tolist()
+    assert log["box"].shape == (90, 4) and np.all(log["box"][:, 0] == log["frame"])
+    assert log["zone"].tolist() == [0, 1, 0] * 30
+    window = log.time_range(1.0, 1.5)
+    assert window["frame"].tolist() == np.repeat(np.arange(10, 15), 3).tolist()
+    track = log.track(2, start=2.0)
+    assert track["frame"].tolist() == list(range(20, 30)) and set(track["track"].tolist()) == {2}
+    assert log.duration() == 2.9
+
+
+def test_empty_log(tmp_path):
+    path = tmp_path / "empty.detlog"
+    drain(DetectionLogWriter(path)(stream(4, boxes=0)))
+    log = DetectionLog(path)
+    assert len(log) == 0 and log.duration() == 0.0
+    assert log.track(1)["frame"].tolist() == []
@@ -0,0 +1,125 @@
+import numpy as np
+import pytest
+
+from engine.aggregate import DwellAggregator
+from engine.events import DWELL, ENTER, EXIT, KINDS, ZoneEventEngine, read_events
+from engine.pipeline import Detections, Frame, FrameResult
+from engine.zones import DEFAULT_ZONES
+
+ZONES = {"A": None, "B": None}
+
+
+def result(index, ids, zones, fps=10):
+    ids = np.asarray(ids, np.int64)
+    detections = Detections(np.zeros((len(ids), 4), np.float32), np.ones(len(ids), np.float32), ids)
+    frame_result = FrameResult(Frame(index, None, index / fps, (100, 100, 3)), detections)
+    frame_result.zones = np.asarray(zones, np.intp)
+    return frame_result
+
+
+def stream(frames):
+    """``[(ids, zones), ...]`` -> 10 FPS ``FrameResult`` akışı."""
+    return [result(index, ids, zones) for index, (ids, zones) in enumerate(frames)]
+
+
+WALK = stream([([1], [0])] * 5 + [([1], [1])] * 5)
+
+
+@pytest.mark.parametrize("name", ["events.jsonl", "events.bin"])
+def test_completed_run_replaces_log(tmp_path, name):
+    path = tmp_path / name
+    for _ in ZoneEventEngine(ZONES, log_path=path)(iter(WALK)):
+        pass
+    assert not path.with_name(name + ".partial").exists()
+    events, names = read_events(path)
+    assert names == ["A", "B"]
+    assert [KINDS[kind] for kind in events["kind"]] == ["enter", "exit", "enter", "exit"]
+
+
+def test_interrupted_run_leaves_no_log(tmp_path):
+    path = tmp_path / "events.bin"
+    stage = ZoneEventEngine(ZONES, log_path=path)(iter(WALK))
+    next(stage)
+    stage.close()  # ör. iş iptal edildi
+    assert not path.exists()
+    assert not (tmp_path / "events.bin.partial").exists()
+
+
+def test_failed_run_leaves_no_log(tmp_path):
+    path = tmp_path / "events.jsonl"
+
+    def failing():
+        yield WALK[0]
+        raise RuntimeError("kaynak okunamadı")
+
+    with pytest.raises(RuntimeError):
+        for _ in ZoneEventEngine(ZONES, log_path=path)(failing()):
+            pass
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_non_atomic_log_survives_interruption(tmp_path):
+    path = tmp_path / "live.jsonl"
+    stage = ZoneEventEngine(ZONES, log_path=path, atomic=False)(iter(WALK))
+    for _ in range(3):
+        next(stage)
+    stage.close()
+    events, _ = read_events(path)
+    assert events["kind"].tolist() == [ENTER, EXIT]  # açık ziyaret kesilince son görüldüğü anda kapanır
+    assert events["timestamp"].tolist() == [0.0, 0.2]
+
+
+def collect(zones=ZONES, **kwargs):
+    """Olayları ``on_event`` ile toplayan motor -> ``(motor, [(kare, olay, kimlik, bölge, süre)])``."""
+    events = []
+
+    def on_event(batch):
+        events.extend((frame, KINDS[kind], track, zone, round(duration, 3))
+                      for _, frame, track, zone, kind, duration in batch.tolist())
+
+    return ZoneEventEngine(zones, on_event=on_event, **kwargs), events
+
+
+def run(frames, **kwargs):
+    """``[(kimlikler, bölgeler), ...]`` akışını motordan geçirir (akış sonu kapanışları dahil)."""
+    engine, events = collect(**kwargs)
+    for _ in engine(iter(stream(frames))):
+        pass
+    return events
+
+
+def test_crossing_zone_edge_emits_exit_and_enter_in_same_frame():
+    # Ayak noktası y=30'da x=40'tan 60'a yürür; Zone 1 | Zone 2 sınırı x=50 (ortak kenar sonraki bölgenin)
+    results = []
+    for index, x in enumerate(range(40, 61)):
+        detections = Detections(np.asarray([[x - 5, 10, x + 5, 30]], np.float32), np.ones(1, np.float32),
+                                np.asarray([1], np.int64))
+        results.append(FrameResult(Frame(index, None, index / 10, (100, 100, 3)), detections))
+    engine, events = collect(DEFAULT_ZONES)
+    for _ in engine(DwellAggregator(DEFAULT_ZONES)(iter(results))):
+        pass
+    assert events == [(0, "enter", 1, 0, 0.0), (10, "exit", 1, 0, 1.0), (10, "enter", 1, 1, 0.0),
+                      (20, "exit", 1, 1, 1.0)]
+
+
+def test_leaving_all_zones_exits_and_reentry_starts_new_visit():
+    frames = [([1], [0])] * 3 + [([1], [-1])] * 2 + [([1], [0])] * 2
+    assert run(frames) == [
+        (0, "enter", 1, 0, 0.0), (3, "exit", 1, 0, 0.3), (5, "enter", 1, 0, 0.0), (6, "exit", 1, 0, 0.1)]
+
+
+def test_tracks_without_id_never_enter():
+    assert run([([-1, 2], [0, 1])] * 2) == [(0, "enter", 2, 1, 0.0), (1, "exit", 2, 1, 0.1)]
+
+
+def test_grace_boundary():
+    # 0.5 s (tam grace) görünmeyen iz aynı ziyarette kalır; daha uzun kaybolan son görüldüğü anda çıkar
+    frames = [([1], [0])] + [([], [])] * 5 + [([1], [0])] + [([], [])] * 6
+    assert run(frames, grace=0.5) == [(0, "enter", 1, 0, 0.0), (6, "exit", 1, 0, 0.6)]
+
+
+def test_dwell_fires_once_per_visit_at_threshold():
+    frames = [([1], [0])] * 8 + [([1], [1])] * 2 + [([1], [0])] * 4
+    events = run(frames, dwell_threshold={"A": 0.3})
+    assert [event for event in events if event[1] == "dwell"] == [(3, "dwell", 1, 0, 0.3), (13, "dwell", 1, 0, 0.3)]
+    assert [event[1] for event in events].count("enter") == 3
@@ -0,0 +1,60 @@
+import numpy as np
+
+from engine.heatmap import HeatmapAccumulator, render_heatmap
+from engine.pipeline import Detections, Frame
+
+
+def reference(frames, cell, shape):
+    """Kutu kutu dolaşan döngü: ayak noktasının hücresine kareler arası süre eklenir."""
+    height, width = shape
+    grid = np.zeros((-(-height // cell), -(-width // cell)), np.float64)
+    previous = None
+    for timestamp, detections in frames:
+        if previous is not None:
+            for (x1, _, x2, y2), id in zip(detections.xyxy.tolist(), detections.ids.tolist()):
+                if id < 0:
+                    continue
+                col = min(max(int((x1 + x2) / 2 / cell), 0), grid.shape[1] - 1)
+                row = min(max(int(y2 / cell), 0), grid.shape[0] - 1)
+                grid[row, col] += timestamp - previous
+        previous = timestamp
+    return grid
+
+
+def random_frames(count=200, shape=(90, 130), seed=0):
+    rng = np.random.default_rng(seed)
+    timestamp = 0.0
+    frames = []
+    for _ in range(count):
+        timestamp += rng.uniform(0.02, 0.1)
+        people = rng.integers(0, 6)
+        x = rng.uniform(-20, shape[1] + 20, people)  # kare dışına taşanlar kenar hücrelere kırpılır
+        y = rng.uniform(0, shape[0] + 20, people)
+        xyxy = np.stack([x - 8, y - 30, x + 8, y], axis=1).astype(np.float32)
+        ids = rng.integers(-1, 4, people)  # -1: kimliği yok, sayılmaz
+        frames.append((timestamp, Detections(xyxy, np.ones(people, np.float32), ids)))
+    return frames
+
+
+def test_accumulation_matches_loop_reference():
+    frames = random_frames()
+    heatmap = HeatmapAccumulator(cell=16)
+    for timestamp, detections in frames:
+        heatmap.update(Frame(0, None, timestamp, (90, 130, 3)), detections)
+    assert heatmap.grid.shape == (6, 9)
+    np.testing.assert_allclose(heatmap.grid, reference(frames, 16, (90, 130)), rtol=1e-5, atol=1e-6)
+
+
+def test_same_cell_repeats_are_all_counted():
+    heatmap = HeatmapAccumulator(cell=10)
+    detections = Detections(np.array([[0, 0, 4, 5], [2, 0, 6, 5]], np.float32), np.ones(2, np.float32),
+                            np.array([1, 2]))
+    for timestamp in (0.0, 0.5, 1.0):
+        heatmap.update(Frame(0, None, timestamp, (20, 20, 3)), detections)
+    assert heatmap.grid[0, 0] == 2.0  # iki kişi x iki aralık x 0.5 s
+    assert heatmap.snapshot() is not heatmap.grid
+
+
+def test_render_overlays_at_image_size():
+    image = np.zeros((90, 130, 3), np.uint8)
+    assert render_heatmap(image, np.zeros((6, 9), np.float32)).shape == image.shape
@@ -0,0 +1,59 @@
+import gc
+import hashlib
+import io
+
+from engine.ingest import UploadStore
+
+
+class Upload(io.BytesIO):
+    """Streamlit ``UploadedFile`` benzeri akış: ad, boyut ve yükleme kimliği."""
+
+    def __init__(self, data, name="kayit.MP4", file_id=None):
+        super().__init__(data)
+        self.name = name
+        self.size = len(data)
+        self.file_id = file_id
+        self.reads = 0
+
+    def read(self, size=-1):
+        self.reads += 1
+        return super().read(size)
+
+
+DATA = bytes(range(256)) * 5000
+
+
+def test_ingest_hashes_while_copying(tmp_path):
+    store = UploadStore(tmp_path, chunk_size=4096)
+    upload = Upload(DATA, file_id="a")
+    video = store.ingest(upload)
+    assert video.digest == hashlib.sha256(DATA).hexdigest()
+    assert video.size == len(DATA)
+    assert video.path == store.directory / f"{video.digest}.mp4"
+    assert video.path.read_bytes() == DATA
+    assert upload.tell() == 0  # sonraki okuyucular için başa sarıldı
+    assert [path.name for path in store.directory.iterdir()] == [video.path.name]
+
+
+def test_repeated_upload_is_not_copied_again(tmp_path):
+    store = UploadStore(tmp_path)
+    upload = Upload(DATA, file_id="a")
+    first = store.ingest(upload)
+    reads = upload.reads
+    assert store.ingest(upload) is first
+    assert upload.reads == reads
+    # aynı içerik başka bir yükleme kimliğiyle gelirse aynı dosyaya düşer
+    assert store.ingest(Upload(DATA, file_id="b")).path == first.path
+    assert len(list(store.directory.iterdir())) == 1
+
+
+def test_sessions_are_isolated_and_cleaned_up(tmp_path):
+    first, second = UploadStore(tmp_path), UploadStore(tmp_path)
+    assert first.directory != second.directory
+    video = first.ingest(Upload(DATA))
+    first.cleanup()
+    assert not first.directory.exists() and not video.path.exists()
+    directory = second.directory
+    del second
+    gc.collect()
+    assert not directory.exists()  # oturum nesnesi çöpe gidince dizin de silinir
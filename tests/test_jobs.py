@@ -0,0 +1,124 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from engine import jobs
+from engine.jobs import CANCELLED, DONE, FAILED, QUEUED, RUNNING, JobQueue
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = tmp_path / "upload" / "kayit.avi"
+    path.parent.mkdir()
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 10, (32, 24))
+    for i in range(12):
+        writer.write(np.full((24, 32, 3), i * 20, np.uint8))
+    writer.release()
+    return path
+
+
+def test_unreadable_video_is_rejected_before_copying(tmp_path):
+    broken = tmp_path / "bozuk.mp4"
+    broken.write_bytes(b"\x00" * 4096)
+    queue = JobQueue(tmp_path / "jobs")
+    with pytest.raises(IOError):
+        queue.submit("bozuk", broken, "yolov8n.pt")
+    assert not (tmp_path / "jobs").exists() or list((tmp_path / "jobs").iterdir()) == []
+    assert queue.list() == []
+
+
+def test_submit_probes_frame_count(tmp_path, video, monkeypatch):
+    monkeypatch.setattr(JobQueue, "_start_workers", lambda self: None)  # yalnızca kayıt; çalıştırma yok
+    queue = JobQueue(tmp_path / "jobs")
+    job = queue.get(queue.submit("kayit", video, "yolov8n.pt"))
+    assert job.total_frames == 12
+    assert sorted(path.suffix for path in (tmp_path / "jobs").iterdir()) == [".avi", ".json"]
+
+
+class FakeAnalysis:
+    """``cached_analysis`` yerine: çalışma sırasını kaydeder, ``gate`` açılana dek ilerleme bildirir."""
+
+    def __init__(self):
+        self.order = []
+        self.gate = threading.Event()
+        self.started = threading.Event()
+
+    def __call__(self, video_path, weights, cache, metrics=None, preview=None, **options):
+        self.order.append(options["tag"])
+        self.started.set()
+        frames = 0
+        while not self.gate.wait(0.01):
+            frames += 1
+            metrics.on_update({"frames": frames, "fps": 10.0, "finished": False})  # iptal burada fırlatılır
+        return {"summary": {"stay_durations": {1: 2.5}, "dwell": {}}, "heatmap": np.ones((2, 2), np.float32),
+                "background": None, "log": None, "rollup": None, "events": None, "cached": None}
+
+
+@pytest.fixture
+def analysis(monkeypatch):
+    fake = FakeAnalysis()
+    monkeypatch.setattr(jobs, "cached_analysis", fake)
+    yield fake
+    fake.gate.set()
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "zaman aşımı"
+        time.sleep(0.005)
+
+
+def test_priority_order_and_cancel(tmp_path, video, analysis):
+    queue = JobQueue(tmp_path / "jobs", max_workers=1, cache=object())
+    running = queue.submit("ilk", video, "w.pt", tag="ilk")
+    analysis.started.wait(5)
+    low = queue.submit("düşük", video, "w.pt", priority=0, tag="düşük")
+    high = queue.submit("yüksek", video, "w.pt", priority=5, tag="yüksek")
+    dropped = queue.submit("iptal", video, "w.pt", priority=9, tag="iptal")
+    same = queue.submit("yüksek-2", video, "w.pt", priority=5, tag="yüksek-2")
+    assert queue.get(running).status == RUNNING
+    assert [queue.position(job_id) for job_id in (dropped, high, same, low)] == [0, 1, 2, 3]
+
+    assert queue.cancel(dropped)  # bekleyen iş kuyruktan çıkar, videosu silinir
+    assert queue.get(dropped).status == CANCELLED and not (tmp_path / "jobs" / f"{dropped}.avi").exists()
+    assert queue.position(high) == 0
+
+    analysis.gate.set()
+    wait_for(lambda: queue.get(low).status == DONE)
+    assert analysis.order == ["ilk", "yüksek", "yüksek-2", "düşük"]
+    assert not queue.cancel(low)  # biten iş iptal edilemez
+    assert queue.result(low)["heatmap"].shape == (2, 2)
+
+
+def test_cancel_running_job(tmp_path, video, analysis):
+    queue = JobQueue(tmp_path / "jobs", max_workers=1, cache=object(), update_interval=0.01)
+    job_id = queue.submit("uzun", video, "w.pt", tag="uzun")
+    wait_for(lambda: queue.get(job_id).frames > 0)
+    assert queue.cancel(job_id)
+    wait_for(lambda: queue.get(job_id).status == CANCELLED)
+    assert queue.result(job_id) is None
+    wait_for(lambda: [path.suffix for path in (tmp_path / "jobs").iterdir()] == [".json"])  # video silinir
+
+
+def test_reload_from_disk(tmp_path, video, analysis):
+    root = tmp_path / "jobs"
+    queue = JobQueue(root, max_workers=1, cache=object())
+    done = queue.submit("bitti", video, "w.pt", tag="bitti")
+    analysis.gate.set()
+    wait_for(lambda: queue.get(done).status == DONE)
+    analysis.gate.clear()
+    interrupted = queue.submit("yarım", video, "w.pt", tag="yarım")
+    wait_for(lambda: queue.get(interrupted).status == RUNNING)
+
+    reloaded = JobQueue(root)  # ör. süreç yeniden başladı
+    job = reloaded.get(done)
+    assert job.status == DONE and job.total_frames == 12
+    assert job.summary["stay_durations"] == {1: 2.5}  # JSON'daki metin anahtarlar yeniden tamsayı
+    assert reloaded.result(done)["heatmap"].shape == (2, 2)
+    assert reloaded.get(interrupted).status == FAILED  # önceki süreç iş bitmeden kapandı
+    assert [job.id for job in reloaded.list()] == [interrupted, done]
+    assert QUEUED not in {job.status for job in reloaded.list()}
@@ -0,0 +1,65 @@
+import threading
+
+import numpy as np
+import pytest
+
+from engine.live import LatestFrameSource, parse_args
+
+
+class ScriptedSource(LatestFrameSource):
+    """Analiz ilk kareyi alınca arka arkaya ``burst`` kare yayınlayan kaynak."""
+
+    def __init__(self, burst=4, error=None):
+        super().__init__()
+        self.burst = burst
+        self.error = error
+        self.consumed = threading.Event()
+        self.published = threading.Event()
+
+    def _capture(self, publish, stop):
+        publish(np.zeros((2, 2, 3), np.uint8), 0.0)
+        self.consumed.wait(5)
+        for i in range(1, self.burst + 1):
+            publish(np.full((2, 2, 3), i, np.uint8), i / 25)
+        self.published.set()
+        if self.error is not None:
+            raise self.error
+
+
+def test_latest_frame_wins():
+    source = ScriptedSource(burst=4)
+    frames = iter(source)
+    first = next(frames)
+    assert first.index == 0
+    source.consumed.set()
+    source.published.wait(5)
+    latest = next(frames)  # analiz yavaşken yayınlanan 4 kareden yalnızca en yenisi gelir
+    assert latest.index == 4 and latest.timestamp == pytest.approx(4 / 25) and latest.image[0, 0, 0] == 4
+    assert list(frames) == []
+    stats = source.stats()
+    assert (stats["captured"], stats["delivered"], stats["dropped"]) == (5, 2, 3)
+    assert stats["dropped_percent"] == pytest.approx(60.0)
+
+
+def test_capture_error_reaches_consumer():
+    source = ScriptedSource(burst=1, error=IOError("yayın koptu"))
+    frames = iter(source)
+    next(frames)
+    source.consumed.set()
+    with pytest.raises(IOError):
+        list(frames)
+
+
+def test_source_restarts_cleanly():
+    source = ScriptedSource(burst=0)
+    source.consumed.set()
+    assert [frame.index for frame in source] == [0]
+    assert [frame.index for frame in source] == [0]  # ikinci çalıştırmada sayaçlar sıfırlanır
+    assert source.stats()["captured"] == 1
+
+
+def test_cli_rejects_unknown_backend(capsys):
+    assert parse_args(["rtsp://kamera", "--backend", "onnx"]).backend == "onnx"
+    with pytest.raises(SystemExit):
+        parse_args(["rtsp://kamera", "--backend", "onxx"])
+    assert "invalid choice" in capsys.readouterr().err
@@ -0,0 +1,57 @@
+import sys
+import threading
+
+import pytest
+
+from engine.metrics import PipelineMetrics, render_prometheus
+
+FRAMES = 300000
+
+
+def passthrough(results):
+    for result in results:
+        yield result
+
+
+class Frame:
+    pass
+
+
+@pytest.fixture
+def busy_switching():
+    """İş parçacıkları sık sık el değiştirsin; yarışlar her çalıştırmada ortaya çıksın."""
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def test_prometheus_snapshot_while_pipeline_writes(busy_switching):
+    metrics = PipelineMetrics("yarış", latency_window=64)
+    stream = metrics.instrument((Frame() for _ in range(FRAMES)), [("a", passthrough), ("b", passthrough)])
+    done = threading.Event()
+    errors = []
+
+    def run():
+        try:
+            for _ in stream:
+                pass
+        except Exception as error:
+            errors.append(error)
+        finally:
+            done.set()
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    snapshots = 0
+    while not done.is_set() or not snapshots:
+        snapshot = metrics.snapshot()
+        assert 'engine_frames_total{run="yarış"}' in render_prometheus([snapshot])
+        items = [stage["items"] for stage in snapshot["stages"].values()]
+        # aynı kilit altında kopyalandığı için aşama sayıları akış sırasıyla tutarlıdır
+        assert items == sorted(items, reverse=True)
+        assert items[-1] - len(items) <= snapshot["frames"] <= items[-1]
+        snapshots += 1
+    thread.join()
+    assert not errors
+    assert metrics.snapshot()["frames"] == FRAMES
@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+from engine import build_pipeline
+from engine.aggregate import DwellAggregator
+from engine.events import EXIT, ZoneEventEngine
+from engine.pipeline import Detections, Frame, FrameResult
+from engine.rollup import OccupancyRollup
+
+FPS = 2
+ZONES = {"A": None, "B": None}
+
+
+def visits(timestamp):
+    """1 kimliği 0-30. dk A'da, 2 kimliği 10-75. dk B'de, 3 kimliği 40-50. dk A'da."""
+    minute = timestamp / 60
+    present = [(1, 0, minute < 30), (2, 1, 10 <= minute < 75), (3, 0, 40 <= minute < 50)]
+    return [(id, zone) for id, zone, inside in present if inside]
+
+
+def stream(seconds=5400):
+    for index in range(seconds * FPS):
+        timestamp = index / FPS
+        rows = visits(timestamp)
+        ids = np.asarray([id for id, _ in rows], np.int64)
+        detections = Detections(np.zeros((len(rows), 4), np.float32), np.ones(len(rows), np.float32), ids)
+        result = FrameResult(Frame(index, None, timestamp, (100, 100, 3)), detections)
+        result.zones = np.asarray([zone for _, zone in rows], np.intp)
+        yield result
+
+
+@pytest.fixture(scope="module")
+def rollup():
+    rollup = OccupancyRollup(ZONES, grace=5.0)
+    for _ in rollup(stream()):
+        pass
+    return rollup
+
+
+@pytest.mark.parametrize("step", [300, 900, 1800])
+def test_coarse_query_equals_folded_fine_query(rollup, step):
+    fine = rollup.query(step=1)
+    coarse = rollup.query(step=step)
+    steps = len(coarse["time"])
+    np.testing.assert_array_equal(coarse["time"], np.arange(steps) * step)
+    for name in ("covered", "entries", "exits"):
+        folded = np.add.reduceat(fine[name], np.arange(0, len(fine[name]), step))
+        np.testing.assert_allclose(coarse[name], folded[:steps])
+    folded_peak = np.maximum.reduceat(fine["peak"], np.arange(0, len(fine["peak"]), step))
+    np.testing.assert_array_equal(coarse["peak"], folded_peak[:steps])
+
+
+def test_resolutions_agree_on_totals(rollup):
+    totals = {resolution: {name: array.sum(axis=0) for name, array in rollup.arrays(resolution).items()}
+              for resolution in rollup.resolutions}
+    for resolution in rollup.resolutions[1:]:
+        for name in ("person_seconds", "entries", "exits", "dwell_seconds", "covered"):
+            np.testing.assert_allclose(totals[resolution][name], totals[1][name])
+    assert totals[1]["entries"].tolist() == [2, 1]
+    assert totals[1]["exits"].tolist() == [2, 1]
+    np.testing.assert_allclose(totals[1]["person_seconds"], [40 * 60, 65 * 60], atol=1.0)
+
+
+def test_query_window_reports_occupancy_and_dwell(rollup):
+    hour = rollup.query(start=0, end=3600, step=3600)
+    assert hour["occupancy"][0] == pytest.approx([(30 + 10) / 60, 50 / 60], abs=1e-3)
+    assert hour["peak"][0].tolist() == [1, 1]  # A'daki iki ziyaret çakışmaz
+    # A'daki iki ziyaret (30 ve 10 dk) ilk saatte biter; B'deki ziyaret ikinci saatte
+    assert hour["exits"][0].tolist() == [2, 0]
+    assert hour["mean_dwell"][0][0] == pytest.approx(20 * 60, abs=1.0)
+    quarter = rollup.query(start=2400, end=3000, step=300)
+    assert quarter["time"].tolist() == [2400.0, 2700.0]
+    assert quarter["peak"][:, 0].tolist() == [1, 1]
+    assert quarter["entries"][:, 0].tolist() == [1, 0]
+
+
+def test_rollup_events_and_dwell_agree_on_exits():
+    # A'daki kişi 10 s kayboluyor (ortak grace'ten kısa): üç aşama da tek ziyaret görür
+    def stream_gap():
+        for index in range(0, 300, 5):
+            people = 0 if 100 <= index < 200 else 1
+            detections = Detections(np.zeros((people, 4), np.float32), np.ones(people, np.float32),
+                                    np.ones(people, np.int64))
+            yield FrameResult(Frame(index, None, index / 10, (100, 100, 3)), detections)
+
+    aggregator = DwellAggregator(ZONES)
+    aggregator.assign_zones = lambda shape, xyxy: np.zeros(len(xyxy), np.intp)  # herkes A'da
+    rollup = OccupancyRollup(ZONES)
+    exits = []
+    events = ZoneEventEngine(ZONES, on_event=lambda batch: exits.extend(batch[batch["kind"] == EXIT].tolist()))
+    for _ in events(rollup(aggregator(stream_gap()))):
+        pass
+    assert aggregator.summary()["dwell"]["all"]["count"] == 1
+    assert rollup.arrays(1)["exits"].sum() == len(exits) == 1
+    assert exits[0][5] == pytest.approx(29.5)
+
+
+def test_build_pipeline_shares_grace():
+    pipeline = build_pipeline("video.mp4", None, zones=ZONES, rollup_path="r.npz", events_path="e.jsonl",
+                              heatmap_cell=None, grace=12.0)
+    rollup, events = pipeline.find(OccupancyRollup), pipeline.find(ZoneEventEngine)
+    assert pipeline.aggregator.grace == rollup.grace == rollup.transitions.grace == events.grace == 12.0
@@ -0,0 +1,82 @@
+import cv2
+import numpy as np
+import pytest
+
+from engine import build_pipeline
+from engine import sinks as sinks_module
+from engine.pipeline import Detections, Frame, FrameResult
+from engine.sinks import Annotator, PreviewSink, VideoWriterSink
+
+
+def stream(count):
+    for index in range(count):
+        detections = Detections(np.array([[10, 10, 40, 80]], np.float32), np.ones(1, np.float32),
+                                np.array([1], np.int64))
+        result = FrameResult(Frame(index, np.zeros((120, 160, 3), np.uint8), index / 25), detections)
+        result.durations = np.zeros(1)
+        yield result
+
+
+def count_draws(monkeypatch):
+    draws = []
+    original = sinks_module.draw_detections
+    monkeypatch.setattr(sinks_module, "draw_detections", lambda *args: draws.append(1) or original(*args))
+    return draws
+
+
+def test_preview_does_not_redraw_annotated_frames(monkeypatch):
+    draws = count_draws(monkeypatch)
+    shown = []
+    for _ in PreviewSink(shown.append, max_fps=1e9)(Annotator()(stream(5))):
+        pass
+    assert len(shown) == 5
+    assert len(draws) == 5  # kare başına bir kez (Annotator), önizleme yeniden çizmez
+
+
+def test_preview_draws_only_frames_it_sends(monkeypatch):
+    draws = count_draws(monkeypatch)
+    shown = []
+    for _ in PreviewSink(shown.append, max_fps=1e-3)(stream(20)):
+        pass
+    assert len(shown) == len(draws) == 1
+
+
+def test_preview_pipeline_skips_annotator_by_default():
+    def sink_types(**kwargs):
+        return [type(sink) for sink in build_pipeline("video.mp4", None, heatmap_cell=None, **kwargs).sinks]
+
+    assert sink_types(preview=print) == [PreviewSink]
+    assert sink_types() == [Annotator]
+    assert sink_types(preview=print, annotate=True) == [Annotator, PreviewSink]
+
+
+def read_video(path):
+    cap = cv2.VideoCapture(str(path))
+    try:
+        frames = []
+        while True:
+            ok, image = cap.read()
+            if not ok:
+                return frames, cap.get(cv2.CAP_PROP_FPS)
+            frames.append(image)
+    finally:
+        cap.release()
+
+
+@pytest.mark.parametrize("count, every, scale, expected", [(20, 1, 1.0, 20), (21, 2, 0.5, 11), (1, 1, 1.0, 1)])
+def test_video_writer_frame_count(tmp_path, count, every, scale, expected):
+    path = tmp_path / "cikti.avi"
+    sink = VideoWriterSink(path, every=every, scale=scale, zones={"A": [(0, 0), (0.5, 0), (0.5, 0.5)]},
+                           queue_size=64)  # kuyruk hiç dolmaz: atlanan kare yok
+    assert sum(1 for _ in sink(stream(count))) == count  # hat her kareyi aynen geçirir
+    assert sink.written == expected and sink.dropped == 0
+    frames, fps = read_video(path)
+    assert len(frames) == expected
+    assert frames[0].shape == (round(120 * scale), round(160 * scale), 3)
+    if count > 1:
+        assert fps == pytest.approx(25 / every)  # video süresi gerçek süreyle aynı kalır
+
+
+def test_video_writer_does_not_draw_on_pipeline_frames(tmp_path):
+    results = list(VideoWriterSink(tmp_path / "cikti.avi")(stream(3)))
+    assert all(not result.frame.image.any() for result in results)
@@ -0,0 +1,58 @@
+import json
+
+import numpy as np
+import pytest
+
+from engine.sketch import DwellStats, QuantileSketch
+
+
+@pytest.fixture
+def durations():
+    return np.random.default_rng(0).lognormal(3, 1.5, 20000)
+
+
+def test_merged_sketch_equals_single_sketch(durations):
+    single = QuantileSketch()
+    single.add(durations)
+    parts = [QuantileSketch() for _ in range(4)]
+    for part, values in zip(parts, np.array_split(durations, 4)):
+        part.add(values)
+    merged = parts[3].copy().merge(parts[1]).merge(parts[0]).merge(parts[2])  # sıradan bağımsız
+    np.testing.assert_array_equal(merged.counts, single.counts)
+    for q in (0.0, 0.5, 0.9, 0.99, 1.0):
+        assert merged.quantile(q) == single.quantile(q)
+
+
+def test_sketch_quantiles_within_relative_accuracy(durations):
+    sketch = QuantileSketch(accuracy=0.01)
+    sketch.add(durations)
+    for q in (0.5, 0.9, 0.99):
+        exact = np.quantile(durations, q, method="lower")
+        assert sketch.quantile(q) == pytest.approx(exact, rel=0.02)
+
+
+def test_merged_dwell_stats_survive_json(durations):
+    single = DwellStats()
+    single.add(durations)
+    merged = DwellStats()
+    for values in np.array_split(durations, 3):
+        part = DwellStats()
+        part.add(values)
+        merged.merge(DwellStats.from_dict(json.loads(json.dumps(part.to_dict()))))
+    expected, actual = single.summary(), merged.summary()
+    assert actual["count"] == expected["count"]
+    assert actual["total"] == pytest.approx(expected["total"])
+    assert (actual["min"], actual["max"]) == (expected["min"], expected["max"])
+    assert {name: actual[name] for name in DwellStats.QUANTILES} == {name: expected[name] for name in DwellStats.QUANTILES}
+
+
+def test_merge_rejects_different_accuracy():
+    with pytest.raises(ValueError):
+        QuantileSketch(0.01).merge(QuantileSketch(0.02))
+
+
+def test_empty_stats_merge_keeps_other():
+    stats = DwellStats()
+    stats.add([1.0, 2.0])
+    merged = DwellStats().merge(stats).merge(DwellStats())
+    assert merged.summary()["min"] == 1.0 and merged.summary()["max"] == 2.0
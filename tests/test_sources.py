@@ -0,0 +1,53 @@
+import cv2
+import numpy as np
+import pytest
+
+from engine.sources import read_frames
+
+
+class FakeCapture:
+    """``CAP_PROP_POS_MSEC`` olarak verilen değerleri bildiren sahte ``VideoCapture``."""
+
+    def __init__(self, positions_ms, fps=25.0):
+        self.positions = positions_ms
+        self.fps = fps
+        self.read_count = 0
+        self.start = 0
+
+    def set(self, prop, value):
+        assert prop == cv2.CAP_PROP_POS_FRAMES
+        self.start = value
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        assert prop == cv2.CAP_PROP_POS_MSEC
+        return self.positions[self.read_count - 1]
+
+    def read(self):
+        if self.read_count >= len(self.positions):
+            return False, None
+        self.read_count += 1
+        return True, np.zeros((4, 4, 3), np.uint8)
+
+
+def timestamps(positions_ms, **kwargs):
+    return [frame.timestamp for frame in read_frames(FakeCapture(positions_ms), **kwargs)]
+
+
+def test_container_timestamps_are_used():
+    assert timestamps([0, 40, 80, 120]) == pytest.approx([0.0, 0.04, 0.08, 0.12])
+
+
+def test_zero_positions_advance_by_frame_interval():
+    assert timestamps([0, 0, 0, 0]) == pytest.approx([0.0, 0.04, 0.08, 0.12])
+
+
+def test_out_of_order_positions_never_go_backwards():
+    times = timestamps([0, 40, 200, 120, 0, 280])
+    assert np.all(np.diff(times) > 0)
+    assert times == pytest.approx([0.0, 0.04, 0.2, 0.24, 0.28, 0.32])
+
+
+def test_seek_without_position_starts_at_frame_time():
+    assert timestamps([0, 0], start=50) == pytest.approx([2.0, 2.04])
@@ -0,0 +1,82 @@
+from types import SimpleNamespace
+
+import numpy as np
+import torch
+
+from engine.tiling import TiledDetector, merge_boxes, plan_tiles
+
+
+class CropModel:
+    """Karo numarasına göre önceden verilmiş kutuları (karo koordinatlarında) döndüren sahte model."""
+
+    def __init__(self, boxes, frame_boxes=()):
+        self.boxes = boxes  # karo numarası -> [(x1, y1, x2, y2, güven), ...]
+        self.frame_boxes = list(frame_boxes)  # tüm kare geçişinin kutuları (kare koordinatlarında)
+        self.calls = []
+
+    def __call__(self, crops, **kwargs):
+        self.calls.append((len(crops), kwargs.get("imgsz")))
+        results = []
+        for i, _ in enumerate(crops):
+            boxes = self.boxes.get(i, []) if "imgsz" in kwargs else self.frame_boxes
+            rows = torch.tensor(boxes, dtype=torch.float32).reshape(-1, 5)
+            results.append(SimpleNamespace(boxes=Boxes(rows) if len(rows) else None))
+        return results
+
+
+class Boxes:
+    def __init__(self, rows):
+        self.xyxy = rows[:, :4]
+        self.conf = rows[:, 4]
+        self.id = None
+
+    def __len__(self):
+        return len(self.xyxy)
+
+
+def detect(boxes, width=1280, height=720):
+    detector = TiledDetector(CropModel(boxes), tile=640, overlap=0.2, full_frame=False)
+    return detector.predict([np.zeros((height, width, 3), np.uint8)])[0]
+
+
+def test_partly_hidden_person_in_same_source_is_kept():
+    xyxy = np.array([[100, 100, 160, 260], [130, 110, 175, 230]], np.float32)
+    assert merge_boxes(xyxy, np.array([0.9, 0.8]), 0.5).tolist() == [0, 1]
+    assert merge_boxes(xyxy, np.array([0.9, 0.8]), 0.5, sources=[3, 3]).tolist() == [0, 1]
+
+
+def test_same_source_duplicates_still_use_iou():
+    xyxy = np.array([[100, 100, 160, 260], [102, 102, 160, 262]], np.float32)
+    assert merge_boxes(xyxy, np.array([0.8, 0.9]), 0.5).tolist() == [1]
+
+
+def test_seam_duplicate_from_other_crop_is_removed():
+    # Karo kenarında kesilmiş yarım kutu, komşu karodaki tam kutuyla IoU 0.5 ama tamamen içinde
+    xyxy = np.array([[600, 100, 640, 260], [600, 100, 680, 260]], np.float32)
+    assert merge_boxes(xyxy, np.array([0.7, 0.9]), 0.5, sources=[0, 1]).tolist() == [1]
+    assert merge_boxes(xyxy, np.array([0.7, 0.9]), 0.5, sources=[0, 0]).tolist() == [1, 0]
+
+
+def test_tiled_detector_keeps_overlapping_people_in_one_crop():
+    tiles = plan_tiles(1280, 720, 640, 0.2)
+    assert tiles[:2].tolist() == [[0, 0, 640, 640], [320, 0, 960, 640]]
+    detections = detect({0: [(100, 100, 160, 260, 0.9), (130, 110, 175, 230, 0.8)]})
+    assert len(detections) == 2
+
+
+def test_tiled_detector_merges_seam_duplicates():
+    # 0. karoda sağ kenarda kesilmiş, 1. karoda (x0 = 320) tam görünen aynı kişi
+    detections = detect({0: [(600, 100, 640, 260, 0.7)], 1: [(280, 100, 360, 260, 0.9)]})
+    assert detections.xyxy.tolist() == [[600, 100, 680, 260]]
+    assert np.allclose(detections.confidence, [0.9])
+
+
+def test_full_frame_pass_runs_at_model_size():
+    # 1024'lük karolar; tüm kare karo boyutuna büyütülmeden ayrı çağrıda işlenir
+    model = CropModel({0: [(600, 100, 700, 300, 0.8)]},
+                      frame_boxes=[(598, 98, 702, 302, 0.9), (1500, 500, 1700, 900, 0.6)])
+    detector = TiledDetector(model, tile=1024, overlap=0.2, full_frame=True)
+    detections = detector.predict([np.zeros((1080, 1920, 3), np.uint8)])[0]
+    assert model.calls == [(6, 1024), (1, None)]
+    assert detections.xyxy.tolist() == [[598, 98, 702, 302], [1500, 500, 1700, 900]]  # karo kopyası elendi
+    assert detector.stats()["tiles"] == 7
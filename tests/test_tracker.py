@@ -0,0 +1,60 @@
+import numpy as np
+
+from engine.tracker import IouTracker
+
+EMPTY = np.zeros((0, 4), np.float32)
+
+
+def person(x, y=50, width=20, height=60):
+    return [x, y, x + width, y + height]
+
+
+def boxes(*rows):
+    return np.array(rows, np.float32).reshape(-1, 4)
+
+
+def test_id_survives_short_occlusion():
+    tracker = IouTracker(max_misses=5)
+    ids = [tracker.update(boxes(person(100 + 2 * i)), i / 10).tolist() for i in range(5)]
+    assert ids == [[1]] * 5
+    for i in range(5, 10):  # 5 kare boyunca görünmüyor
+        assert tracker.update(EMPTY, i / 10).tolist() == []
+    assert tracker.update(boxes(person(112)), 1.0).tolist() == [1]
+    assert tracker.hits[tracker.track_ids == 1].tolist() == [6]
+
+
+def test_track_closed_after_max_misses_and_slot_reused():
+    tracker = IouTracker(max_misses=3, capacity=4)
+    assert tracker.update(boxes(person(100)), 0.0).tolist() == [1]
+    for i in range(1, 5):  # max_misses + 1 kare görünmüyor
+        tracker.update(EMPTY, i / 10)
+    assert not tracker.active.any()
+    assert tracker.update(boxes(person(100)), 0.5).tolist() == [2]
+    assert len(tracker.active) == 4 and tracker.active.sum() == 1
+
+
+def test_empty_frames_before_any_track():
+    tracker = IouTracker()
+    for i in range(3):
+        ids = tracker.update(EMPTY, i / 10)
+        assert ids.dtype == np.int64 and ids.tolist() == []
+    assert tracker.update(boxes(person(10)), 0.3).tolist() == [1]
+
+
+def test_crossing_people_keep_ids():
+    tracker = IouTracker()
+    for i in range(10):
+        ids = tracker.update(boxes(person(100 + 3 * i), person(300 - 3 * i, y=60)), i / 10)
+        assert ids.tolist() == [1, 2]
+
+
+def test_growth_beyond_initial_capacity():
+    tracker = IouTracker(capacity=2)
+    assert tracker.update(boxes(person(0)), 0.0).tolist() == [1]
+    crowd = boxes(*(person(50 * i) for i in range(7)))
+    assert tracker.update(crowd, 0.1).tolist() == [1, 2, 3, 4, 5, 6, 7]
+    assert len(tracker.active) >= 7 and tracker.active.sum() == 7
+    slot = int(np.flatnonzero(tracker.track_ids == 1)[0])
+    assert tracker.first_seen[slot] == 0.0 and tracker.hits[slot] == 2  # büyütmede durum korunur
+    shuffled = crowd[::-1] + 2
+    assert tracker.update(shuffled, 0.2).tolist() == [7, 6, 5, 4, 3, 2, 1]
@@ -0,0 +1,46 @@
+import json
+
+import numpy as np
+import pytest
+
+from engine.zones import DEFAULT_ZONES, ZoneMask, load_zones
+
+
+def boxes(*feet):
+    """Ayak noktaları ``(x, y)`` -> o noktada biten 10x40 kutular."""
+    return np.array([[x - 5, y - 40, x + 5, y] for x, y in feet], np.float32)
+
+
+def test_lookup_returns_zone_index_at_foot_point():
+    mask = ZoneMask(DEFAULT_ZONES, 200, 100)
+    zones = mask.lookup(boxes((20, 10), (150, 10), (20, 90), (150, 90)))
+    assert zones.tolist() == [0, 1, 2, 3]
+
+
+def test_points_outside_zones_and_frame():
+    zones = {"kapı": [(0.25, 0.25), (0.75, 0.25), (0.75, 0.75), (0.25, 0.75)]}
+    mask = ZoneMask(zones, 100, 100)
+    # bölge dışı, içi ve kare dışına taşan (kırpılır) ayak noktaları
+    assert mask.lookup(boxes((10, 10), (50, 50), (500, 500), (-20, 60))).tolist() == [-1, 0, -1, -1]
+    assert mask.lookup(np.zeros((0, 4), np.float32)).tolist() == []
+
+
+def test_overlapping_zones_later_wins():
+    zones = {"büyük": [(0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.0, 1.0)],
+             "küçük": [(0.4, 0.4), (0.6, 0.4), (0.6, 0.6), (0.4, 0.6)]}
+    mask = ZoneMask(zones, 100, 100)
+    assert mask.lookup(boxes((50, 50), (10, 10))).tolist() == [1, 0]
+
+
+def test_too_many_zones_rejected():
+    with pytest.raises(ValueError):
+        ZoneMask({str(i): [(0, 0), (1, 0), (1, 1)] for i in range(256)}, 10, 10)
+
+
+def test_load_zones(tmp_path):
+    path = tmp_path / "zones.json"
+    path.write_text(json.dumps({"zones": [{"name": "A", "polygon": [[0, 0], [1, 0], [1, 1]]}]}), encoding="utf-8")
+    assert load_zones(path) == {"A": [(0.0, 0.0), (1.0, 0.0), (1.0, 1.0)]}
+    path.write_text(json.dumps({"zones": [{"name": "B", "polygon": [[0, 0], [1, 0]]}]}), encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_zones(path)